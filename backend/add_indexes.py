@@ -14,7 +14,6 @@ def add_indexes():
     engine = create_engine(get_database_url())
     
     indexes = [
-        "CREATE INDEX IF NOT EXISTS ix_jobs_job_url ON jobs(job_url)",
         "CREATE INDEX IF NOT EXISTS ix_jobs_source_site ON jobs(source_site)",
         "CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs(status)",
         "CREATE INDEX IF NOT EXISTS ix_jobs_batch_id ON jobs(batch_id)",
@@ -31,9 +31,19 @@ def get_env_int(key: str, default: int = 0) -> int:
 
 
 # --- DATABASE CONFIGURATION ---
-from database_config import get_database_url
+from database_config import get_database_url, get_scrape_cache_dir, get_scrape_recordings_dir
 DB_URL = get_env_str("DB_URL", get_database_url())
 
+# SQLite tuning applied to every new connection. WAL lets reads run while
+# a scrape writes; synchronous=NORMAL skips the fsync per commit in WAL
+# mode (a power loss can drop the last commits, never corrupt the file).
+SQLITE_JOURNAL_MODE = get_env_str("SQLITE_JOURNAL_MODE", "WAL").upper()
+SQLITE_SYNCHRONOUS = get_env_str("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_MMAP_SIZE_MB = max(0, get_env_int("SQLITE_MMAP_SIZE_MB", 256))
+SQLITE_CACHE_SIZE_MB = max(1, get_env_int("SQLITE_CACHE_SIZE_MB", 64))
+SQLITE_TEMP_STORE = get_env_str("SQLITE_TEMP_STORE", "MEMORY").upper()
+SQLITE_BUSY_TIMEOUT_MS = max(0, get_env_int("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
 
 # --- CORS CONFIGURATION ---
 def get_cors_origins() -> List[str]:
@@ -50,6 +60,109 @@ CORS_ORIGINS = get_cors_origins()
 # --- PIPELINE CONFIGURATION ---
 PIPELINE_EXPIRY_SECONDS = 3600  # 1 hour
 
+# Scrape runs that may execute at the same time; further runs are queued.
+# Runs that would send the same site/title/location queries never overlap.
+SCRAPE_QUEUE_WORKERS = max(1, get_env_int("SCRAPE_QUEUE_WORKERS", 2))
+
+# Where scrape runs execute: "thread" in the API process, or "process" in a
+# pool of child processes so scraping can't stall API requests on the GIL
+SCRAPE_EXECUTION_MODE = get_env_str("SCRAPE_EXECUTION_MODE", "thread").lower()
+
+# Highest priority a scrape run can request (higher runs first)
+MAX_SCRAPE_PRIORITY = 10
+
+# Upper bounds of the optional per-run budget (target_new_jobs, max_duration_seconds)
+MAX_TARGET_NEW_JOBS = 1000
+MAX_SCRAPE_DURATION_SECONDS = 3600
+
+
+# --- SCRAPING ---
+# Default number of concurrent queries per site in a scrape run.
+# Set to 1 to restore the old strictly serial behaviour.
+SCRAPE_MAX_WORKERS = max(1, get_env_int("SCRAPE_MAX_WORKERS", 3))
+
+# Each site is scraped on its own worker pool so a slow portal can't hold
+# back the others. Sites missing here fall back to SCRAPE_MAX_WORKERS.
+SITE_MAX_WORKERS: Dict[str, int] = {
+    "linkedin": 1,  # description fetching makes LinkedIn slow and ban-prone
+    "indeed": SCRAPE_MAX_WORKERS,
+    "glassdoor": 2,
+}
+
+# Maximum seconds a single per-site query may take before it is abandoned
+SITE_TIMEOUT_SECONDS: Dict[str, int] = {
+    "linkedin": get_env_int("LINKEDIN_TIMEOUT_SECONDS", 300),
+    "indeed": get_env_int("INDEED_TIMEOUT_SECONDS", 90),
+    "glassdoor": get_env_int("GLASSDOOR_TIMEOUT_SECONDS", 120),
+}
+
+# Per-site pacing of live scrape calls (requests per second). Each site has
+# a token bucket that halves its rate on 429s/timeouts and creeps back up
+# towards max_rate on success (AIMD). Shared by all runs in the process.
+SITE_RATE_LIMITS: Dict[str, Dict[str, float]] = {
+    "linkedin": {"rate": 0.2, "burst": 1, "min_rate": 0.02, "max_rate": 0.5},
+    "indeed": {"rate": 1.0, "burst": 3, "min_rate": 0.1, "max_rate": 2.0},
+    "glassdoor": {"rate": 0.5, "burst": 2, "min_rate": 0.05, "max_rate": 1.0},
+}
+
+# Retries of a failed per-site call (429, timeout, connection error), with
+# exponential backoff and full jitter between attempts
+SCRAPE_MAX_RETRIES = max(0, get_env_int("SCRAPE_MAX_RETRIES", 3))
+SCRAPE_RETRY_BASE_SECONDS = get_env_int("SCRAPE_RETRY_BASE_SECONDS", 2)
+SCRAPE_RETRY_MAX_SECONDS = get_env_int("SCRAPE_RETRY_MAX_SECONDS", 60)
+
+# Circuit breaker per site: after this many consecutive failed queries the
+# site is skipped for the cooldown (within the run and by later runs), then
+# probed with a single query
+CIRCUIT_BREAKER_FAILURES = max(1, get_env_int("CIRCUIT_BREAKER_FAILURES", 3))
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = get_env_int("CIRCUIT_BREAKER_COOLDOWN_SECONDS", 300)
+
+# Scraped jobs are saved with one multi-row INSERT per finished query, or
+# sooner once this many are buffered or the oldest waited this long
+SCRAPE_INSERT_BATCH_SIZE = max(1, get_env_int("SCRAPE_INSERT_BATCH_SIZE", 100))
+SCRAPE_INSERT_FLUSH_MS = get_env_int("SCRAPE_INSERT_FLUSH_MS", 1000)
+
+# API and scrape writes are queued to one writer thread that owns the
+# only write connection and commits up to this many queued operations per
+# transaction. Disabled, every write commits on its own session again.
+DB_WRITER_ENABLED = get_env_bool("DB_WRITER_ENABLED", True)
+DB_WRITE_BATCH_SIZE = max(1, get_env_int("DB_WRITE_BATCH_SIZE", 64))
+
+# Fetch LinkedIn listings first and request descriptions only for URLs
+# that are not already stored. Saves one request per known job.
+SCRAPE_TWO_PHASE = get_env_bool("SCRAPE_TWO_PHASE", True)
+
+# On-disk cache of raw per-site results, so repeated searches within the
+# TTL don't hit the portals again
+SCRAPE_CACHE_ENABLED = get_env_bool("SCRAPE_CACHE_ENABLED", True)
+SCRAPE_CACHE_DIR = get_env_str("SCRAPE_CACHE_DIR", get_scrape_cache_dir())
+SCRAPE_CACHE_TTL_SECONDS = get_env_int("SCRAPE_CACHE_TTL_SECONDS", 600)
+SCRAPE_CACHE_MAX_MB = get_env_int("SCRAPE_CACHE_MAX_MB", 100)
+
+# Where listings come from: "jobspy" scrapes the live portals, "replay"
+# serves results recorded in SCRAPE_RECORDINGS_DIR so the whole pipeline
+# can be benchmarked and load-tested offline. With SCRAPE_RECORD on, live
+# results are saved there for later replay.
+SCRAPER_BACKEND = get_env_str("SCRAPER_BACKEND", "jobspy").lower()
+SCRAPE_RECORDINGS_DIR = get_env_str("SCRAPE_RECORDINGS_DIR", get_scrape_recordings_dir())
+SCRAPE_RECORD = get_env_bool("SCRAPE_RECORD", False)
+
+# Artificial latency of replayed calls: base plus random jitter per listing
+# call, and a delay per fetched description
+REPLAY_LATENCY_MS = get_env_int("REPLAY_LATENCY_MS", 0)
+REPLAY_JITTER_MS = get_env_int("REPLAY_JITTER_MS", 0)
+REPLAY_DESCRIPTION_LATENCY_MS = get_env_int("REPLAY_DESCRIPTION_LATENCY_MS", 0)
+# Serve another recording of the same site for queries never recorded
+REPLAY_FALLBACK = get_env_bool("REPLAY_FALLBACK", True)
+
+# Queries are run in order of the new jobs they found in this many past
+# days, so budgeted runs reach their target with fewer calls
+QUERY_YIELD_LOOKBACK_DAYS = get_env_int("QUERY_YIELD_LOOKBACK_DAYS", 30)
+
+# Delta scraping: extra hours added to the gap since the last successful
+# scrape, to absorb clock skew and late-indexed postings
+DELTA_SAFETY_MARGIN_HOURS = get_env_int("DELTA_SAFETY_MARGIN_HOURS", 2)
+
 
 # --- SUPPORTED VALUES ---
 SUPPORTED_COUNTRIES: List[Dict[str, str]] = [
@@ -62,6 +175,16 @@ SUPPORTED_COUNTRIES: List[Dict[str, str]] = [
 
 SUPPORTED_SITES: List[str] = ["linkedin", "indeed", "glassdoor"]
 
+# Scraper backends selectable with SCRAPER_BACKEND
+SCRAPER_BACKENDS: List[str] = ["jobspy", "replay"]
+
+# Scrape run modes: the user's full time window, or only the gap since the
+# last successful scrape of each query
+SCRAPE_MODES: List[str] = ["full", "delta"]
+
+# Job fields the include/exclude keyword filters can be limited to
+KEYWORD_MATCH_FIELDS: List[str] = ["all", "title", "description"]
+
 
 # --- VALIDATION CONSTANTS ---
 MIN_RESULTS_PER_SITE = 5
@@ -3,15 +3,71 @@ Database module for the Job Bot API.
 Contains database engine, session management, and base declaration.
 """
 import logging
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import declarative_base, sessionmaker
+import sqlite3
+from typing import Any, Callable, Dict, List, Set, Tuple
 
-from config import DB_URL
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from config import (
+    DB_URL,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_MB,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE_MB,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TEMP_STORE,
+)
 
 logger = logging.getLogger("job-agent")
 
+# PRAGMA values can't be bound as parameters, so the named ones are checked
+_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+_TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+
+
+def _choice(name: str, value: str, allowed: Tuple[str, ...], default: str) -> str:
+    """Return value if it is one of allowed, else log and return default."""
+    if value in allowed:
+        return value
+    logger.warning(f"Ignoring invalid {name}={value!r}, using {default}")
+    return default
+
+
+# Applied in this order to every new SQLite connection; busy_timeout comes
+# first so switching the journal mode waits for other connections' locks
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "journal_mode": _choice("SQLITE_JOURNAL_MODE", SQLITE_JOURNAL_MODE, _JOURNAL_MODES, "WAL"),
+    "synchronous": _choice("SQLITE_SYNCHRONOUS", SQLITE_SYNCHRONOUS, _SYNCHRONOUS_MODES, "NORMAL"),
+    "mmap_size": SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+    # Negative cache_size is in KiB rather than pages
+    "cache_size": -SQLITE_CACHE_SIZE_MB * 1024,
+    "temp_store": _choice("SQLITE_TEMP_STORE", SQLITE_TEMP_STORE, _TEMP_STORES, "MEMORY"),
+}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Apply SQLITE_PRAGMAS to a new DBAPI connection (engine connect event).
+    A pragma that fails is logged and skipped, the connection stays usable.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            try:
+                cursor.execute(f"PRAGMA {name} = {value}")
+            except Exception as e:
+                logger.warning(f"Failed to set PRAGMA {name} = {value}: {e}")
+    finally:
+        cursor.close()
+
+
 # Create database engine
 engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
 
 # Create session factory
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
@@ -32,6 +88,116 @@ def get_db():
         db.close()
 
 
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """
+    Run callback once the changes db just committed are durable.
+    
+    Sessions of the database writer commit to a savepoint of a group
+    transaction; for them the writer runs the callback after the group is
+    committed, and drops it if the group rolls back. Elsewhere the callback
+    runs at once.
+    
+    Args:
+        db: Session that just committed
+        callback: Function to call, e.g. to update an in-memory index
+    """
+    deferred = db.info.get("after_commit")
+    if deferred is None:
+        callback()
+    else:
+        deferred.append(callback)
+
+
+def get_sqlite_diagnostics(db: Session) -> Dict[str, Any]:
+    """
+    Report the configured SQLite tuning and the settings actually in effect.
+    The active values are read back from a pooled connection, so a pragma
+    SQLite refused or capped (e.g. WAL on an in-memory database, mmap_size
+    above the compile-time limit) shows up as a difference.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Dictionary with dialect, sqlite_version, configured and active
+        pragma values, and database size figures
+    """
+    if engine.dialect.name != "sqlite":
+        return {"dialect": engine.dialect.name}
+    
+    def pragma(name: str) -> Any:
+        return db.execute(text(f"PRAGMA {name}")).scalar()
+    
+    page_size = pragma("page_size")
+    page_count = pragma("page_count")
+    return {
+        "dialect": "sqlite",
+        "sqlite_version": sqlite3.sqlite_version,
+        "configured": dict(SQLITE_PRAGMAS),
+        "active": {
+            "busy_timeout": pragma("busy_timeout"),
+            "journal_mode": str(pragma("journal_mode")).upper(),
+            "synchronous": _SYNCHRONOUS_MODES[pragma("synchronous")],
+            "mmap_size": pragma("mmap_size"),
+            "cache_size": pragma("cache_size"),
+            "temp_store": _TEMP_STORES[pragma("temp_store")],
+        },
+        "page_size": page_size,
+        "size_bytes": page_size * page_count,
+        "free_bytes": page_size * pragma("freelist_count"),
+        "wal_autocheckpoint": pragma("wal_autocheckpoint"),
+    }
+
+
+def _migrate_content_addressed_ids(conn) -> Tuple[int, int]:
+    """
+    Give every job with a URL the ID job_id_for_url derives from it.
+    
+    Jobs whose URLs normalize to the same value collapse into one: the job
+    the user acted on (saved/rejected) is kept if any, else the oldest.
+    The url_key column and job_url index, no longer needed for dedupe,
+    are dropped.
+    
+    Args:
+        conn: Open connection; the caller commits
+        
+    Returns:
+        (jobs re-keyed, duplicate jobs removed)
+    """
+    from utils.helpers import job_id_for_url, normalize_job_url
+    
+    rows = conn.execute(text("""
+        SELECT rowid, id, job_url FROM jobs
+        WHERE job_url IS NOT NULL AND job_url != ''
+        ORDER BY CASE WHEN status = 'new' THEN 1 ELSE 0 END, created_at, rowid
+    """))
+    kept: Set[str] = set()
+    updates: List[Dict[str, Any]] = []
+    deletes: List[Dict[str, Any]] = []
+    for rowid, job_id, job_url in rows:
+        normalized_url = normalize_job_url(job_url)
+        new_id = job_id_for_url(normalized_url)
+        if new_id in kept:
+            deletes.append({"rowid": rowid})
+            continue
+        kept.add(new_id)
+        if new_id != job_id or normalized_url != job_url:
+            updates.append({"rowid": rowid, "id": new_id, "job_url": normalized_url})
+    
+    # Delete first so no surviving row still holds an ID being assigned
+    if deletes:
+        conn.execute(text("DELETE FROM jobs WHERE rowid = :rowid"), deletes)
+    if updates:
+        conn.execute(text("UPDATE jobs SET id = :id, job_url = :job_url WHERE rowid = :rowid"), updates)
+    
+    conn.execute(text("DROP INDEX IF EXISTS ux_jobs_url_key"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_jobs_job_url"))
+    columns = [row[1] for row in conn.execute(text("PRAGMA table_info(jobs)")).fetchall()]
+    if 'url_key' in columns:
+        conn.execute(text("ALTER TABLE jobs DROP COLUMN url_key"))
+    return len(updates), len(deletes)
+
+
 def run_migrations():
     """
     Run database migrations.
@@ -56,6 +222,32 @@ def run_migrations():
                 conn.commit()
                 logger.info("Migration complete: updated_at column added to jobs")
             
+            if 'description_pending' not in jobs_columns:
+                logger.info("Adding description_pending column to jobs table...")
+                conn.execute(text("ALTER TABLE jobs ADD COLUMN description_pending BOOLEAN DEFAULT 0"))
+                conn.commit()
+                logger.info("Migration complete: description_pending column added to jobs")
+            
+            if 'last_seen_at' not in jobs_columns:
+                logger.info("Adding last_seen_at column to jobs table...")
+                conn.execute(text("ALTER TABLE jobs ADD COLUMN last_seen_at TEXT"))
+                conn.execute(text("UPDATE jobs SET last_seen_at = fetched_at"))
+                conn.commit()
+                logger.info("Migration complete: last_seen_at column added to jobs")
+            
+            result = conn.execute(text("PRAGMA index_list(jobs)"))
+            jobs_indexes = [row[1] for row in result.fetchall()]
+            
+            # Jobs keyed by random IDs (and deduplicated through job_url
+            # lookups) move to IDs derived from their URL
+            if 'url_key' in jobs_columns or 'ix_jobs_job_url' in jobs_indexes:
+                logger.info("Moving jobs to content-addressed IDs...")
+                rekeyed, removed = _migrate_content_addressed_ids(conn)
+                conn.commit()
+                logger.info(
+                    f"Migration complete: {rekeyed} jobs re-keyed by URL ({removed} duplicate jobs removed)"
+                )
+            
             # Check and add created_at/updated_at columns to settings table
             result = conn.execute(text("PRAGMA table_info(settings)"))
             settings_columns = [row[1] for row in result.fetchall()]
@@ -71,6 +263,27 @@ def run_migrations():
                 conn.execute(text("ALTER TABLE settings ADD COLUMN updated_at TEXT"))
                 conn.commit()
                 logger.info("Migration complete: updated_at column added to settings")
+            
+            if 'keyword_fields' not in settings_columns:
+                logger.info("Adding keyword_fields column to settings table...")
+                conn.execute(text("ALTER TABLE settings ADD COLUMN keyword_fields TEXT DEFAULT 'all'"))
+                conn.commit()
+                logger.info("Migration complete: keyword_fields column added to settings")
+            
+            # The settings column defaulted to "compact" long before compact
+            # mode was honored, and the UI never sets it: those rows scrape
+            # in full mode. user_version marks the one-time reset.
+            if 'data_mode' in settings_columns and conn.execute(text("PRAGMA user_version")).scalar() < 1:
+                conn.execute(text("UPDATE settings SET data_mode = 'full' WHERE data_mode = 'compact'"))
+                conn.execute(text("PRAGMA user_version = 1"))
+                conn.commit()
+                logger.info("Migration complete: data_mode reset to full")
+            
+            if 'keyword_whole_word' not in settings_columns:
+                logger.info("Adding keyword_whole_word column to settings table...")
+                conn.execute(text("ALTER TABLE settings ADD COLUMN keyword_whole_word BOOLEAN DEFAULT 0"))
+                conn.commit()
+                logger.info("Migration complete: keyword_whole_word column added to settings")
                 
     except Exception as e:
         logger.error(f"Migration error: {e}")
@@ -82,7 +295,7 @@ def init_db():
     Creates all tables and runs migrations.
     """
     # Import models to ensure they're registered with Base
-    from models import JobDB, SettingsDB  # noqa: F401
+    from models import JobDB, SettingsDB, QueryWatermarkDB, ScrapeQueueDB, QueryStatDB  # noqa: F401
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
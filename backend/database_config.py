@@ -45,6 +45,31 @@ def get_database_path() -> str:
         return os.path.join(backend_dir, 'jobs.db')
 
 
+def get_scrape_cache_dir() -> str:
+    """
+    Get the directory for cached scrape results.
+    
+    Lives next to the database file, so it follows the same
+    development/frozen location rules.
+    
+    Returns:
+        Absolute path to the scrape cache directory
+    """
+    return os.path.join(os.path.dirname(get_database_path()), 'scrape_cache')
+
+
+def get_scrape_recordings_dir() -> str:
+    """
+    Get the directory for recorded scrape results (replay backend).
+    
+    Lives next to the database file, like the scrape cache.
+    
+    Returns:
+        Absolute path to the recordings directory
+    """
+    return os.path.join(os.path.dirname(get_database_path()), 'scrape_recordings')
+
+
 def get_database_url() -> str:
     """
     Get the SQLite database URL.
@@ -1,59 +1,543 @@
-import json
 import re
+import threading
 import time
-import uuid
-from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Pattern, Set, Tuple
 import pandas as pd
 
-# JobSpy import compatibility
-try:
-    from jobspy import scrape_jobs
-except Exception:
-    from python_jobspy import scrape_jobs
+from utils.circuit_breaker import CircuitBreaker
+from utils.helpers import job_id_for_url, normalize_job_url
+from utils.rate_limiter import AdaptiveRateLimiter, RetryPolicy, call_with_retry
+from utils.scrape_cache import ScrapeCache
+from utils.scraper_backend import DESCRIPTION_FETCH_SITES, JobSpyBackend, ScraperBackend
 
 LogFn = Callable[[str], None]
 
+# How often the incremental scraper wakes up to check per-site timeouts
+_TIMEOUT_POLL_SECONDS = 0.5
+
+# Alternative spellings of the same place (lowercase) and the name queried
+# instead. Only applied to whole location terms.
+LOCATION_ALIASES: Dict[str, str] = {
+    "bangalore": "Bengaluru",
+    "bombay": "Mumbai",
+    "madras": "Chennai",
+    "calcutta": "Kolkata",
+    "gurgaon": "Gurugram",
+    "poona": "Pune",
+    "nyc": "New York",
+    "new york city": "New York",
+    "sf": "San Francisco",
+}
+
+# Listings per result page, used to estimate the requests of a query plan
+_SITE_PAGE_SIZE = {"linkedin": 25, "indeed": 100, "glassdoor": 30}
+
+# Job fields searched by the include/exclude keyword filters
+KEYWORD_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "all": ("title", "company", "location", "description"),
+    "title": ("title",),
+    "description": ("description",),
+}
+
+# Backend used when callers don't pass one; created on first use
+_default_backend: Optional[ScraperBackend] = None
+
+def _norm_term(s: str) -> str:
+    """Case- and whitespace-insensitive form of a search term."""
+    return " ".join(s.split()).lower()
+
+def canonical_location(location: str) -> str:
+    """The name a location is queried under, after LOCATION_ALIASES."""
+    return LOCATION_ALIASES.get(_norm_term(location), location)
+
 def _clean_csv_like_list(s: str) -> List[str]:
+    """Split on commas, collapse whitespace and drop case-insensitive repeats."""
     if not s:
         return []
-    parts = [p.strip() for p in s.split(",")]
-    return [p for p in parts if p]
-
-def _blob(job: Dict[str, Any]) -> str:
-    return (
-        f"{job.get('title','')} {job.get('company','')} {job.get('location','')} {job.get('description','')}"
-    ).lower()
+    out: List[str] = []
+    seen: Set[str] = set()
+    for part in s.split(","):
+        part = " ".join(part.split())
+        if part and _norm_term(part) not in seen:
+            seen.add(_norm_term(part))
+            out.append(part)
+    return out
 
 def _job_id_from_url(job_url: str) -> str:
-    return str(uuid.uuid5(uuid.NAMESPACE_URL, job_url))
+    """The ID the job is stored under, so in-run and stored dedupe agree."""
+    return job_id_for_url(normalize_job_url(job_url))
 
-def scrape_only(
+def _jobspy_country(country: str) -> str:
+    """Normalize a country name for JobSpy's country_indeed argument."""
+    c_code = (country or "").lower().strip()
+    if c_code in ["us", "united states"]: c_code = "usa"
+    if c_code in ["united kingdom"]: c_code = "uk"
+    # 'india' and others usually work as-is
+    return c_code
+
+def _get_backend(backend: Optional[ScraperBackend]) -> ScraperBackend:
+    """Return the given backend, or the shared live JobSpy backend."""
+    global _default_backend
+    if backend is not None:
+        return backend
+    if _default_backend is None:
+        _default_backend = JobSpyBackend()
+    return _default_backend
+
+def fetch_job_descriptions(
+    job_urls: Iterable[str], site: str, backend: Optional[ScraperBackend] = None
+) -> Dict[str, str]:
+    """
+    Fetch full descriptions for individual listings, one request per URL.
+    Only sites in DESCRIPTION_FETCH_SITES are supported; URLs that can't be
+    fetched are missing from the result.
+    """
+    if site not in DESCRIPTION_FETCH_SITES:
+        return {}
+    return _get_backend(backend).fetch_descriptions(job_urls, site)
+
+@dataclass
+class _FetchResult:
+    """Outcome of one per-site scrape call."""
+    df: Optional[pd.DataFrame]
+    known_skipped: int = 0  # rows dropped because their URL is already stored
+    cache_hit: bool = False
+    retries: int = 0
+    description_failures: int = 0  # description requests that failed after their retries
+    wall_seconds: float = 0.0  # Whole call, including rate-limit waits and retries
+
+def _fetch_listings(
+    *,
+    site: str,
+    title: str,
+    loc: str,
+    c_code: str,
+    results_per_site: int,
+    hours_old: int,
+    data_mode: str,
+    known_urls: Optional[Callable[[List[str]], Set[str]]],
+    backend: ScraperBackend,
+    cache: Optional[ScrapeCache],
+    limiter: Optional[AdaptiveRateLimiter],
+    retry: Optional[RetryPolicy],
+    log: LogFn,
+    deadline: Optional[float] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> _FetchResult:
+    """
+    Fetch stage: run one blocking backend call for a single site, or serve
+    it from the scrape cache. Live calls and each of their description
+    requests wait for the site's rate limiter; retryable failures are
+    retried with backoff, but no attempt or
+    description request starts after the deadline (time.monotonic()), when
+    the pipeline has already abandoned the call, or once should_stop
+    returns True. Description requests that still fail count against the
+    site's breaker, and stop once it opens. The DataFrame is None if the
+    call failed.
+    """
+    compact = data_mode == "compact"
+    two_phase = not compact and known_urls is not None and site in DESCRIPTION_FETCH_SITES
+    params = dict(
+        site_name=[site],
+        search_term=title,
+        location=loc,
+        results_wanted=results_per_site,
+        hours_old=hours_old,
+        linkedin_fetch_description=not compact and not two_phase,
+        country_indeed=c_code,
+    )
+
+    # Results of different backends (e.g. live vs. replayed) never mix in the cache
+    cache_key = dict(params, backend=backend.name)
+    df = cache.get(cache_key) if cache is not None else None
+    cache_hit = df is not None
+    retries = 0
+    if not cache_hit:
+        def on_retry(attempt: int, delay: float, error: Exception) -> None:
+            nonlocal retries
+            retries = attempt
+            log(f"Warning: {site} failed for '{title}' in '{loc}' ({error}), retry {attempt} in {delay:.1f}s")
+
+        try:
+            df = call_with_retry(
+                lambda: backend.scrape(params),
+                policy=retry,
+                limiter=limiter,
+                on_retry=on_retry,
+                deadline=deadline,
+            )
+        except Exception as e:
+            log(f"Warning: {site} scrape failed for '{title}' in '{loc}': {e}")
+            return _FetchResult(None, retries=retries)
+        if cache is not None and isinstance(df, pd.DataFrame):
+            cache.put(cache_key, df)
+
+    if not two_phase or not isinstance(df, pd.DataFrame) or df.empty or "job_url" not in df:
+        return _FetchResult(df, cache_hit=cache_hit, retries=retries)
+    if (deadline is not None and time.monotonic() >= deadline) or (should_stop is not None and should_stop()):
+        return _FetchResult(None, cache_hit=cache_hit, retries=retries)
+
+    # Phase 2: only pay for descriptions of listings we don't have yet
+    urls = df["job_url"].fillna("").astype(str).str.strip()
+    try:
+        known = known_urls([u for u in urls if u])
+    except Exception as e:
+        log(f"Warning: known-URL lookup failed, fetching all {site} descriptions: {e}")
+        known = set()
+    fresh = df[~urls.isin(known)].copy()
+    skipped = len(df) - len(fresh)
+
+    failures = 0
+    if not fresh.empty:
+        def on_description_retry(job_url: str, attempt: int, delay: float, error: Exception) -> None:
+            nonlocal retries
+            retries += 1
+            log(f"Warning: {site} description failed for {job_url} ({error}), retry {attempt} in {delay:.1f}s")
+
+        def on_description_error(job_url: str, error: Exception) -> None:
+            nonlocal failures
+            failures += 1
+            if breaker is not None and breaker.record_failure():
+                log(f"Warning: {site} failed repeatedly, circuit opened for {int(breaker.cooldown_seconds)}s")
+
+        def stop_descriptions() -> bool:
+            if should_stop is not None and should_stop():
+                return True
+            return breaker is not None and breaker.state == "open"
+
+        descriptions = backend.fetch_descriptions(
+            fresh["job_url"].astype(str).str.strip(), site,
+            deadline=deadline,
+            should_stop=stop_descriptions,
+            limiter=limiter,
+            retry=retry,
+            on_retry=on_description_retry,
+            on_error=on_description_error,
+        )
+        fetched = fresh["job_url"].astype(str).str.strip().map(descriptions)
+        if "description" in fresh:
+            fetched = fetched.fillna(fresh["description"])
+        fresh["description"] = fetched
+        log(f"{site}: {len(df)} listings, {skipped} already known, "
+            f"{len(descriptions)} descriptions fetched, {failures} failed")
+    return _FetchResult(fresh, known_skipped=skipped, cache_hit=cache_hit, retries=retries,
+                        description_failures=failures)
+
+def _text_column(df: pd.DataFrame, name: str, strip: bool = True) -> pd.Series:
+    """A column as strings, "" where missing or null."""
+    if name not in df:
+        return pd.Series("", index=df.index, dtype=object)
+    col = df[name].astype(object)
+    col = col.where(col.notna(), "").astype(str)
+    return col.str.strip() if strip else col
+
+def _bool_column(df: pd.DataFrame, name: str) -> pd.Series:
+    """A column as booleans, False where missing or null."""
+    if name not in df:
+        return pd.Series(False, index=df.index, dtype=bool)
+    col = df[name].astype(object)
+    return col.where(col.notna(), False).astype(bool)
+
+def _normalize_frame(df: pd.DataFrame, *, site: str, title: str, loc: str, data_mode: str) -> pd.DataFrame:
+    """
+    Normalize stage: turn a JobSpy DataFrame into job columns using
+    vectorized column operations. Rows without a URL or title are dropped.
+    """
+    job_url = _text_column(df, "job_url")
+    title_r = _text_column(df, "title")
+    valid = (job_url != "") & (title_r != "")
+    df, job_url, title_r = df[valid], job_url[valid], title_r[valid]
+
+    # Note: Description is stored in full (no truncation)
+    # This ensures complete job information is always available
+    description = _text_column(df, "description", strip=False)
+
+    source_site = _text_column(df, "site")
+    source_site = source_site.where(source_site != "", _text_column(df, "source"))
+    source_site = source_site.where(source_site != "", site)
+
+    # Compact mode: fetch the description lazily when the job is opened
+    lazy = data_mode == "compact" and site in DESCRIPTION_FETCH_SITES
+
+    return pd.DataFrame({
+        "id": job_url.map(_job_id_from_url),
+        "title": title_r,
+        "company": _text_column(df, "company"),
+        "location": _text_column(df, "location"),
+        "job_url": job_url,
+        "description": description,
+        "description_pending": (description == "") & lazy,
+        "is_remote": _bool_column(df, "is_remote"),
+        "date_posted": _text_column(df, "date_posted"),
+        "source_site": source_site,
+        "search_title": title,
+        "search_location": loc,
+    }, index=df.index)
+
+def _compile_keywords(keywords: List[str], whole_word: bool = False) -> Optional[Pattern[str]]:
+    """
+    Compile a keyword list into one case-insensitive alternation, so each
+    job is scanned once no matter how many keywords there are.
+    Whole-word matching uses lookarounds instead of \\b so terms such as
+    "c++" or ".net" still match.
+    """
+    terms = sorted({k.lower() for k in keywords if k}, key=len, reverse=True)
+    if not terms:
+        return None
+    pattern = "|".join(re.escape(k) for k in terms)
+    if whole_word:
+        pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+    return re.compile(pattern, re.IGNORECASE)
+
+def _keyword_mask(
+    jobs: pd.DataFrame,
+    include_re: Optional[Pattern[str]],
+    exclude_re: Optional[Pattern[str]],
+    fields: Tuple[str, ...] = KEYWORD_FIELDS["all"],
+) -> pd.Series:
+    """
+    Filter stage: boolean mask of jobs passing the compiled include/exclude keywords.
+    Descriptions still pending (compact mode) are skipped: such jobs are
+    matched on their other fields for exclude keywords, and always pass the
+    include keywords, since a description we haven't fetched can't rule them out.
+    """
+    mask = pd.Series(True, index=jobs.index)
+    if include_re is None and exclude_re is None:
+        return mask
+
+    blob = jobs[fields[0]]
+    for field in fields[1:]:
+        blob = blob + " " + jobs[field]
+
+    # Exclude keywords
+    if exclude_re is not None:
+        mask &= ~blob.str.contains(exclude_re)
+
+    # Include keywords
+    if include_re is not None:
+        matched = blob.str.contains(include_re)
+        if "description" in fields and "description_pending" in jobs:
+            matched |= jobs["description_pending"]
+        mask &= matched
+
+    return mask
+
+@dataclass
+class _QueryPlan:
+    """Deduplicated, ordered query grid of one scrape run."""
+    titles: List[str]
+    locations: List[str]
+    queries: List[Tuple[int, int, str, str]]  # (title index, location index, title, location)
+    notes: List[str]  # What the planner merged or dropped
+    calls: int  # scrape_jobs calls: queries x sites
+    page_requests: int  # Estimated listing page requests
+    description_requests: int  # Upper bound of per-listing description requests
+
+def _plan_queries(
+    titles: List[str],
+    locations: List[str],
+    sites: List[str],
+    *,
+    results_per_site: int,
+    data_mode: str,
+    query_yield: Optional[Callable[[str, str, str], float]] = None,
+) -> _QueryPlan:
+    """
+    Query planning stage: turn the title x location grid into the smallest
+    set of calls that covers it.
+    
+    - Locations are mapped through LOCATION_ALIASES and deduplicated.
+    - Titles are kept as given (already deduplicated case- and
+      whitespace-insensitively). A title is never dropped for containing
+      another title's words: results are capped at results_per_site, so
+      "java" doesn't return all of "java developer"'s jobs.
+    - Queries are ordered by their total expected yield over all sites.
+    """
+    notes: List[str] = []
+
+    planned_locations: List[str] = []
+    seen_locations: Set[str] = set()
+    for loc in locations:
+        canonical = canonical_location(loc)
+        if canonical != loc:
+            notes.append(f"location '{loc}' → '{canonical}'")
+        if _norm_term(canonical) in seen_locations:
+            notes.append(f"dropped duplicate location '{loc}'")
+            continue
+        seen_locations.add(_norm_term(canonical))
+        planned_locations.append(canonical)
+
+    planned_titles = list(titles)
+
+    queries = [
+        (t_i, l_i, title, loc)
+        for t_i, title in enumerate(planned_titles, start=1)
+        for l_i, loc in enumerate(planned_locations, start=1)
+    ]
+    if query_yield is not None:
+        queries.sort(key=lambda q: -sum(query_yield(site, q[2], q[3]) for site in sites))
+
+    pages = sum(-(-results_per_site // _SITE_PAGE_SIZE.get(site, 25)) for site in sites)
+    described = sum(results_per_site for site in sites if site in DESCRIPTION_FETCH_SITES)
+    return _QueryPlan(
+        titles=planned_titles,
+        locations=planned_locations,
+        queries=queries,
+        notes=notes,
+        calls=len(queries) * len(sites),
+        page_requests=len(queries) * pages,
+        description_requests=len(queries) * described if data_mode == "full" else 0,
+    )
+
+def iter_jobs(
     *,
     sites: List[str],
     titles_csv: str,
     locations_csv: str,
-    country: str = "india",  # <--- FIXED: Added country argument here
+    country: str = "india",
     include_keywords_csv: str,
     exclude_keywords_csv: str,
     results_per_site: int,
     hours_old: int,
     data_mode: str,  # "compact" | "full"
     log: LogFn,
-) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    stats: Optional[Dict[str, int]] = None,
+    on_progress: Optional[Callable[[int, int, str], None]] = None,
+    max_workers: int = 1,
+    site_workers: Optional[Dict[str, int]] = None,
+    site_timeouts: Optional[Dict[str, float]] = None,
+    known_urls: Optional[Callable[[List[str]], Set[str]]] = None,
+    keyword_fields: str = "all",
+    keyword_whole_word: bool = False,
+    cache: Optional[ScrapeCache] = None,
+    hours_old_for: Optional[Callable[[str, str, str], int]] = None,
+    on_query_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    rate_limiters: Optional[Dict[str, AdaptiveRateLimiter]] = None,
+    retry: Optional[RetryPolicy] = None,
+    breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    budget_met: Optional[Callable[[], bool]] = None,
+    query_yield: Optional[Callable[[str, str, str], float]] = None,
+    backend: Optional[ScraperBackend] = None,
+    on_poll: Optional[Callable[[], None]] = None,
+) -> Iterator[Dict[str, Any]]:
     """
-    Scrapes jobs and returns normalized job dicts + stats.
-    No AI calls here.
+    Streaming scrape pipeline: query → fetch → normalize → filter → sink.
+    
+    The query stage plans the title x location grid first (see
+    _plan_queries): repeated and aliased terms are merged and the plan
+    with its estimated cost is logged before any call is made.
+    
+    Yields normalized job dicts that passed the keyword filters; the caller
+    is the sink. Every (title, location) query is split into one JobSpy call
+    per site. Each call runs on its own thread, with at most the site's
+    worker limit in flight per site, and is timed from when it is
+    submitted. A call that exceeds its site's timeout is abandoned: its
+    thread no longer counts against the limit, so the next call starts at
+    once and a hanging portal can't stall the run or hold back the others.
+    
+    The pipeline applies backpressure: a site only gets its next call once
+    the consumer has taken the rows of a previous one, so at most one
+    DataFrame per worker is held in memory. Normalization, filtering and the
+    progress callback run on the consuming thread.
+    
+    When known_urls is given, sites in DESCRIPTION_FETCH_SITES are scraped
+    in two phases: listings are fetched without descriptions, URLs already
+    stored are dropped, and descriptions are fetched only for the new ones.
+    
+    In "compact" data mode (opt-in; "full" is the default) those
+    per-listing description requests are skipped entirely; such jobs are
+    marked with description_pending=True so the description can be fetched
+    later, when someone opens the job, and keyword filters skip their
+    description (see _keyword_mask).
+    
+    Include/exclude keywords are compiled once per run into a single regex
+    each, optionally matching whole words only and only in the fields
+    selected by keyword_fields (see KEYWORD_FIELDS).
+    
+    With a cache, raw JobSpy results are reused for identical calls within
+    the cache's TTL instead of hitting the portal again.
+    
+    hours_old_for lets the caller narrow the time window per (site, title,
+    location), e.g. to the gap since the last successful scrape (delta
+    scraping). on_query_done receives one event per finished per-site call,
+    after the consumer has taken all of its jobs: site, title, location,
+    hours_old, results_wanted, started_at (UTC), ok, cache_hit, timed_out, wall_seconds and
+    the row counts raw, filtered, repeated (seen earlier in the run),
+    known_skipped (two-phase) and kept.
+    
+    rate_limiters pace the live JobSpy calls of each site and their
+    per-listing description requests; a request that fails
+    with a retryable error (429, timeout, connection error) is retried
+    according to retry, and throttling signals - including calls abandoned
+    for exceeding the site timeout - slow that site's limiter down. The site
+    timeout covers the whole call, rate-limit waits, retries and per-listing
+    description requests included: an abandoned call sends no further
+    requests, and neither do calls still running when the run stops.
+    
+    breakers hold one circuit breaker per site. While a site's breaker is
+    open its remaining calls are parked instead of submitted; they resume
+    when the breaker lets a probe through, or are skipped once every other
+    site has finished, so a failing portal never holds back healthy ones.
+    Description requests that fail after their retries count as failures
+    too, and a call stops sending them once its site's breaker opens.
+    
+    is_cancelled is polled before every per-site call is submitted and
+    between finished calls. Once it returns True no further calls are sent,
+    calls in flight are abandoned and the generator returns with
+    stats["cancelled"] set; jobs already yielded are unaffected.
+    budget_met is polled the same way and stops the run with
+    stats["budget_met"] set, e.g. once enough new jobs were saved.
+    
+    query_yield scores each (site, title, location) call by the new jobs it
+    is expected to find; every site runs its calls highest score first, so
+    a budget is met with as few calls as possible.
+    
+    on_poll runs on the consuming thread at every turn of the wait loop,
+    at least every _TIMEOUT_POLL_SECONDS while calls are in flight, so the
+    sink can flush buffered jobs on a timer rather than only when the
+    next job arrives.
+    
+    Args:
+        stats: Optional dict updated in place with raw_total, kept_total,
+            filtered_out, timed_out, known_skipped, cache_hits, cache_misses,
+            retries, circuit_skipped, cancelled, budget_met
+        on_progress: Optional callback for progress updates: (completed_queries, total_queries, site_progress)
+        max_workers: Default number of concurrent calls per site (1 = serial)
+        site_workers: Optional per-site override of max_workers
+        site_timeouts: Optional per-site timeout in seconds for a single call
+        known_urls: Optional lookup returning the subset of the given job URLs
+            that are already stored. Called from the call threads.
+        keyword_fields: Which fields the keyword filters search: "all", "title" or "description"
+        keyword_whole_word: Match keywords as whole words only
+        cache: Optional on-disk cache of raw per-site results
+        hours_old_for: Optional per-call hours_old: (site, title, location) -> hours,
+            capped at hours_old
+        on_query_done: Optional callback receiving an event dict per finished call
+        rate_limiters: Optional per-site rate limiters, shared across runs
+        retry: Optional retry policy for failed calls (default: no retries)
+        breakers: Optional per-site circuit breakers, shared across runs
+        is_cancelled: Optional cancellation token: returns True once the run should stop
+        budget_met: Optional check returning True once the run's budget is used up
+        query_yield: Optional expected yield of a call: (site, title, location) -> score
+        backend: Optional source of raw listings (default: live JobSpy)
+        on_poll: Optional callback run at every turn of the wait loop
     """
     titles = _clean_csv_like_list(titles_csv)
     locations = _clean_csv_like_list(locations_csv)
-    include_kw = [k.lower() for k in _clean_csv_like_list(include_keywords_csv)]
-    exclude_kw = [k.lower() for k in _clean_csv_like_list(exclude_keywords_csv)]
+    include_re = _compile_keywords(_clean_csv_like_list(include_keywords_csv), keyword_whole_word)
+    exclude_re = _compile_keywords(_clean_csv_like_list(exclude_keywords_csv), keyword_whole_word)
 
     # Hard guardrails
     results_per_site = max(5, min(int(results_per_site or 20), 100))
     hours_old = max(1, min(int(hours_old or 72), 24 * 30))  # up to 30 days
-    data_mode = "full" if data_mode == "full" else "compact"
+    data_mode = "compact" if data_mode == "compact" else "full"
+    match_fields = KEYWORD_FIELDS.get(keyword_fields, KEYWORD_FIELDS["all"])
 
     if not titles:
         raise ValueError("Titles are empty. Provide at least one title.")
@@ -62,97 +546,361 @@ def scrape_only(
     if not sites:
         sites = ["linkedin"]
 
-    log(f"Scrape plan: titles={len(titles)}, locations={len(locations)}, sites={len(sites)}, country={country}")
-    log("Scraping...")
+    if stats is None:
+        stats = {}
+    stats.update(
+        raw_total=0, kept_total=0, filtered_out=0, timed_out=0, known_skipped=0,
+        cache_hits=0, cache_misses=0, retries=0, circuit_skipped=0, cancelled=False,
+        budget_met=False,
+    )
+    rate_limiters = rate_limiters or {}
+    breakers = breakers or {}
+
+    # Query stage
+    plan = _plan_queries(
+        titles, locations, sites,
+        results_per_site=results_per_site, data_mode=data_mode, query_yield=query_yield,
+    )
+    titles, locations, queries = plan.titles, plan.locations, plan.queries
+    total_queries = len(queries)
+    completed_queries = 0
+
+    site_workers = site_workers or {}
+    site_timeouts = site_timeouts or {}
+    limits = {
+        site: max(1, min(int(site_workers.get(site, max_workers) or 1), total_queries))
+        for site in sites
+    }
 
-    raw_total = 0
-    kept_total = 0
-    filtered_out = 0
+    workers_str = ", ".join(f"{site}={limits[site]}" for site in sites)
+    for note in plan.notes:
+        log(f"Query plan: {note}")
+    cost = f"~{plan.page_requests} page requests"
+    if plan.description_requests:
+        cost += f" + up to {plan.description_requests} description requests"
+    log(
+        f"Scrape plan: titles={len(titles)}, locations={len(locations)}, sites={len(sites)}, "
+        f"calls={plan.calls} ({cost}), country={country}, workers: {workers_str}"
+    )
+    log("Scraping with real-time updates...")
 
-    out: List[Dict[str, Any]] = []
+    c_code = _jobspy_country(country)
+    backend = _get_backend(backend)
     seen_ids: set[str] = set()
 
-    # Normalize country for JobSpy
-    c_code = country.lower().strip()
-    if c_code in ["us", "united states"]: c_code = "usa"
-    if c_code in ["united kingdom"]: c_code = "uk"
-    # 'india' and others usually work as-is
-
-    for t_i, title in enumerate(titles, start=1):
-        for l_i, loc in enumerate(locations, start=1):
-            log(f"Query {t_i}/{len(titles)} · {l_i}/{len(locations)} → '{title}' in '{loc}'")
-            try:
-                df = scrape_jobs(
-                    site_name=sites,
-                    search_term=title,
-                    location=loc,
-                    results_wanted=results_per_site,
-                    hours_old=hours_old,
-                    linkedin_fetch_description=True,
-                    country_indeed=c_code, # <--- PASSING IT HERE
-                    verbose=0,
-                )
-            except Exception as e:
-                log(f"Warning: scrape failed for '{title}' in '{loc}': {e}")
-                continue
-
-            if not isinstance(df, pd.DataFrame) or df.empty:
-                continue
-
-            raw_total += len(df)
-            rows = df.to_dict(orient="records")
-
-            for r in rows:
-                job_url = str(r.get("job_url") or "").strip()
-                title_r = str(r.get("title") or "").strip()
-                if not job_url or not title_r:
-                    filtered_out += 1
-                    continue
-
-                jid = _job_id_from_url(job_url)
-                if jid in seen_ids:
-                    continue
-                seen_ids.add(jid)
-
-                # Normalize
-                job = {
-                    "id": jid,
-                    "title": title_r,
-                    "company": str(r.get("company") or "").strip(),
-                    "location": str(r.get("location") or "").strip(),
-                    "job_url": job_url,
-                    "description": str(r.get("description") or ""),
-                    "is_remote": bool(r.get("is_remote") or False),
-                    "date_posted": str(r.get("date_posted") or "").strip(),
-                    "source_site": str(r.get("site") or r.get("source") or "").strip() or "",
-                    "search_title": title,
-                    "search_location": loc,
-                }
-
-                # Note: Description is stored in full (no truncation)
-                # This ensures complete job information is always available
-
-                blob = _blob(job)
-
-                # Exclude keywords
-                if exclude_kw and any(k in blob for k in exclude_kw):
-                    filtered_out += 1
-                    continue
-
-                # Include keywords
-                if include_kw and not any(k in blob for k in include_kw):
-                    filtered_out += 1
-                    continue
-
-                kept_total += 1
-                out.append(job)
-
-    stats = {
-        "raw_total": raw_total,
-        "kept_total": kept_total,
-        "filtered_out": filtered_out,
+    # Per-site and per-query completion counters for progress reporting
+    site_done = {site: 0 for site in sites}
+    query_pending = {(t_i, l_i): len(sites) for t_i, l_i, _, _ in queries}
+    # Calls not yet submitted, per site (backpressure)
+    backlog: Dict[str, Deque[Tuple[int, int, str, str, str]]] = {
+        site: deque((t_i, l_i, title, loc, site) for t_i, l_i, title, loc in queries)
+        for site in sites
     }
-    log(f"Scrape done. Raw={raw_total}, Kept={kept_total}, FilteredOut={filtered_out}")
+    if query_yield is not None:
+        # Most productive calls first (stable, so ties keep the grid order)
+        for site in sites:
+            backlog[site] = deque(sorted(backlog[site], key=lambda task: -query_yield(site, task[2], task[3])))
+    # Monotonic and wall-clock submission time of each call
+    started: Dict[Tuple[int, int, str], Tuple[float, datetime]] = {}
+    # Effective hours_old of each submitted call
+    call_hours: Dict[Tuple[int, int, str], int] = {}
+    # Submitted calls not yet finished or abandoned, per site
+    inflight = {site: 0 for site in sites}
+    # Sites whose backlog waits for an open circuit breaker
+    parked: Set[str] = set()
+    # Submitted calls that are their site's half-open probe
+    probes: Set[Tuple[int, int, str, str, str]] = set()
+    # Set once the run stops; running calls send no further description requests
+    halted = threading.Event()
+
+    def site_progress() -> str:
+        return ", ".join(f"{site} {site_done[site]}/{total_queries}" for site in sites)
+
+    def fetch(t_i: int, l_i: int, title: str, loc: str, site: str) -> _FetchResult:
+        """Executed on the call's own thread."""
+        timeout = site_timeouts.get(site)
+        deadline = started[(t_i, l_i, site)][0] + timeout if timeout else None
+        hours = call_hours[(t_i, l_i, site)]
+        window = f" (last {hours}h)" if hours != hours_old else ""
+        log(f"Query {t_i}/{len(titles)} · {l_i}/{len(locations)} → '{title}' in '{loc}' via {site}{window}")
+        result = _fetch_listings(
+            site=site,
+            title=title,
+            loc=loc,
+            c_code=c_code,
+            results_per_site=results_per_site,
+            hours_old=hours,
+            data_mode=data_mode,
+            known_urls=known_urls,
+            backend=backend,
+            cache=cache,
+            limiter=rate_limiters.get(site),
+            retry=retry,
+            log=log,
+            deadline=deadline,
+            should_stop=halted.is_set,
+            breaker=breakers.get(site),
+        )
+        result.wall_seconds = time.monotonic() - started[(t_i, l_i, site)][0]
+        return result
+
+    def start_call(task: Tuple[int, int, str, str, str]) -> Future:
+        """Run a call on a new daemon thread, so an abandoned call holds no worker slot."""
+        future: Future = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fetch(*task))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"scrape-{task[4]}", daemon=True).start()
+        return future
+
+    def stopping() -> bool:
+        """Check the cancellation token and the budget; True once the run should stop."""
+        if stats["cancelled"] or stats["budget_met"]:
+            return True
+        if is_cancelled is not None and is_cancelled():
+            stats["cancelled"] = True
+            log("Cancellation requested, stopping after the current queries")
+        elif budget_met is not None and budget_met():
+            stats["budget_met"] = True
+            log("Budget reached, stopping early")
+        if stats["cancelled"] or stats["budget_met"]:
+            halted.set()
+        return stats["cancelled"] or stats["budget_met"]
+
+    def fill(site: str) -> None:
+        """Submit backlog calls for a site up to its worker limit, unless its breaker is open."""
+        while backlog[site] and inflight[site] < limits[site]:
+            if stopping():
+                return
+            breaker = breakers.get(site)
+            if breaker is not None and not breaker.allow():
+                if site not in parked and breaker.state == "open":
+                    log(f"Warning: {site} circuit open, pausing its remaining queries")
+                parked.add(site)
+                return
+            if site in parked:
+                log(f"Probing {site} again")
+                parked.discard(site)
+            task = backlog[site].popleft()
+            if breaker is not None and breaker.state == "half_open":
+                probes.add(task)
+            t_i, l_i, title, loc, _ = task
+            hours = hours_old_for(site, title, loc) if hours_old_for else hours_old
+            call_hours[(t_i, l_i, site)] = max(1, min(int(hours or hours_old), hours_old))
+            started[(t_i, l_i, site)] = (time.monotonic(), datetime.now(timezone.utc))
+            futures[start_call(task)] = task
+            inflight[site] += 1
+
+    def record_outcome(
+        task: Tuple[int, int, str, str, str],
+        ok: bool,
+        cache_hit: bool = False,
+        description_failures: int = 0,
+    ) -> None:
+        site = task[4]
+        probes.discard(task)
+        breaker = breakers.get(site)
+        if breaker is None:
+            return
+        # Failed description requests were already counted by the call
+        if cache_hit or (ok and description_failures):
+            breaker.release()
+        elif ok:
+            breaker.record_success()
+        elif breaker.record_failure():
+            log(f"Warning: {site} failed repeatedly, circuit opened for {int(breaker.cooldown_seconds)}s")
+
+    def query_done(
+        task: Tuple[int, int, str, str, str],
+        ok: bool,
+        cache_hit: bool = False,
+        timed_out: bool = False,
+        wall_seconds: float = 0.0,
+        counts: Optional[Dict[str, int]] = None,
+    ) -> None:
+        if not on_query_done:
+            return
+        t_i, l_i, title, loc, site = task
+        counts = counts or {}
+        on_query_done({
+            "site": site,
+            "title": title,
+            "location": loc,
+            "hours_old": call_hours[(t_i, l_i, site)],
+            "results_wanted": results_per_site,
+            "started_at": started[(t_i, l_i, site)][1],
+            "ok": ok,
+            "cache_hit": cache_hit,
+            "timed_out": timed_out,
+            "wall_seconds": wall_seconds,
+            "raw": counts.get("raw", 0),
+            "filtered": counts.get("filtered", 0),
+            "repeated": counts.get("repeated", 0),
+            "known_skipped": counts.get("known_skipped", 0),
+            "kept": counts.get("kept", 0),
+        })
+
+    def finish(task: Tuple[int, int, str, str, str]) -> None:
+        """Account for a finished (or abandoned) call."""
+        nonlocal completed_queries
+        t_i, l_i, _, _, site = task
+
+        site_done[site] += 1
+        query_pending[(t_i, l_i)] -= 1
+        if query_pending[(t_i, l_i)] == 0:
+            completed_queries += 1
+        if on_progress:
+            on_progress(completed_queries, total_queries, site_progress())
+
+    # Report that nothing has completed yet
+    if on_progress:
+        on_progress(0, total_queries, site_progress())
+
+    futures: Dict[Future, Tuple[int, int, str, str, str]] = {}
+    try:
+        for site in sites:
+            fill(site)
+
+        while futures or parked:
+            if stopping():
+                break
+            for site in list(parked):
+                fill(site)
+            if not futures:
+                # Only parked sites are left; don't wait out their cooldown
+                for site in sorted(parked):
+                    log(f"Skipping {len(backlog[site])} remaining {site} queries (circuit open)")
+                    while backlog[site]:
+                        stats["circuit_skipped"] += 1
+                        finish(backlog[site].popleft())
+                parked.clear()
+                break
+
+            done, _ = wait(list(futures), timeout=_TIMEOUT_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            if on_poll is not None:
+                on_poll()
+
+            # Abandon calls that exceeded their site's timeout. The thread
+            # can't be interrupted, but it stops at its deadline where it can
+            # and its result will be discarded.
+            now = time.monotonic()
+            for future in [f for f in futures if f not in done]:
+                t_i, l_i, title, loc, site = task = futures[future]
+                timeout = site_timeouts.get(site)
+                began = started[(t_i, l_i, site)]
+                if timeout and now - began[0] > timeout:
+                    del futures[future]
+                    inflight[site] -= 1
+                    stats["timed_out"] += 1
+                    log(f"Warning: {site} timed out after {int(timeout)}s for '{title}' in '{loc}'")
+                    if site in rate_limiters:
+                        rate_limiters[site].on_throttle()
+                    record_outcome(task, ok=False)
+                    finish(task)
+                    query_done(task, ok=False, timed_out=True, wall_seconds=now - began[0])
+                    fill(site)
+
+            for future in done:
+                task = futures.pop(future)
+                _, _, title, loc, site = task
+                inflight[site] -= 1
+                result = future.result()
+                df = result.df
+                record_outcome(task, ok=df is not None, cache_hit=result.cache_hit,
+                               description_failures=result.description_failures)
+                finish(task)
+
+                if cache is not None:
+                    stats["cache_hits" if result.cache_hit else "cache_misses"] += 1
+                stats["retries"] += result.retries
+                stats["raw_total"] += result.known_skipped
+                stats["known_skipped"] += result.known_skipped
+                # Per-call counts for on_query_done
+                counts = dict(raw=result.known_skipped, filtered=0, repeated=0,
+                              known_skipped=result.known_skipped, kept=0)
+                if isinstance(df, pd.DataFrame) and not df.empty:
+                    stats["raw_total"] += len(df)
+                    counts["raw"] += len(df)
+
+                    # Normalize stage
+                    jobs = _normalize_frame(df, site=site, title=title, loc=loc, data_mode=data_mode)
+                    counts["filtered"] += len(df) - len(jobs)
+
+                    # Skip jobs already seen in this run (other queries or sites)
+                    fresh = ~jobs["id"].isin(seen_ids) & ~jobs["id"].duplicated()
+                    counts["repeated"] = int((~fresh).sum())
+                    jobs = jobs[fresh]
+                    seen_ids.update(jobs["id"])
+
+                    # Filter stage
+                    keep = _keyword_mask(jobs, include_re, exclude_re, match_fields)
+                    counts["filtered"] += int((~keep).sum())
+                    stats["filtered_out"] += counts["filtered"]
+
+                    # Only rows that survived the filters become dicts
+                    for job in jobs[keep].to_dict(orient="records"):
+                        stats["kept_total"] += 1
+                        counts["kept"] += 1
+                        yield job
+
+                query_done(task, ok=df is not None, cache_hit=result.cache_hit,
+                           wall_seconds=result.wall_seconds, counts=counts)
+
+                # The consumer has drained this call; let the site fetch the next one
+                del df
+                fill(site)
+    finally:
+        # Calls still running stop sending description requests
+        halted.set()
+        # Probes abandoned by a cancelled or budget-stopped run never report
+        # back; hand them back so the shared breaker can probe again
+        for task in probes:
+            breakers[task[4]].release()
+
+def scrape_only(
+    *,
+    sites: List[str],
+    titles_csv: str,
+    locations_csv: str,
+    country: str = "india",
+    include_keywords_csv: str,
+    exclude_keywords_csv: str,
+    results_per_site: int,
+    hours_old: int,
+    data_mode: str,  # "compact" | "full"
+    log: LogFn,
+    max_workers: int = 1,
+    keyword_fields: str = "all",
+    keyword_whole_word: bool = False,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Scrapes jobs and returns normalized job dicts + stats.
+    No AI calls here.
+    """
+    stats: Dict[str, int] = {}
+    out = list(iter_jobs(
+        sites=sites,
+        titles_csv=titles_csv,
+        locations_csv=locations_csv,
+        country=country,
+        include_keywords_csv=include_keywords_csv,
+        exclude_keywords_csv=exclude_keywords_csv,
+        results_per_site=results_per_site,
+        hours_old=hours_old,
+        data_mode=data_mode,
+        log=log,
+        stats=stats,
+        max_workers=max_workers,
+        keyword_fields=keyword_fields,
+        keyword_whole_word=keyword_whole_word,
+    ))
+    log(f"Scrape done. Raw={stats['raw_total']}, Kept={stats['kept_total']}, FilteredOut={stats['filtered_out']}")
     return out, stats
 
 def scrape_jobs_incremental(
@@ -169,134 +917,101 @@ def scrape_jobs_incremental(
     log: LogFn,
     on_job_found: Callable[[Dict[str, Any]], bool],
     on_progress: Optional[Callable[[int, int, str], None]] = None,
+    max_workers: int = 1,
+    site_workers: Optional[Dict[str, int]] = None,
+    site_timeouts: Optional[Dict[str, float]] = None,
+    known_urls: Optional[Callable[[List[str]], Set[str]]] = None,
+    keyword_fields: str = "all",
+    keyword_whole_word: bool = False,
+    cache: Optional[ScrapeCache] = None,
+    hours_old_for: Optional[Callable[[str, str, str], int]] = None,
+    on_query_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    rate_limiters: Optional[Dict[str, AdaptiveRateLimiter]] = None,
+    retry: Optional[RetryPolicy] = None,
+    breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    budget_met: Optional[Callable[[], bool]] = None,
+    query_yield: Optional[Callable[[str, str, str], float]] = None,
+    backend: Optional[ScraperBackend] = None,
+    on_poll: Optional[Callable[[], None]] = None,
+    saved_count: Optional[Callable[[], int]] = None,
 ) -> Dict[str, int]:
     """
     Scrapes jobs and calls on_job_found callback for each discovered job.
     Enables incremental saving for real-time UI updates.
+    See iter_jobs for the concurrency, two-phase and compact-mode behaviour.
     
     Args:
         on_job_found: Callback function that receives a job dict and returns True if new, False if duplicate
-        on_progress: Optional callback for progress updates: (current_query, total_queries, current_site)
+        on_progress: Optional callback for progress updates: (completed_queries, total_queries, site_progress)
+        max_workers: Default number of concurrent calls per site (1 = serial)
+        site_workers: Optional per-site override of max_workers
+        site_timeouts: Optional per-site timeout in seconds for a single call
+        known_urls: Optional lookup returning the subset of the given job URLs
+            that are already stored. Called from the call threads.
+        keyword_fields: Which fields the keyword filters search: "all", "title" or "description"
+        keyword_whole_word: Match keywords as whole words only
+        cache: Optional on-disk cache of raw per-site results
+        hours_old_for: Optional per-call hours_old: (site, title, location) -> hours
+        on_query_done: Optional callback receiving an event dict per finished call
+        rate_limiters: Optional per-site rate limiters, shared across runs
+        retry: Optional retry policy for failed calls (default: no retries)
+        breakers: Optional per-site circuit breakers, shared across runs
+        is_cancelled: Optional cancellation token: returns True once the run should stop
+        budget_met: Optional check returning True once the run's budget is used up
+        query_yield: Optional expected yield of a call: (site, title, location) -> score
+        backend: Optional source of raw listings (default: live JobSpy)
+        on_poll: Optional callback run at every turn of the wait loop, e.g. to flush
+            jobs that on_job_found buffered
+        saved_count: Optional count of jobs actually saved, for sinks that only know
+            it after a flush; used for kept_total instead of on_job_found's answers
     
     Returns:
-        Stats dict with raw_total, kept_total, filtered_out
+        Stats dict with raw_total, kept_total, filtered_out, timed_out, known_skipped,
+        cache_hits, cache_misses, retries, circuit_skipped, cancelled, budget_met
     """
-    titles = _clean_csv_like_list(titles_csv)
-    locations = _clean_csv_like_list(locations_csv)
-    include_kw = [k.lower() for k in _clean_csv_like_list(include_keywords_csv)]
-    exclude_kw = [k.lower() for k in _clean_csv_like_list(exclude_keywords_csv)]
-
-    # Hard guardrails
-    results_per_site = max(5, min(int(results_per_site or 20), 100))
-    hours_old = max(1, min(int(hours_old or 72), 24 * 30))
-    data_mode = "full" if data_mode == "full" else "compact"
-
-    if not titles:
-        raise ValueError("Titles are empty. Provide at least one title.")
-    if not locations:
-        raise ValueError("Locations are empty. Provide at least one location.")
-    if not sites:
-        sites = ["linkedin"]
-
-    total_queries = len(titles) * len(locations)
-    current_query = 0
-
-    log(f"Scrape plan: titles={len(titles)}, locations={len(locations)}, sites={len(sites)}, country={country}")
-    log("Scraping with real-time updates...")
-
-    raw_total = 0
+    stats: Dict[str, int] = {}
     kept_total = 0
-    filtered_out = 0
-    seen_ids: set[str] = set()
-
-    # Normalize country for JobSpy
-    c_code = country.lower().strip()
-    if c_code in ["us", "united states"]: c_code = "usa"
-    if c_code in ["united kingdom"]: c_code = "uk"
-
-    for t_i, title in enumerate(titles, start=1):
-        for l_i, loc in enumerate(locations, start=1):
-            current_query += 1
-            # Show all sites being scraped (JobSpy scrapes all sites simultaneously)
-            current_site = ", ".join(sites) if sites else ""
-            
-            # Report progress before scraping
-            if on_progress:
-                on_progress(current_query, total_queries, current_site)
-            
-            log(f"Query {t_i}/{len(titles)} · {l_i}/{len(locations)} → '{title}' in '{loc}' via {current_site}")
-            try:
-                df = scrape_jobs(
-                    site_name=sites,
-                    search_term=title,
-                    location=loc,
-                    results_wanted=results_per_site,
-                    hours_old=hours_old,
-                    linkedin_fetch_description=True,
-                    country_indeed=c_code,
-                    verbose=0,
-                )
-            except Exception as e:
-                log(f"Warning: scrape failed for '{title}' in '{loc}': {e}")
-                continue
-
-            if not isinstance(df, pd.DataFrame) or df.empty:
-                continue
-
-            raw_total += len(df)
-            rows = df.to_dict(orient="records")
-
-            for r in rows:
-                job_url = str(r.get("job_url") or "").strip()
-                title_r = str(r.get("title") or "").strip()
-                if not job_url or not title_r:
-                    filtered_out += 1
-                    continue
-
-                jid = _job_id_from_url(job_url)
-                if jid in seen_ids:
-                    continue
-                seen_ids.add(jid)
-
-                # Normalize job data
-                job = {
-                    "id": jid,
-                    "title": title_r,
-                    "company": str(r.get("company") or "").strip(),
-                    "location": str(r.get("location") or "").strip(),
-                    "job_url": job_url,
-                    "description": str(r.get("description") or ""),
-                    "is_remote": bool(r.get("is_remote") or False),
-                    "date_posted": str(r.get("date_posted") or "").strip(),
-                    "source_site": str(r.get("site") or r.get("source") or "").strip() or "",
-                    "search_title": title,
-                    "search_location": loc,
-                }
-
-                # Note: Description is stored in full (no truncation)
-                # This ensures complete job information is always available
-
-                blob = _blob(job)
-
-                # Exclude keywords
-                if exclude_kw and any(k in blob for k in exclude_kw):
-                    filtered_out += 1
-                    continue
-
-                # Include keywords
-                if include_kw and not any(k in blob for k in include_kw):
-                    filtered_out += 1
-                    continue
-
-                # Call the callback to save immediately
-                is_new = on_job_found(job)
-                if is_new:
-                    kept_total += 1
-
-    stats = {
-        "raw_total": raw_total,
-        "kept_total": kept_total,
-        "filtered_out": filtered_out,
-    }
-    log(f"Scrape done. Raw={raw_total}, Kept={kept_total}, FilteredOut={filtered_out}")
+    for job in iter_jobs(
+        sites=sites,
+        titles_csv=titles_csv,
+        locations_csv=locations_csv,
+        country=country,
+        include_keywords_csv=include_keywords_csv,
+        exclude_keywords_csv=exclude_keywords_csv,
+        results_per_site=results_per_site,
+        hours_old=hours_old,
+        data_mode=data_mode,
+        log=log,
+        stats=stats,
+        on_progress=on_progress,
+        max_workers=max_workers,
+        site_workers=site_workers,
+        site_timeouts=site_timeouts,
+        known_urls=known_urls,
+        keyword_fields=keyword_fields,
+        keyword_whole_word=keyword_whole_word,
+        cache=cache,
+        hours_old_for=hours_old_for,
+        on_query_done=on_query_done,
+        rate_limiters=rate_limiters,
+        retry=retry,
+        breakers=breakers,
+        is_cancelled=is_cancelled,
+        budget_met=budget_met,
+        query_yield=query_yield,
+        backend=backend,
+        on_poll=on_poll,
+    ):
+        # Call the callback to save immediately
+        if on_job_found(job):
+            kept_total += 1
+
+    stats["kept_total"] = saved_count() if saved_count is not None else kept_total
+    log(
+        f"Scrape done. Raw={stats['raw_total']}, Kept={stats['kept_total']}, FilteredOut={stats['filtered_out']}, "
+        f"TimedOut={stats['timed_out']}, KnownSkipped={stats['known_skipped']}, "
+        f"CacheHits={stats['cache_hits']}, Retries={stats['retries']}, "
+        f"CircuitSkipped={stats['circuit_skipped']}"
+    )
     return stats
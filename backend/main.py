@@ -21,6 +21,15 @@ from database import init_db
 # Import routers
 from routes import jobs_router, search_router, settings_router
 
+# Import scrape queue (resumed on startup)
+from services.scrape_queue import scrape_queue
+
+# Import job URL index (loaded in the background on startup)
+from services.url_index import url_index
+
+# Import database writer (drained on shutdown)
+from services.db_writer import db_writer
+
 # Import custom exceptions
 from utils.exceptions import JobBotError, ValidationError, NotFoundError
 
@@ -70,12 +79,21 @@ async def general_exception_handler(request: Request, exc: Exception):
 # --- STARTUP EVENT ---
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database, start loading the URL index and resume queued scrapes on startup."""
     logger.info("Starting Job Bot API...")
     init_db()
+    url_index.warm()
+    scrape_queue.restore()
     logger.info("Job Bot API started successfully")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop scrape workers and commit queued writes on shutdown. Unfinished runs stay queued in the database."""
+    scrape_queue.shutdown()
+    db_writer.stop()
+
+
 # --- INCLUDE ROUTERS ---
 app.include_router(settings_router)
 app.include_router(jobs_router)
@@ -3,7 +3,7 @@ Database models for the Job Bot API.
 Contains SQLAlchemy ORM model definitions.
 """
 from datetime import datetime, timezone
-from sqlalchemy import Column, DateTime, Integer, String, Text, Boolean
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text, Boolean
 from database import Base
 
 
@@ -14,12 +14,15 @@ class JobDB(Base):
     """
     __tablename__ = "jobs"
     
+    # uuid5 of the normalized job URL (see job_id_for_url), so the primary
+    # key doubles as the dedupe key; random uuid4 for jobs without a URL
     id = Column(String, primary_key=True)
     title = Column(String, default="")
     company = Column(String, default="")
     location = Column(String, default="")
-    job_url = Column(String, default="", index=True)  # Index for duplicate checking
+    job_url = Column(String, default="")
     description = Column(Text, default="")
+    description_pending = Column(Boolean, default=False)  # Set when compact mode skipped the description
     is_remote = Column(Boolean, default=False)
     date_posted = Column(String, default="")
     source_site = Column(String, default="", index=True)  # Index for portal filter
@@ -28,6 +31,7 @@ class JobDB(Base):
     status = Column(String, default="new", index=True)  # Index for status filter
     batch_id = Column(String, default="", index=True)  # Index for tab filtering
     fetched_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)  # Index for ordering
+    last_seen_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))  # Last scrape that returned the job
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -51,9 +55,83 @@ class SettingsDB(Base):
     sites = Column(String, default="linkedin,indeed,glassdoor")
     results_per_site = Column(Integer, default=20)
     hours_old = Column(Integer, default=72)
-    data_mode = Column(String, default="compact")
+    data_mode = Column(String, default="full")  # "full" | "compact" (descriptions fetched on open)
+    keyword_fields = Column(String, default="all")  # "all" | "title" | "description"
+    keyword_whole_word = Column(Boolean, default=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     def __repr__(self):
         return f"<SettingsDB(key={self.key})>"
+
+
+class QueryWatermarkDB(Base):
+    """
+    High-water mark of a single scrape query.
+    Records when a (site, title, location, country) query last succeeded
+    and since when its results are covered, for delta scraping.
+    """
+    __tablename__ = "query_watermarks"
+    
+    site = Column(String, primary_key=True)
+    title = Column(String, primary_key=True)  # Normalized (lowercase, single spaces)
+    location = Column(String, primary_key=True)  # Normalized (lowercase, single spaces)
+    country = Column(String, primary_key=True)
+    last_scraped_at = Column(DateTime, nullable=False)  # Start of the last successful scrape
+    covered_since = Column(DateTime, nullable=False)  # Postings since then are already stored
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<QueryWatermarkDB(site={self.site}, title={self.title}, location={self.location})>"
+
+
+class ScrapeQueueDB(Base):
+    """
+    Scrape run waiting in or taken from the scrape queue.
+    Rows are removed when the run finishes, so after a restart the table
+    holds exactly the runs that still have to happen.
+    """
+    __tablename__ = "scrape_queue"
+    
+    job_id = Column(String, primary_key=True)  # Pipeline ID reported to the client
+    batch_id = Column(String, nullable=False)
+    priority = Column(Integer, default=0)  # Higher runs first
+    status = Column(String, default="queued")  # queued, running
+    config = Column(Text, nullable=False)  # JSON config snapshot
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ScrapeQueueDB(job_id={self.job_id}, status={self.status}, priority={self.priority})>"
+
+
+class QueryStatDB(Base):
+    """
+    Outcome of one per-site scrape call.
+    One row per (site, title, location) call, used to measure which
+    queries produce new jobs and what they cost.
+    """
+    __tablename__ = "query_stats"
+    __table_args__ = (
+        Index("ix_query_stats_query", "site", "title", "location"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    batch_id = Column(String, default="", index=True)
+    site = Column(String, nullable=False)
+    title = Column(String, nullable=False)  # Normalized (lowercase, single spaces)
+    location = Column(String, nullable=False)  # Normalized (lowercase, single spaces)
+    country = Column(String, default="")
+    started_at = Column(DateTime, nullable=False, index=True)
+    wall_seconds = Column(Float, default=0.0)  # Including rate-limit waits and retries
+    raw_rows = Column(Integer, default=0)  # Listings returned by the portal
+    filtered_rows = Column(Integer, default=0)  # Dropped by normalization or keyword filters
+    kept_rows = Column(Integer, default=0)  # Passed the filters
+    new_rows = Column(Integer, default=0)  # Saved as new jobs
+    duplicates = Column(Integer, default=0)  # Already stored or seen earlier in the run
+    ok = Column(Boolean, default=True)
+    cache_hit = Column(Boolean, default=False)
+    timed_out = Column(Boolean, default=False)
+
+    def __repr__(self):
+        return f"<QueryStatDB(site={self.site}, title={self.title}, location={self.location}, new={self.new_rows})>"
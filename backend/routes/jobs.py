@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from schemas import JobFilter, JobUpdate
+from services.db_writer import db_writer
 from services.job_service import JobService
 
 logger = logging.getLogger("job-agent")
@@ -46,6 +47,7 @@ def jobs_search(f: JobFilter, db: Session = Depends(get_db)):
 def get_job(job_id: str, db: Session = Depends(get_db)):
     """
     Get a single job by ID.
+    Jobs scraped in compact mode get their description fetched and cached here.
     
     Args:
         job_id: Job ID to retrieve
@@ -58,6 +60,7 @@ def get_job(job_id: str, db: Session = Depends(get_db)):
         j = JobService.get_job_by_id(db, job_id)
         if not j:
             raise HTTPException(404, "Job not found")
+        j = JobService.ensure_description(db, j)
         return {
             "id": j.id,
             "title": j.title or "",
@@ -80,62 +83,57 @@ def get_job(job_id: str, db: Session = Depends(get_db)):
 
 
 @router.patch("/jobs/{job_id}")
-def update_job(job_id: str, update: JobUpdate, db: Session = Depends(get_db)):
+def update_job(job_id: str, update: JobUpdate):
     """
     Update a job's status.
     
     Args:
         job_id: Job ID to update
         update: Update payload with new status
-        db: Database session
         
     Returns:
         Success message
     """
     try:
         if update.status:
-            JobService.update_job_status(db, job_id, update.status)
+            db_writer.run(JobService.update_job_status, job_id, update.status)
         return {"ok": True, "message": "Job updated successfully"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to update job {job_id}: {e}")
-        db.rollback()
         raise HTTPException(500, "Failed to update job")
 
 
 @router.delete("/jobs/{job_id}")
-def delete_job(job_id: str, db: Session = Depends(get_db)):
+def delete_job(job_id: str):
     """
     Delete a job.
     
     Args:
         job_id: Job ID to delete
-        db: Database session
         
     Returns:
         Success message
     """
     try:
-        JobService.delete_job(db, job_id)
+        db_writer.run(JobService.delete_job, job_id)
         return {"ok": True, "message": "Job deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to delete job {job_id}: {e}")
-        db.rollback()
         raise HTTPException(500, "Failed to delete job")
 
 
 @router.delete("/jobs/clear-all")
-def clear_all_jobs(reset_settings: bool = False, db: Session = Depends(get_db)):
+def clear_all_jobs(reset_settings: bool = False):
     """
     Delete all jobs from the database.
-    Optionally reset settings to defaults.
+    Optionally reset settings to defaults, in the same transaction.
     
     Args:
         reset_settings: Whether to reset settings to defaults
-        db: Database session
         
     Returns:
         Success message with count of deleted jobs
@@ -143,12 +141,14 @@ def clear_all_jobs(reset_settings: bool = False, db: Session = Depends(get_db)):
     try:
         from services.job_service import SettingsService
         
-        count = JobService.clear_all_jobs(db)
+        def clear(db: Session) -> int:
+            count = JobService.clear_all_jobs(db)
+            if reset_settings:
+                SettingsService.reset_settings(db)
+            return count
         
-        settings_reset = False
-        if reset_settings:
-            SettingsService.reset_settings(db)
-            settings_reset = True
+        count = db_writer.run(clear)
+        settings_reset = reset_settings
         
         logger.info(f"Cleared all {count} jobs from database" + (" and reset settings" if settings_reset else ""))
         return {
@@ -159,7 +159,6 @@ def clear_all_jobs(reset_settings: bool = False, db: Session = Depends(get_db)):
         }
     except Exception as e:
         logger.error(f"Failed to clear all jobs: {e}")
-        db.rollback()
         raise HTTPException(500, "Failed to clear all jobs")
 
 
@@ -4,14 +4,19 @@ Contains endpoints for job scraping and pipeline management.
 """
 import uuid
 import logging
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from database import get_db
+from config import QUERY_YIELD_LOOKBACK_DAYS, SUPPORTED_SITES
 from schemas import RunScrapeIn
+from services.db_writer import db_writer
 from services.pipeline import pipeline_manager
+from services.scrape_queue import scrape_queue
 from services.scraper import ScraperService
 from services.job_service import SettingsService
+from services.query_stats_service import QueryStatsService
 from utils.exceptions import ValidationError, NotFoundError
 from utils.helpers import sanitize_csv_input
 
@@ -25,17 +30,19 @@ MAX_LOCATION_LENGTH = 200
 
 
 @router.post("/run/scrape")
-def run_scrape(payload: RunScrapeIn, bg: BackgroundTasks, db: Session = Depends(get_db)):
+def run_scrape(payload: RunScrapeIn, db: Session = Depends(get_db)):
     """
-    Start a job scraping pipeline.
+    Queue a job scraping pipeline.
+    
+    The run starts right away if a scrape worker is free and no running
+    scrape sends the same queries; otherwise it waits in the scrape queue.
     
     Args:
         payload: Scrape parameters (optional overrides)
-        bg: FastAPI background tasks
         db: Database session
         
     Returns:
-        Dictionary with job_id, batch_id, and message
+        Dictionary with job_id, batch_id, state, queue_position, and message
     """
     try:
         cfg = SettingsService.get_or_create_settings(db)
@@ -64,35 +71,32 @@ def run_scrape(payload: RunScrapeIn, bg: BackgroundTasks, db: Session = Depends(
                 field="locations"
             )
         
-        # Check if a scrape is already running
-        running_jobs = pipeline_manager.get_all_running()
-        if running_jobs:
-            raise ValidationError(
-                "A scrape job is already running. Please wait for it to complete.",
-                detail="Only one scrape job can run at a time"
-            )
-        
         # Update settings with sanitized values
-        cfg.titles = titles
-        cfg.locations = locations
-        cfg.country = country
-        cfg.hours_old = hours_old
-        db.commit()
+        cfg = db_writer.run(
+            SettingsService.update_settings,
+            titles=titles,
+            locations=locations,
+            country=country,
+            hours_old=hours_old,
+        )
         
         # Prepare config snapshot
         snapshot = ScraperService.prepare_config_snapshot(
-            cfg, titles, locations, country, hours_old
+            cfg, titles, locations, country, hours_old, payload.scrape_mode,
+            payload.target_new_jobs, payload.max_duration_seconds
         )
         
-        # Create pipeline and start worker
-        job_id = pipeline_manager.create("scrape")
+        # Queue the run; it starts as soon as a worker can take it
         batch_id = str(uuid.uuid4())
-        bg.add_task(ScraperService.run_scrape_worker, job_id, snapshot, batch_id)
+        job_id = scrape_queue.enqueue(snapshot, batch_id, priority=payload.priority)
+        position = scrape_queue.position(job_id)
         
         return {
             "job_id": job_id,
             "batch_id": batch_id,
-            "message": "Scrape job started"
+            "state": "queued" if position else "running",
+            "queue_position": position,
+            "message": f"Scrape job queued at position {position}" if position else "Scrape job started"
         }
     except (ValidationError, NotFoundError):
         raise
@@ -101,6 +105,51 @@ def run_scrape(payload: RunScrapeIn, bg: BackgroundTasks, db: Session = Depends(
         raise HTTPException(500, f"Failed to start scrape: {str(e)}")
 
 
+@router.post("/run/{job_id}/cancel")
+def cancel_scrape(job_id: str):
+    """
+    Cancel a queued or running scrape pipeline.
+    
+    Jobs saved before the scrape stops are kept. A running scrape stops
+    after the queries it already sent; poll /logs/{job_id} until its
+    state is "cancelled".
+    
+    Args:
+        job_id: Pipeline job ID
+        
+    Returns:
+        Dictionary with job_id, state, and message
+    """
+    try:
+        pipeline = pipeline_manager.get(job_id)
+        if not pipeline:
+            raise NotFoundError(
+                "Pipeline not found or expired",
+                resource_type="Pipeline",
+                resource_id=job_id
+            )
+        
+        state = scrape_queue.cancel(job_id)
+        if state is None:
+            raise ValidationError(
+                f"Scrape job is not running (state: {pipeline.get('state')})",
+                field="job_id"
+            )
+        
+        if state == "cancelling":
+            pipeline_manager.log(job_id, "Cancellation requested")
+        return {
+            "job_id": job_id,
+            "state": state,
+            "message": "Scrape job cancelled" if state == "cancelled" else "Scrape job is stopping"
+        }
+    except (ValidationError, NotFoundError):
+        raise
+    except Exception as e:
+        logger.error(f"Failed to cancel scrape {job_id}: {e}")
+        raise HTTPException(500, f"Failed to cancel scrape: {str(e)}")
+
+
 @router.get("/logs/{job_id}")
 def get_logs(job_id: str):
     """
@@ -110,7 +159,8 @@ def get_logs(job_id: str):
         job_id: Pipeline job ID
         
     Returns:
-        Pipeline status dictionary with logs and stats
+        Pipeline status dictionary with logs and stats, plus
+        queue_position while the run is queued
     """
     try:
         pipeline = pipeline_manager.get(job_id)
@@ -120,9 +170,45 @@ def get_logs(job_id: str):
                 resource_type="Pipeline",
                 resource_id=job_id
             )
+        if pipeline.get("state") == "queued":
+            return {**pipeline, "queue_position": scrape_queue.position(job_id)}
         return pipeline
     except NotFoundError:
         raise
     except Exception as e:
         logger.error(f"Failed to get logs for {job_id}: {e}")
         raise HTTPException(500, "Failed to retrieve logs")
+
+
+@router.get("/stats/queries")
+def get_query_stats(
+    days: int = QUERY_YIELD_LOOKBACK_DAYS,
+    site: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    Summarize the yield and latency of recent per-site scrape calls.
+    
+    Args:
+        days: Lookback window in days (1-365)
+        site: Optional site filter
+        limit: Maximum number of queries returned (1-500)
+        db: Database session
+        
+    Returns:
+        Dictionary with per-site totals and per-query totals, the queries
+        with the most new jobs per call first
+    """
+    if site and site not in SUPPORTED_SITES:
+        raise ValidationError(f"Unsupported site: {site}", field="site")
+    try:
+        return QueryStatsService.summary(
+            db,
+            since_days=max(1, min(days, 365)),
+            site=site,
+            limit=max(1, min(limit, 500)),
+        )
+    except Exception as e:
+        logger.error(f"Failed to get query stats: {e}")
+        raise HTTPException(500, "Failed to retrieve query statistics")
@@ -7,9 +7,10 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, get_sqlite_diagnostics
 from config import SUPPORTED_COUNTRIES, SUPPORTED_SITES
 from schemas import SettingsIn
+from services.db_writer import db_writer
 from services.job_service import SettingsService
 from utils.helpers import sanitize_csv_input, sanitize_input
 
@@ -29,6 +30,24 @@ def health_check():
     return {"status": "ok", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
+@router.get("/diagnostics/database")
+def database_diagnostics(db: Session = Depends(get_db)):
+    """
+    Get the database tuning in effect and the write queue statistics.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        SQLite diagnostics (see get_sqlite_diagnostics) with a writer entry
+    """
+    try:
+        return {**get_sqlite_diagnostics(db), "writer": db_writer.snapshot()}
+    except Exception as e:
+        logger.error(f"Failed to get database diagnostics: {e}")
+        raise HTTPException(500, "Failed to retrieve database diagnostics")
+
+
 @router.get("/api/countries")
 def api_countries():
     """
@@ -81,6 +100,9 @@ def get_settings(db: Session = Depends(get_db)):
             "sites": [s for s in (cfg.sites or "").split(",") if s],
             "results_per_site": cfg.results_per_site or 20,
             "hours_old": cfg.hours_old or 72,
+            "data_mode": cfg.data_mode or "full",
+            "keyword_fields": cfg.keyword_fields or "all",
+            "keyword_whole_word": bool(cfg.keyword_whole_word),
         }
     except HTTPException:
         raise
@@ -90,13 +112,12 @@ def get_settings(db: Session = Depends(get_db)):
 
 
 @router.post("/settings")
-def save_settings(payload: SettingsIn, db: Session = Depends(get_db)):
+def save_settings(payload: SettingsIn):
     """
     Save settings.
     
     Args:
         payload: Settings to save
-        db: Database session
         
     Returns:
         Success message
@@ -112,8 +133,16 @@ def save_settings(payload: SettingsIn, db: Session = Depends(get_db)):
         # Sanitize site names (they come as a list)
         sanitized_sites = ",".join(sanitize_input(s, max_length=50) for s in payload.sites if s)
         
-        SettingsService.update_settings(
-            db,
+        # Only touch optional settings when the client sends them
+        optional = {
+            "data_mode": payload.data_mode,
+            "keyword_fields": payload.keyword_fields,
+            "keyword_whole_word": payload.keyword_whole_word,
+        }
+        extra = {key: value for key, value in optional.items() if value is not None}
+        
+        db_writer.run(
+            SettingsService.update_settings,
             titles=sanitized_titles,
             locations=sanitized_locations,
             country=sanitized_country,
@@ -121,12 +150,12 @@ def save_settings(payload: SettingsIn, db: Session = Depends(get_db)):
             exclude_keywords=sanitized_exclude_kw,
             sites=sanitized_sites,
             results_per_site=payload.results_per_site,
-            hours_old=payload.hours_old
+            hours_old=payload.hours_old,
+            **extra
         )
         return {"ok": True, "message": "Settings saved successfully"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to save settings: {e}")
-        db.rollback()
         raise HTTPException(500, "Failed to save settings")
@@ -7,10 +7,14 @@ Usage:
     findmyjobai-backend.exe       # Production (PyInstaller bundle)
 """
 
+import multiprocessing
+
 import uvicorn
 from main import app
 
 if __name__ == "__main__":
+    # Required for the scrape process pool (SCRAPE_EXECUTION_MODE=process) in the bundle
+    multiprocessing.freeze_support()
     uvicorn.run(
         app,
         host="127.0.0.1",
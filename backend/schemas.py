@@ -7,11 +7,16 @@ from pydantic import BaseModel, Field, field_validator
 
 from config import (
     SUPPORTED_SITES,
+    KEYWORD_MATCH_FIELDS,
+    SCRAPE_MODES,
     MIN_RESULTS_PER_SITE,
     MAX_RESULTS_PER_SITE,
     MIN_HOURS_OLD,
     MAX_HOURS_OLD,
     MAX_PAGINATION_LIMIT,
+    MAX_SCRAPE_PRIORITY,
+    MAX_TARGET_NEW_JOBS,
+    MAX_SCRAPE_DURATION_SECONDS,
 )
 
 
@@ -27,7 +32,9 @@ class SettingsIn(BaseModel):
     sites: List[str] = Field(default_factory=lambda: ["linkedin"])
     results_per_site: int = 20
     hours_old: int = 72
-    data_mode: str = "compact"
+    data_mode: Optional[str] = None  # None keeps the stored value
+    keyword_fields: Optional[str] = None  # None keeps the stored value
+    keyword_whole_word: Optional[bool] = None  # None keeps the stored value
 
     @field_validator('sites')
     @classmethod
@@ -48,6 +55,22 @@ class SettingsIn(BaseModel):
         """Validate hours old is within bounds."""
         return max(MIN_HOURS_OLD, min(v, MAX_HOURS_OLD))
 
+    @field_validator('data_mode')
+    @classmethod
+    def validate_data_mode(cls, v):
+        """Validate data mode is 'compact' or 'full'."""
+        if v is None:
+            return v
+        return "compact" if v == "compact" else "full"
+
+    @field_validator('keyword_fields')
+    @classmethod
+    def validate_keyword_fields(cls, v):
+        """Validate keyword fields is a supported field selection."""
+        if v is None:
+            return v
+        return v if v in KEYWORD_MATCH_FIELDS else "all"
+
 
 class RunScrapeIn(BaseModel):
     """Schema for starting a scrape job."""
@@ -55,6 +78,38 @@ class RunScrapeIn(BaseModel):
     locations: Optional[str] = None
     country: Optional[str] = None
     hours_old: Optional[int] = None
+    scrape_mode: str = "full"  # "full" | "delta"
+    priority: int = 0  # Higher runs first when several scrapes are queued
+    target_new_jobs: Optional[int] = None  # Stop once this many new jobs are saved
+    max_duration_seconds: Optional[int] = None  # Stop after this long
+
+    @field_validator('scrape_mode')
+    @classmethod
+    def validate_scrape_mode(cls, v):
+        """Validate scrape mode is a supported run mode."""
+        return v if v in SCRAPE_MODES else "full"
+
+    @field_validator('priority')
+    @classmethod
+    def validate_priority(cls, v):
+        """Validate priority is within range."""
+        return max(0, min(v, MAX_SCRAPE_PRIORITY))
+
+    @field_validator('target_new_jobs')
+    @classmethod
+    def validate_target_new_jobs(cls, v):
+        """Validate new-job target is within range."""
+        if v is None:
+            return v
+        return max(1, min(v, MAX_TARGET_NEW_JOBS))
+
+    @field_validator('max_duration_seconds')
+    @classmethod
+    def validate_max_duration_seconds(cls, v):
+        """Validate time budget is within range."""
+        if v is None:
+            return v
+        return max(1, min(v, MAX_SCRAPE_DURATION_SECONDS))
 
 
 class JobFilter(BaseModel):
@@ -135,6 +190,9 @@ class SettingsOut(BaseModel):
     sites: List[str]
     results_per_site: int
     hours_old: int
+    data_mode: str
+    keyword_fields: str
+    keyword_whole_word: bool
 
 
 class StatsOut(BaseModel):
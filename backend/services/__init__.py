@@ -4,5 +4,6 @@ Services package for the Job Bot API.
 from services.pipeline import pipeline_manager, PipelineManager
 from services.job_service import JobService
 from services.scraper import ScraperService
+from services.scrape_queue import scrape_queue, ScrapeQueue
 
-__all__ = ["pipeline_manager", "PipelineManager", "JobService", "ScraperService"]
+__all__ = ["pipeline_manager", "PipelineManager", "JobService", "ScraperService", "scrape_queue", "ScrapeQueue"]
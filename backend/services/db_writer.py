@@ -0,0 +1,258 @@
+"""
+Database writer for the Job Bot API.
+Runs all write operations on one thread that owns the only write
+connection, so SQLite never sees two writers competing for its lock.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from config import DB_WRITE_BATCH_SIZE, DB_WRITER_ENABLED
+from database import SessionLocal, engine
+
+logger = logging.getLogger("job-agent")
+
+
+class _WriteOp:
+    """One queued write operation and the future it completes."""
+
+    __slots__ = ("fn", "args", "kwargs", "future")
+
+    def __init__(self, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+
+class DbWriter:
+    """
+    Single-writer queue for database writes.
+
+    Callers submit functions taking a Session as first argument (e.g.
+    JobService.update_job_status) and get a Future back. The writer thread
+    takes whatever is queued, up to batch_size operations, and runs them in
+    one transaction: each operation gets its own session on a SAVEPOINT, so
+    its db.commit() only releases the savepoint and a failing operation
+    only rolls back its own work. Futures are completed once the group is
+    committed; if the commit itself fails every operation of the group
+    gets the error. Callbacks registered with database.after_commit run
+    after the group commits.
+
+    Reads keep using their own sessions. Scrape child processes (process
+    execution mode) have their own writer, so SQLite's lock still arbitrates
+    between processes.
+    """
+
+    def __init__(self, batch_size: int = 64, enabled: bool = True):
+        """
+        Args:
+            batch_size: Maximum operations committed in one transaction
+            enabled: Queue writes to the writer thread; when off, every
+                operation runs on the caller's thread with its own session
+        """
+        self.batch_size = max(1, batch_size)
+        self.enabled = enabled
+        self._queue: "queue.Queue[Optional[_WriteOp]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[Connection] = None
+        self._transactions = 0
+        self._operations = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue a write operation.
+
+        Args:
+            fn: Function called as fn(session, *args, **kwargs)
+            *args: Positional arguments after the session
+            **kwargs: Keyword arguments
+
+        Returns:
+            Future resolved with fn's return value (ORM objects come back
+            detached) or its exception, after the commit
+
+        Raises:
+            RuntimeError: If called from a write operation, which would
+                wait on itself
+        """
+        op = _WriteOp(fn, args, kwargs)
+        if not self.enabled:
+            self._run_inline(op)
+            return op.future
+
+        with self._lock:
+            if threading.current_thread() is self._thread:
+                raise RuntimeError("Write operations can't queue further writes")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+            self._queue.put(op)
+        return op.future
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Queue a write operation and wait for it.
+
+        Args:
+            fn: Function called as fn(session, *args, **kwargs)
+            *args: Positional arguments after the session
+            **kwargs: Keyword arguments
+
+        Returns:
+            fn's return value; its exception is raised here
+        """
+        return self.submit(fn, *args, **kwargs).result()
+
+    @staticmethod
+    def owns(db: Session) -> bool:
+        """
+        Check whether a session is the one a write operation was given.
+        Code that may run either way uses it to write directly instead of
+        queueing a nested write that would wait on itself.
+
+        Args:
+            db: Database session
+
+        Returns:
+            True inside a write operation
+        """
+        return bool(db.info.get("db_writer"))
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Commit the queued operations and stop the writer thread.
+        A later submit starts a new one.
+
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(None)
+            self._thread = None
+        thread.join(timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get writer statistics for diagnostics.
+
+        Returns:
+            Dictionary with enabled, queued, transactions, operations and
+            ops_per_transaction
+        """
+        transactions, operations = self._transactions, self._operations
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "transactions": transactions,
+            "operations": operations,
+            "ops_per_transaction": round(operations / transactions, 2) if transactions else 0.0,
+        }
+
+    def _run_inline(self, op: _WriteOp) -> None:
+        """Execute an operation on the caller's thread with its own session."""
+        session = SessionLocal(info={"db_writer": True})
+        try:
+            op.future.set_result(op.fn(session, *op.args, **op.kwargs))
+        except Exception as e:
+            session.rollback()
+            op.future.set_exception(e)
+        finally:
+            session.close()
+
+    def _run(self) -> None:
+        """Drain the queue in groups. Executed on the writer thread."""
+        stopping = False
+        while not stopping:
+            op = self._queue.get()
+            if op is None:
+                break
+            batch = [op]
+            while len(batch) < self.batch_size:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    stopping = True
+                    break
+                batch.append(op)
+            self._execute(batch)
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _execute(self, batch: List[_WriteOp]) -> None:
+        """Run a group of operations in one transaction and complete their futures."""
+        outcomes: List[Tuple[_WriteOp, bool, Any]] = []
+        committed: List[Callable[[], None]] = []
+        try:
+            if self._conn is None:
+                self._conn = engine.connect()
+            conn = self._conn
+            conn.begin()
+            if conn.dialect.name == "sqlite":
+                # pysqlite would otherwise start the transaction at the first
+                # SAVEPOINT and commit it when that savepoint is released.
+                # IMMEDIATE takes the write lock up front instead of failing
+                # to upgrade a read lock halfway through the group.
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+            for op in batch:
+                if not op.future.set_running_or_notify_cancel():
+                    continue
+                session = SessionLocal(
+                    bind=conn,
+                    join_transaction_mode="create_savepoint",
+                    info={"db_writer": True, "after_commit": committed},
+                )
+                try:
+                    outcomes.append((op, True, op.fn(session, *op.args, **op.kwargs)))
+                except Exception as e:
+                    session.rollback()
+                    outcomes.append((op, False, e))
+                finally:
+                    session.close()
+
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Write transaction of {len(batch)} operations failed: {e}")
+            if self._conn is not None:
+                try:
+                    self._conn.rollback()
+                except Exception:
+                    pass
+                # Reconnect for the next group rather than reuse a broken connection
+                self._conn.close()
+                self._conn = None
+            for op in batch:
+                if not op.future.done():
+                    op.future.set_exception(e)
+            return
+
+        for callback in committed:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"After-commit callback failed: {e}")
+        self._transactions += 1
+        self._operations += len(outcomes)
+        for op, ok, value in outcomes:
+            if ok:
+                op.future.set_result(value)
+            else:
+                op.future.set_exception(value)
+
+
+# Global database writer, started on the first write
+db_writer = DbWriter(DB_WRITE_BATCH_SIZE, enabled=DB_WRITER_ENABLED)
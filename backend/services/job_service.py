@@ -4,16 +4,25 @@ Contains business logic for job operations.
 """
 import uuid
 import logging
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from database import after_commit
 from models import JobDB, SettingsDB
+from utils.helpers import job_id_for_url, normalize_job_url
+from services.db_writer import db_writer
+from services.url_index import url_index
 
 logger = logging.getLogger("job-agent")
 
+# URLs per IN (...) lookup, below SQLite's bound-parameter limit (999 before 3.32)
+URL_LOOKUP_CHUNK_SIZE = 500
+
 
 class JobService:
     """
@@ -47,7 +56,10 @@ class JobService:
         Returns:
             JobDB instance or None
         """
-        return db.query(JobDB).filter(JobDB.job_url == job_url).first()
+        normalized_url = normalize_job_url(job_url)
+        if not normalized_url:
+            return None
+        return JobService.get_job_by_id(db, job_id_for_url(normalized_url))
     
     @staticmethod
     def job_exists_by_url(db: Session, job_url: str) -> bool:
@@ -61,7 +73,37 @@ class JobService:
         Returns:
             True if job exists, False otherwise
         """
-        return db.query(JobDB).filter(JobDB.job_url == job_url).first() is not None
+        return bool(job_url) and bool(JobService.existing_urls(db, [job_url]))
+    
+    @staticmethod
+    def existing_urls(db: Session, job_urls: Iterable[str]) -> Set[str]:
+        """
+        Get the subset of the given job URLs that are already stored.
+        
+        Once the in-memory url_index is loaded it rules out the URLs it
+        has never seen, so new jobs cost no query. Its hits are only
+        candidates (the job may have been deleted by another process since)
+        and are confirmed by primary key (see job_id_for_url), one IN (...)
+        query per URL_LOOKUP_CHUNK_SIZE URLs; before the index is loaded
+        every URL is checked that way. Jobs other processes inserted in the
+        last 30 seconds may look new, which is fine for hints like skipping
+        description fetches since saving dedupes in the database anyway.
+        
+        Args:
+            db: Database session
+            job_urls: Normalized job URLs to check
+            
+        Returns:
+            Set of URLs that exist in the jobs table
+        """
+        urls = {url for url in job_urls if url}
+        indexed = url_index.lookup(db, urls)
+        wanted = list(urls) if indexed is None else indexed
+        found: Set[str] = set()
+        for start in range(0, len(wanted), URL_LOOKUP_CHUNK_SIZE):
+            by_id = {job_id_for_url(url): url for url in wanted[start:start + URL_LOOKUP_CHUNK_SIZE]}
+            found.update(by_id[row[0]] for row in db.query(JobDB.id).filter(JobDB.id.in_(list(by_id))))
+        return found
     
     @staticmethod
     def create_job(
@@ -90,13 +132,14 @@ class JobService:
             ValueError: If job already exists and check_duplicate is True
         """
         job_url = job_data.get("job_url", "")
+        normalized_url = normalize_job_url(job_url)
         
         # Check for duplicate if requested
-        if check_duplicate and job_url and JobService.job_exists_by_url(db, job_url):
+        if check_duplicate and normalized_url and JobService.job_exists_by_url(db, normalized_url):
             raise ValueError(f"Job with URL {job_url} already exists")
         
-        # Generate unique ID
-        job_id = str(uuid.uuid4())
+        # Content-addressed ID: the same URL always maps to the same row
+        job_id = job_id_for_url(normalized_url) if normalized_url else str(uuid.uuid4())
         
         # Create job instance
         job = JobDB(
@@ -104,8 +147,9 @@ class JobService:
             title=job_data.get("title", ""),
             company=job_data.get("company", ""),
             location=job_data.get("location", ""),
-            job_url=job_url,
+            job_url=normalized_url or job_url,
             description=job_data.get("description", ""),
+            description_pending=job_data.get("description_pending", False),
             is_remote=job_data.get("is_remote", False),
             date_posted=job_data.get("date_posted", ""),
             source_site=job_data.get("source_site", ""),
@@ -117,6 +161,8 @@ class JobService:
         db.add(job)
         db.commit()
         db.refresh(job)
+        job_url = job.job_url
+        after_commit(db, lambda: url_index.add([job_url]))
         
         return job
     
@@ -141,39 +187,180 @@ class JobService:
         Returns:
             Dictionary with 'job' (created job or None if duplicate) and 'skipped' (bool)
         """
-        from utils.helpers import normalize_job_url
+        result = JobService.save_jobs_with_duplicate_check(
+            db, [job_data], search_title, search_location, batch_id
+        )
+        if result["failed"]:
+            raise RuntimeError(f"Failed to save job {job_data.get('job_url', '')}")
+        if not result["saved"]:
+            return {"job": None, "skipped": True}
+        return {"job": JobService.get_job_by_id(db, result["saved"][0]["id"]), "skipped": False}
+    
+    @staticmethod
+    def save_jobs_with_duplicate_check(
+        db: Session,
+        jobs: List[Dict[str, Any]],
+        search_title: str,
+        search_location: str,
+        batch_id: str
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Save many jobs at once, skipping URLs that already exist.
         
-        job_url = job_data.get("job_url", "")
-        normalized_url = normalize_job_url(job_url)
+        Each job's ID is derived from its normalized URL, so repeats within
+        the batch are dropped up front and the rest are written with one
+        INSERT ... ON CONFLICT (id) DO UPDATE statement: new jobs are
+        inserted, and for jobs already stored only last_seen_at of the
+        existing row is refreshed. The database decides, so concurrent
+        scrapes and retries can't insert the same job twice. If the batch
+        fails the jobs are saved one by one, so a bad row doesn't drop the rest.
         
-        # Check if job already exists (skip if so)
-        if normalized_url and JobService.job_exists_by_url(db, normalized_url):
-            return {"job": None, "skipped": True}
+        Args:
+            db: Database session
+            jobs: Dictionaries containing job information; their own
+                search_title/search_location take precedence
+            search_title: Search query title used
+            search_location: Search query location used
+            batch_id: Batch ID for this scrape operation
+            
+        Returns:
+            Dictionary with 'saved' (inserted rows, including their 'id'),
+            'skipped' (duplicate jobs) and 'failed' (rows that couldn't be saved)
+        """
+        now = datetime.now(timezone.utc)
+        rows: List[Dict[str, Any]] = []
+        row_jobs: List[Dict[str, Any]] = []
+        skipped: List[Dict[str, Any]] = []
+        batch_ids: Set[str] = set()
+        for job_data in jobs:
+            normalized_url = normalize_job_url(job_data.get("job_url", ""))
+            # Jobs without a URL can't be deduplicated but are still saved
+            job_id = job_id_for_url(normalized_url) if normalized_url else str(uuid.uuid4())
+            if job_id in batch_ids:
+                skipped.append(job_data)
+                continue
+            batch_ids.add(job_id)
+            row_jobs.append(job_data)
+            rows.append(dict(
+                id=job_id,
+                title=job_data.get("title", ""),
+                company=job_data.get("company", ""),
+                location=job_data.get("location", ""),
+                job_url=normalized_url or job_data.get("job_url", ""),
+                description=job_data.get("description", ""),
+                description_pending=job_data.get("description_pending", False),
+                is_remote=job_data.get("is_remote", False),
+                date_posted=job_data.get("date_posted", ""),
+                source_site=job_data.get("source_site", ""),
+                search_title=job_data.get("search_title") or search_title,
+                search_location=job_data.get("search_location") or search_location,
+                batch_id=batch_id,
+                fetched_at=now,
+                last_seen_at=now,
+            ))
+        
+        if not rows:
+            return {"saved": [], "skipped": skipped, "failed": []}
+        
+        stmt = sqlite_insert(JobDB)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobDB.id],
+            set_={"last_seen_at": stmt.excluded.last_seen_at},
+        ).returning(JobDB.id, JobDB.fetched_at)
+        fetched_now = now.replace(tzinfo=None)
+        
+        def upsert(batch: List[Dict[str, Any]]) -> Set[str]:
+            # Updated rows keep their original fetched_at, so only rows
+            # returned with this call's timestamp were inserted
+            inserted = {
+                job_id for job_id, fetched_at in db.execute(stmt, batch)
+                if fetched_at is not None and fetched_at.replace(tzinfo=None) == fetched_now
+            }
+            db.commit()
+            inserted_urls = [row["job_url"] for row in batch if row["id"] in inserted]
+            after_commit(db, lambda: url_index.add(inserted_urls))
+            return inserted
         
-        # Generate unique ID
-        job_id = str(uuid.uuid4())
+        try:
+            inserted = upsert(rows)
+            failed: List[Dict[str, Any]] = []
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Batch upsert of {len(rows)} jobs failed, saving them one by one: {e}")
+            inserted, failed = set(), []
+            for row in rows:
+                try:
+                    inserted |= upsert([row])
+                except Exception as row_error:
+                    logger.error(f"Failed to save job: {row_error}")
+                    db.rollback()
+                    failed.append(row)
+        
+        failed_ids = {row["id"] for row in failed}
+        return {
+            "saved": [row for row in rows if row["id"] in inserted],
+            "skipped": skipped + [
+                job_data for job_data, row in zip(row_jobs, rows)
+                if row["id"] not in inserted and row["id"] not in failed_ids
+            ],
+            "failed": failed,
+        }
+    
+    @staticmethod
+    def ensure_description(db: Session, job: JobDB) -> JobDB:
+        """
+        Fetch and cache the description of a job scraped in compact mode.
         
-        # Create job instance
-        job = JobDB(
-            id=job_id,
-            title=job_data.get("title", ""),
-            company=job_data.get("company", ""),
-            location=job_data.get("location", ""),
-            job_url=normalized_url or job_url,
-            description=job_data.get("description", ""),
-            is_remote=job_data.get("is_remote", False),
-            date_posted=job_data.get("date_posted", ""),
-            source_site=job_data.get("source_site", ""),
-            search_title=search_title,
-            search_location=search_location,
-            batch_id=batch_id,
-        )
+        The first time such a job is opened its description is fetched from
+        the source site and stored in the row. If the fetch fails the job
+        stays pending and is retried on the next open.
         
-        db.add(job)
-        db.commit()
-        db.refresh(job)
+        Args:
+            db: Database session
+            job: JobDB instance to complete
+            
+        Returns:
+            The (possibly updated) JobDB instance
+        """
+        if not job.description_pending:
+            return job
+        
+        from job_bot import fetch_job_descriptions
+        from services.scraper import scraper_backend
+        
+        description = fetch_job_descriptions(
+            [job.job_url], job.source_site or "", backend=scraper_backend
+        ).get(job.job_url)
+        if not description:
+            return job
         
-        return {"job": job, "skipped": False}
+        try:
+            db_writer.run(JobService.store_description, job.id, description)
+            db.refresh(job)
+        except Exception as e:
+            logger.warning(f"Failed to cache description for job {job.id}: {e}")
+        
+        return job
+    
+    @staticmethod
+    def store_description(db: Session, job_id: str, description: str) -> bool:
+        """
+        Store a fetched description and clear the job's pending flag.
+        
+        Args:
+            db: Database session
+            job_id: Job ID to update
+            description: Description text
+            
+        Returns:
+            True if the job exists
+        """
+        updated = db.query(JobDB).filter(JobDB.id == job_id).update(
+            {JobDB.description: description, JobDB.description_pending: False},
+            synchronize_session=False,
+        )
+        db.commit()
+        return bool(updated)
     
     @staticmethod
     def update_job_status(db: Session, job_id: str, status: str) -> JobDB:
@@ -220,8 +407,10 @@ class JobService:
         if not job:
             raise HTTPException(404, "Job not found")
         
+        job_url = job.job_url
         db.delete(job)
         db.commit()
+        after_commit(db, lambda: url_index.remove([job_url]))
         
         return True
     
@@ -239,6 +428,7 @@ class JobService:
         count = db.query(JobDB).count()
         db.query(JobDB).delete()
         db.commit()
+        after_commit(db, url_index.clear)
         
         return count
     
@@ -309,6 +499,41 @@ class JobService:
         
         return {"jobs": jobs, "total": total, "limit": limit, "offset": offset}
     
+    @staticmethod
+    def query_yields(db: Session, since_days: int) -> Dict[Tuple[str, str, str], int]:
+        """
+        Count new jobs each (site, title, location) query found recently.
+        
+        Args:
+            db: Database session
+            since_days: Only count jobs fetched in this many past days
+            
+        Returns:
+            Dict mapping (site, title, location), with title and location
+            lowercased and whitespace-collapsed, to the number of jobs
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=since_days)
+        rows = db.query(
+            JobDB.source_site,
+            JobDB.search_title,
+            JobDB.search_location,
+            func.count(JobDB.id)
+        ).filter(
+            JobDB.fetched_at >= cutoff
+        ).group_by(
+            JobDB.source_site, JobDB.search_title, JobDB.search_location
+        ).all()
+        
+        yields: Dict[Tuple[str, str, str], int] = {}
+        for site, title, location, count in rows:
+            key = (
+                site or "",
+                " ".join((title or "").split()).lower(),
+                " ".join((location or "").split()).lower(),
+            )
+            yields[key] = yields.get(key, 0) + count
+        return yields
+    
     @staticmethod
     def get_stats(db: Session) -> Dict[str, int]:
         """
@@ -346,6 +571,9 @@ class SettingsService:
         """
         Get or create the settings record.
         
+        A missing record is created through the database writer, or
+        directly when db already belongs to a write operation.
+        
         Args:
             db: Database session
             
@@ -358,16 +586,35 @@ class SettingsService:
         try:
             cfg = db.query(SettingsDB).filter_by(key="config").first()
             if not cfg:
-                cfg = SettingsDB(key="config")
-                db.add(cfg)
-                db.commit()
-                db.refresh(cfg)
+                if db_writer.owns(db):
+                    return SettingsService.create_settings(db)
+                db_writer.run(SettingsService.create_settings)
+                cfg = db.query(SettingsDB).filter_by(key="config").first()
             return cfg
         except Exception as e:
             logger.error(f"Failed to get/create settings: {e}")
             db.rollback()
             raise HTTPException(500, "Failed to access settings")
     
+    @staticmethod
+    def create_settings(db: Session) -> SettingsDB:
+        """
+        Create the settings record with default values, unless it exists.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            SettingsDB instance
+        """
+        cfg = db.query(SettingsDB).filter_by(key="config").first()
+        if not cfg:
+            cfg = SettingsDB(key="config")
+            db.add(cfg)
+            db.commit()
+            db.refresh(cfg)
+        return cfg
+    
     @staticmethod
     def update_settings(db: Session, **kwargs) -> SettingsDB:
         """
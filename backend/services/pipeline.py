@@ -6,7 +6,7 @@ import uuid
 import threading
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from config import PIPELINE_EXPIRY_SECONDS
 
@@ -24,23 +24,29 @@ class PipelineManager:
     def __init__(self):
         self._lock = threading.Lock()
         self._pipelines: Dict[str, Dict[str, Any]] = {}
+        # IDs of jobs inserted by each pipeline, kept out of the /logs payload
+        self._inserted: Dict[str, List[str]] = {}
+        # Pipelines asked to stop; their workers poll is_cancel_requested
+        self._cancel_requested: Set[str] = set()
     
-    def create(self, kind: str) -> str:
+    def create(self, kind: str, state: str = "running", job_id: Optional[str] = None) -> str:
         """
         Create a new pipeline and return its ID.
         
         Args:
             kind: Type of pipeline (e.g., "scrape")
+            state: Initial state ("running" or "queued")
+            job_id: Optional existing ID, e.g. of a queued run restored after a restart
             
         Returns:
             Unique pipeline ID
         """
-        job_id = str(uuid.uuid4())
+        job_id = job_id or str(uuid.uuid4())
         with self._lock:
             self._cleanup_expired()
             self._pipelines[job_id] = {
                 "kind": kind,
-                "state": "running",
+                "state": state,
                 "logs": [],
                 "stats": {},
                 "started_at": datetime.now(timezone.utc).isoformat(),
@@ -68,15 +74,68 @@ class PipelineManager:
         
         Args:
             job_id: Pipeline ID
-            state: New state (e.g., "running", "done", "failed")
+            state: New state (e.g., "queued", "running", "done", "failed", "cancelled")
             stats: Stats dictionary to merge with existing stats
         """
         with self._lock:
             if job_id in self._pipelines:
+                pipeline = self._pipelines[job_id]
+                if state == "running" and pipeline["state"] == "queued":
+                    # Expiry counts from the start, not from the time spent queued
+                    pipeline["started_at"] = datetime.now(timezone.utc).isoformat()
                 if state:
-                    self._pipelines[job_id]["state"] = state
+                    pipeline["state"] = state
                 if stats:
-                    self._pipelines[job_id]["stats"].update(stats)
+                    pipeline["stats"].update(stats)
+    
+    def add_inserted(self, job_id: str, ids: List[str]) -> None:
+        """
+        Record IDs of jobs a pipeline inserted.
+        
+        Args:
+            job_id: Pipeline ID
+            ids: Inserted job IDs
+        """
+        with self._lock:
+            if job_id in self._pipelines:
+                self._inserted.setdefault(job_id, []).extend(ids)
+    
+    def inserted_ids(self, job_id: str) -> List[str]:
+        """
+        Get IDs of jobs a pipeline inserted so far.
+        
+        Args:
+            job_id: Pipeline ID
+            
+        Returns:
+            List of job IDs in insertion order
+        """
+        with self._lock:
+            return list(self._inserted.get(job_id, []))
+    
+    def request_cancel(self, job_id: str) -> None:
+        """
+        Ask a running pipeline to stop at its next checkpoint.
+        
+        Args:
+            job_id: Pipeline ID
+        """
+        with self._lock:
+            if job_id in self._pipelines:
+                self._cancel_requested.add(job_id)
+    
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """
+        Check whether a pipeline was asked to stop.
+        
+        Args:
+            job_id: Pipeline ID
+            
+        Returns:
+            True if request_cancel was called for it
+        """
+        with self._lock:
+            return job_id in self._cancel_requested
     
     def get(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -106,12 +165,15 @@ class PipelineManager:
     
     def _cleanup_expired(self) -> None:
         """
-        Remove pipelines older than PIPELINE_EXPIRY_SECONDS.
+        Remove finished pipelines older than PIPELINE_EXPIRY_SECONDS.
+        Queued and running pipelines are kept however long they take.
         Called automatically when creating new pipelines.
         """
         now = datetime.now(timezone.utc)
         expired = []
         for job_id, pipeline in self._pipelines.items():
+            if pipeline.get("state") in ("queued", "running"):
+                continue
             try:
                 started = datetime.fromisoformat(pipeline["started_at"].replace('Z', '+00:00'))
                 if (now - started).total_seconds() > PIPELINE_EXPIRY_SECONDS:
@@ -120,6 +182,8 @@ class PipelineManager:
                 expired.append(job_id)
         for job_id in expired:
             del self._pipelines[job_id]
+            self._inserted.pop(job_id, None)
+            self._cancel_requested.discard(job_id)
             logger.debug(f"Cleaned up expired pipeline: {job_id}")
 
 
@@ -0,0 +1,184 @@
+"""
+Query stats service for the Job Bot API.
+Records the yield and latency of every per-site scrape call and summarizes them.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import Integer, func
+from sqlalchemy.orm import Session
+
+from models import QueryStatDB
+
+logger = logging.getLogger("job-agent")
+
+QueryKey = Tuple[str, str, str]
+
+
+def _norm(term: str) -> str:
+    """Lowercase and collapse whitespace, as stored in query_stats."""
+    return " ".join((term or "").split()).lower()
+
+
+class QueryStatsService:
+    """
+    Service class for per-query scrape statistics.
+    Each row is one (site, title, location) call of a scrape run.
+    """
+
+    @staticmethod
+    def make_key(site: str, title: str, location: str) -> QueryKey:
+        """
+        Build a normalized query key.
+
+        Args:
+            site: Job site name
+            title: Search title
+            location: Search location
+
+        Returns:
+            (site, title, location) with title and location normalized
+        """
+        return (site, _norm(title), _norm(location))
+
+    @staticmethod
+    def record(
+        db: Session,
+        event: Dict[str, Any],
+        batch_id: str,
+        country: str,
+        new_rows: int,
+        duplicates: int,
+    ) -> QueryStatDB:
+        """
+        Store the outcome of one per-site call.
+
+        Args:
+            db: Database session
+            event: Per-call event from the scraper (see job_bot.iter_jobs)
+            batch_id: Batch ID of the scrape run
+            country: Country searched
+            new_rows: Jobs of this call saved as new
+            duplicates: Jobs of this call that were already stored or seen
+
+        Returns:
+            Created QueryStatDB instance
+        """
+        site, title, location = QueryStatsService.make_key(event["site"], event["title"], event["location"])
+        row = QueryStatDB(
+            batch_id=batch_id,
+            site=site,
+            title=title,
+            location=location,
+            country=_norm(country),
+            started_at=event["started_at"],
+            wall_seconds=round(float(event.get("wall_seconds") or 0.0), 3),
+            raw_rows=event.get("raw", 0),
+            filtered_rows=event.get("filtered", 0),
+            kept_rows=event.get("kept", 0),
+            new_rows=new_rows,
+            duplicates=duplicates,
+            ok=bool(event["ok"]),
+            cache_hit=bool(event["cache_hit"]),
+            timed_out=bool(event["timed_out"]),
+        )
+        db.add(row)
+        db.commit()
+        return row
+
+    @staticmethod
+    def measured_yields(db: Session, since_days: int) -> Dict[QueryKey, float]:
+        """
+        Average new jobs per live call of each query.
+        Cache hits are left out since they don't reflect what the site returns now.
+
+        Args:
+            db: Database session
+            since_days: Only use calls started in this many past days
+
+        Returns:
+            Dict mapping (site, title, location) to mean new jobs per call
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=since_days)
+        rows = db.query(
+            QueryStatDB.site,
+            QueryStatDB.title,
+            QueryStatDB.location,
+            func.avg(QueryStatDB.new_rows)
+        ).filter(
+            QueryStatDB.started_at >= cutoff,
+            QueryStatDB.cache_hit.is_(False),
+        ).group_by(
+            QueryStatDB.site, QueryStatDB.title, QueryStatDB.location
+        ).all()
+        return {(site, title, location): float(avg or 0) for site, title, location, avg in rows}
+
+    @staticmethod
+    def summary(db: Session, since_days: int, site: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """
+        Summarize query stats per site and per query.
+
+        Args:
+            db: Database session
+            since_days: Only include calls started in this many past days
+            site: Optional site filter
+            limit: Maximum number of queries returned
+
+        Returns:
+            Dictionary with since_days, sites (per-site totals) and queries
+            (per-query totals, best new jobs per call first)
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=since_days)
+        measures = (
+            func.count(QueryStatDB.id),
+            func.sum(QueryStatDB.raw_rows),
+            func.sum(QueryStatDB.filtered_rows),
+            func.sum(QueryStatDB.kept_rows),
+            func.sum(QueryStatDB.new_rows),
+            func.sum(QueryStatDB.duplicates),
+            func.avg(QueryStatDB.wall_seconds),
+            func.max(QueryStatDB.wall_seconds),
+            func.sum(func.cast(~QueryStatDB.ok, Integer)),
+            func.sum(func.cast(QueryStatDB.timed_out, Integer)),
+            func.sum(func.cast(QueryStatDB.cache_hit, Integer)),
+        )
+        filters = [QueryStatDB.started_at >= cutoff]
+        if site:
+            filters.append(QueryStatDB.site == site)
+
+        def totals(values) -> Dict[str, Any]:
+            calls, raw, filtered, kept, new, dups, avg_wall, max_wall, failed, timed_out, cache_hits = values
+            return {
+                "calls": calls,
+                "raw_rows": raw or 0,
+                "filtered_rows": filtered or 0,
+                "kept_rows": kept or 0,
+                "new_rows": new or 0,
+                "duplicates": dups or 0,
+                "new_per_call": round((new or 0) / calls, 2) if calls else 0.0,
+                "avg_wall_seconds": round(avg_wall or 0.0, 2),
+                "max_wall_seconds": round(max_wall or 0.0, 2),
+                "failed": failed or 0,
+                "timed_out": timed_out or 0,
+                "cache_hits": cache_hits or 0,
+            }
+
+        site_rows = db.query(QueryStatDB.site, *measures).filter(*filters).group_by(QueryStatDB.site).all()
+        query_rows = db.query(
+            QueryStatDB.site, QueryStatDB.title, QueryStatDB.location, *measures
+        ).filter(*filters).group_by(
+            QueryStatDB.site, QueryStatDB.title, QueryStatDB.location
+        ).all()
+
+        queries = [
+            {"site": row[0], "title": row[1], "location": row[2], **totals(row[3:])}
+            for row in query_rows
+        ]
+        queries.sort(key=lambda q: (-q["new_per_call"], q["avg_wall_seconds"]))
+
+        return {
+            "since_days": since_days,
+            "sites": {row[0]: totals(row[1:]) for row in site_rows},
+            "queries": queries[:limit],
+        }
@@ -0,0 +1,167 @@
+"""
+Process-pool execution of scrape runs for the Job Bot API.
+Runs ScraperService.run_scrape_worker in child processes so DataFrame work
+and JobSpy parsing don't hold the API process's GIL.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from services.pipeline import pipeline_manager
+
+logger = logging.getLogger("job-agent")
+
+# PipelineManager methods a child process may call; everything else stays local
+_FORWARDED_METHODS = {"log", "update", "add_inserted"}
+
+
+class _PipelineEvents:
+    """
+    Child-process stand-in for pipeline_manager.
+    Forwards every pipeline write to the API process over a queue.
+    """
+
+    def __init__(self, queue: Any, cancelled: Any):
+        self._queue = queue
+        self._cancelled = cancelled
+
+    def log(self, job_id: str, msg: str) -> None:
+        self._queue.put(("log", (job_id, msg)))
+
+    def update(self, job_id: str, state: str = None, stats: Dict = None) -> None:
+        self._queue.put(("update", (job_id, state, stats)))
+
+    def add_inserted(self, job_id: str, ids: list) -> None:
+        self._queue.put(("add_inserted", (job_id, list(ids))))
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        return job_id in self._cancelled
+
+
+def _init_child(queue: Any, cancelled: Any) -> None:
+    """Process pool initializer: route the scraper's pipeline writes to the queue."""
+    logging.basicConfig(level=logging.INFO)
+    import services.scraper as scraper
+    scraper.pipeline_manager = _PipelineEvents(queue, cancelled)
+
+
+def _run_in_child(job_id: str, cfg_snapshot: Dict[str, Any], batch_id: str) -> None:
+    """Entry point executed in a child process."""
+    from services.scraper import ScraperService
+    ScraperService.run_scrape_worker(job_id, cfg_snapshot, batch_id)
+
+
+class ScrapeProcessPool:
+    """
+    Lazily started pool of scrape processes plus a listener thread.
+
+    Child processes are spawned (not forked) so they behave the same on
+    Windows and in the PyInstaller bundle. Logs, stats updates and inserted
+    job IDs arrive on a multiprocessing queue and are applied to the API
+    process's pipeline_manager by the listener, so /logs works unchanged.
+    Cancellation requests go the other way through a managed dict of
+    cancelled pipeline IDs.
+
+    Rate limiters and circuit breakers live per child process; the on-disk
+    scrape cache is shared.
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._events: Any = None
+        self._manager: Any = None
+        self._cancelled: Any = None
+
+    def _ensure_started(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                ctx = multiprocessing.get_context("spawn")
+                if self._manager is None:
+                    self._manager = ctx.Manager()
+                    self._cancelled = self._manager.dict()
+                if self._events is None:
+                    self._events = ctx.Queue()
+                    threading.Thread(
+                        target=self._listen, args=(self._events,), name="scrape-events", daemon=True
+                    ).start()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=ctx,
+                    initializer=_init_child,
+                    initargs=(self._events, self._cancelled),
+                )
+            return self._executor
+
+    @staticmethod
+    def _listen(events: Any) -> None:
+        """Apply pipeline events from child processes until shutdown."""
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            method, args = event
+            if method not in _FORWARDED_METHODS:
+                continue
+            try:
+                getattr(pipeline_manager, method)(*args)
+            except Exception as e:
+                logger.warning(f"Failed to apply scrape event {method}: {e}")
+
+    def run(self, job_id: str, cfg_snapshot: Dict[str, Any], batch_id: str) -> None:
+        """
+        Execute a scrape run in a child process and wait for it.
+
+        Args:
+            job_id: Pipeline job ID for tracking
+            cfg_snapshot: Configuration snapshot for this scrape
+            batch_id: Batch ID for grouping scraped jobs
+
+        Raises:
+            BrokenProcessPool: If the child process died; the pool is
+                recreated for the next run
+        """
+        executor = self._ensure_started()
+        cancelled = self._cancelled
+        try:
+            executor.submit(_run_in_child, job_id, cfg_snapshot, batch_id).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            try:
+                cancelled.pop(job_id, None)
+            except Exception:
+                pass  # Manager already shut down
+
+    def cancel(self, job_id: str) -> None:
+        """
+        Ask the child process running a scrape to stop.
+
+        Args:
+            job_id: Pipeline job ID
+        """
+        with self._lock:
+            if self._cancelled is not None:
+                self._cancelled[job_id] = True
+
+    def shutdown(self) -> None:
+        """Stop the child processes and the listener thread."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            events, self._events = self._events, None
+            manager, self._manager = self._manager, None
+            self._cancelled = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if events is not None:
+            events.put(None)
+        if manager is not None:
+            manager.shutdown()
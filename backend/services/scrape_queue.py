@@ -0,0 +1,272 @@
+"""
+Scrape queue for the Job Bot API.
+Persists requested scrape runs and executes them on a bounded worker pool.
+"""
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import SCRAPE_EXECUTION_MODE, SCRAPE_QUEUE_WORKERS
+from job_bot import canonical_location
+from models import ScrapeQueueDB
+from services.db_writer import db_writer
+from services.pipeline import pipeline_manager
+from services.scrape_process import ScrapeProcessPool
+from services.scraper import ScraperService
+
+logger = logging.getLogger("job-agent")
+
+QueryKey = Tuple[str, str, str, str]
+
+
+def _query_keys(snapshot: Dict[str, Any]) -> Set[QueryKey]:
+    """
+    Get the normalized (site, title, location, country) queries a run would
+    send. Locations go through the same aliases as the query planner, so
+    "Bangalore" and "Bengaluru" are one query.
+    """
+    def split(csv: str) -> List[str]:
+        return [" ".join(part.split()).lower() for part in (csv or "").split(",") if part.strip()]
+
+    country = (snapshot.get("country") or "").strip().lower()
+    return {
+        (site, title, canonical_location(location).lower(), country)
+        for site in snapshot.get("sites") or []
+        for title in split(snapshot.get("titles", ""))
+        for location in split(snapshot.get("locations", ""))
+    }
+
+
+class ScrapeQueue:
+    """
+    Thread-safe persistent queue of scrape runs.
+
+    Runs are stored in the scrape_queue table and started in priority order
+    (then FIFO) on a pool of SCRAPE_QUEUE_WORKERS threads. A run that would
+    send any of the same (site, title, location, country) queries as a run
+    in progress waits for it, so two runs never scrape and deduplicate the
+    same results at once; runs that don't conflict start in parallel.
+    
+    With a process pool, each run's thread only waits for a child process
+    that does the actual scraping.
+    """
+
+    def __init__(self, max_workers: int, process_pool: Optional[ScrapeProcessPool] = None):
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._process_pool = process_pool
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-run")
+        self._seq = itertools.count()
+        self._queued: Dict[str, Dict[str, Any]] = {}
+        self._running: Dict[str, Dict[str, Any]] = {}
+
+    def enqueue(self, snapshot: Dict[str, Any], batch_id: str, priority: int = 0) -> str:
+        """
+        Queue a scrape run and start it if a worker is free.
+
+        Args:
+            snapshot: Config snapshot from ScraperService.prepare_config_snapshot
+            batch_id: Batch ID the run's jobs are saved under
+            priority: Higher runs first
+
+        Returns:
+            Pipeline ID of the run
+        """
+        job_id = pipeline_manager.create("scrape", state="queued")
+        db_writer.run(ScrapeQueue._insert, job_id, snapshot, batch_id, priority)
+
+        self._add(job_id, snapshot, batch_id, priority)
+        self._dispatch()
+        position = self.position(job_id)
+        if position:
+            pipeline_manager.log(job_id, f"Queued at position {position}, waiting for a free scrape worker")
+        return job_id
+
+    def restore(self) -> int:
+        """
+        Re-queue runs persisted by a previous process.
+        Runs that were in progress when it stopped are started again.
+
+        Returns:
+            Number of restored runs
+        """
+        restored = db_writer.run(ScrapeQueue._requeue_all)
+        for job_id, snapshot, batch_id, priority, status in restored:
+            pipeline_manager.create("scrape", state="queued", job_id=job_id)
+            self._add(job_id, snapshot, batch_id, priority)
+            if status == "running":
+                pipeline_manager.log(job_id, "Interrupted by a restart, queued again")
+
+        if restored:
+            logger.info(f"Restored {len(restored)} queued scrape runs")
+            self._dispatch()
+        return len(restored)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """
+        Get a run's 1-based position among queued runs.
+
+        Args:
+            job_id: Pipeline ID
+
+        Returns:
+            Queue position, or None if the run isn't waiting
+        """
+        with self._lock:
+            for i, queued_id in enumerate(self._ordered(), start=1):
+                if queued_id == job_id:
+                    return i
+        return None
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a queued or running scrape.
+        
+        A queued run is dropped right away. A running run is asked to stop
+        at its next checkpoint; jobs it saved so far are kept and its
+        pipeline turns "cancelled" once it has stopped.
+
+        Args:
+            job_id: Pipeline ID
+
+        Returns:
+            "cancelled" if the run was dropped from the queue, "cancelling"
+            if a running run was asked to stop, None if it isn't active
+        """
+        with self._lock:
+            queued = self._queued.pop(job_id, None) is not None
+            running = job_id in self._running
+
+        if queued:
+            self._remove(job_id)
+            pipeline_manager.update(job_id, state="cancelled")
+            pipeline_manager.log(job_id, "Cancelled before it started")
+            return "cancelled"
+        if running:
+            pipeline_manager.request_cancel(job_id)
+            if self._process_pool is not None:
+                self._process_pool.cancel(job_id)
+            return "cancelling"
+        return None
+
+    def _add(self, job_id: str, snapshot: Dict[str, Any], batch_id: str, priority: int) -> None:
+        with self._lock:
+            self._queued[job_id] = {
+                "snapshot": snapshot,
+                "batch_id": batch_id,
+                "priority": priority,
+                "seq": next(self._seq),
+                "queries": _query_keys(snapshot),
+            }
+
+    def _ordered(self) -> List[str]:
+        """Queued run IDs by priority, then arrival. Caller holds the lock."""
+        return sorted(self._queued, key=lambda j: (-self._queued[j]["priority"], self._queued[j]["seq"]))
+
+    def _dispatch(self) -> None:
+        """Start queued runs while workers are free and they don't conflict with running ones."""
+        to_start = []
+        with self._lock:
+            for job_id in self._ordered():
+                if len(self._running) >= self._max_workers:
+                    break
+                entry = self._queued[job_id]
+                if any(entry["queries"] & running["queries"] for running in self._running.values()):
+                    continue
+                self._running[job_id] = self._queued.pop(job_id)
+                to_start.append((job_id, entry))
+
+        for job_id, entry in to_start:
+            self._set_started(job_id)
+            pipeline_manager.update(job_id, state="running")
+            self._executor.submit(self._run, job_id, entry)
+
+    def _run(self, job_id: str, entry: Dict[str, Any]) -> None:
+        """Execute one run on a pool thread, then start whatever it was blocking."""
+        try:
+            if self._process_pool is not None:
+                self._process_pool.run(job_id, entry["snapshot"], entry["batch_id"])
+            else:
+                ScraperService.run_scrape_worker(job_id, entry["snapshot"], entry["batch_id"])
+        except Exception as e:
+            logger.error(f"Queued scrape {job_id} failed: {e}", exc_info=True)
+            pipeline_manager.update(job_id, state="failed", stats={"error": str(e)})
+        finally:
+            self._remove(job_id)
+            with self._lock:
+                self._running.pop(job_id, None)
+            self._dispatch()
+
+    @staticmethod
+    def _set_started(job_id: str) -> None:
+        try:
+            db_writer.run(ScrapeQueue._mark_running, job_id)
+        except Exception as e:
+            logger.warning(f"Failed to mark scrape {job_id} as running: {e}")
+
+    @staticmethod
+    def _remove(job_id: str) -> None:
+        try:
+            db_writer.run(ScrapeQueue._delete, job_id)
+        except Exception as e:
+            logger.warning(f"Failed to remove finished scrape {job_id} from the queue: {e}")
+
+    # Write operations, run on the database writer
+
+    @staticmethod
+    def _insert(db: Session, job_id: str, snapshot: Dict[str, Any], batch_id: str, priority: int) -> None:
+        db.add(ScrapeQueueDB(
+            job_id=job_id,
+            batch_id=batch_id,
+            priority=priority,
+            status="queued",
+            config=json.dumps(snapshot),
+        ))
+        db.commit()
+
+    @staticmethod
+    def _requeue_all(db: Session) -> List[Tuple[str, Dict[str, Any], str, int, str]]:
+        """Mark every persisted run queued; returns (job_id, snapshot, batch_id, priority, old status)."""
+        rows = db.query(ScrapeQueueDB).order_by(ScrapeQueueDB.created_at).all()
+        restored = [
+            (row.job_id, json.loads(row.config), row.batch_id, row.priority or 0, row.status)
+            for row in rows
+        ]
+        for row in rows:
+            row.status = "queued"
+            row.started_at = None
+        db.commit()
+        return restored
+
+    @staticmethod
+    def _mark_running(db: Session, job_id: str) -> None:
+        row = db.query(ScrapeQueueDB).filter(ScrapeQueueDB.job_id == job_id).first()
+        if row:
+            row.status = "running"
+            row.started_at = datetime.now(timezone.utc)
+            db.commit()
+
+    @staticmethod
+    def _delete(db: Session, job_id: str) -> None:
+        db.query(ScrapeQueueDB).filter(ScrapeQueueDB.job_id == job_id).delete()
+        db.commit()
+
+
+    def shutdown(self) -> None:
+        """Stop taking new runs and stop the process pool, if any."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+
+
+# Global scrape queue instance (thread-safe)
+scrape_queue = ScrapeQueue(
+    SCRAPE_QUEUE_WORKERS,
+    process_pool=ScrapeProcessPool(SCRAPE_QUEUE_WORKERS) if SCRAPE_EXECUTION_MODE == "process" else None,
+)
@@ -2,23 +2,101 @@
 Scraper service for the Job Bot API.
 Wraps the job_bot scraping functionality with business logic.
 """
-import uuid
 import logging
+import threading
+import time
+from concurrent.futures import Future, wait
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Callable
+from typing import Any, Dict, List, Callable, Optional, Set
 
 from sqlalchemy.orm import Session
 
+from config import (
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+    CIRCUIT_BREAKER_FAILURES,
+    DELTA_SAFETY_MARGIN_HOURS,
+    QUERY_YIELD_LOOKBACK_DAYS,
+    REPLAY_DESCRIPTION_LATENCY_MS,
+    REPLAY_FALLBACK,
+    REPLAY_JITTER_MS,
+    REPLAY_LATENCY_MS,
+    SCRAPE_CACHE_DIR,
+    SCRAPE_CACHE_ENABLED,
+    SCRAPE_CACHE_MAX_MB,
+    SCRAPE_CACHE_TTL_SECONDS,
+    SCRAPE_INSERT_BATCH_SIZE,
+    SCRAPE_INSERT_FLUSH_MS,
+    SCRAPE_MAX_RETRIES,
+    SCRAPE_MAX_WORKERS,
+    SCRAPE_RECORD,
+    SCRAPE_RECORDINGS_DIR,
+    SCRAPE_RETRY_BASE_SECONDS,
+    SCRAPE_RETRY_MAX_SECONDS,
+    SCRAPE_TWO_PHASE,
+    SCRAPER_BACKEND,
+    SITE_MAX_WORKERS,
+    SITE_RATE_LIMITS,
+    SITE_TIMEOUT_SECONDS,
+    SUPPORTED_SITES,
+)
 from database import SessionLocal
-from models import JobDB
+from services.db_writer import db_writer
 from services.pipeline import pipeline_manager
+from services.job_service import JobService
+from services.query_stats_service import QueryStatsService
+from services.watermark_service import WatermarkService
+from utils.circuit_breaker import CircuitBreaker
 from utils.helpers import normalize_job_url
+from utils.rate_limiter import AdaptiveRateLimiter, RetryPolicy, is_retryable_error, is_throttle_error
+from utils.scrape_cache import ScrapeCache
+from utils.scraper_backend import create_scraper_backend
 
 # Import scraping function from job_bot
 from job_bot import scrape_jobs_incremental
 
 logger = logging.getLogger("job-agent")
 
+# Shared by all scrape runs so repeat searches are served from disk
+scrape_cache = ScrapeCache(
+    SCRAPE_CACHE_DIR,
+    ttl_seconds=SCRAPE_CACHE_TTL_SECONDS,
+    max_bytes=SCRAPE_CACHE_MAX_MB * 1024 * 1024,
+) if SCRAPE_CACHE_ENABLED else None
+
+# Source of raw listings: the live portals, or recorded results replayed offline
+scraper_backend = create_scraper_backend(
+    SCRAPER_BACKEND,
+    SCRAPE_RECORDINGS_DIR,
+    record=SCRAPE_RECORD,
+    latency_seconds=REPLAY_LATENCY_MS / 1000,
+    jitter_seconds=REPLAY_JITTER_MS / 1000,
+    description_latency_seconds=REPLAY_DESCRIPTION_LATENCY_MS / 1000,
+    fallback=REPLAY_FALLBACK,
+)
+
+# Per-site rate limiters live for the whole process, so a site that
+# throttled the previous run starts the next one at the reduced rate
+site_rate_limiters = {
+    site: AdaptiveRateLimiter(**limits) for site, limits in SITE_RATE_LIMITS.items()
+}
+
+# Per-site circuit breakers, also process-wide: a portal that kept failing
+# stays skipped by new runs until its cooldown is over
+site_circuit_breakers = {
+    site: CircuitBreaker(CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_COOLDOWN_SECONDS)
+    for site in SUPPORTED_SITES
+}
+
+# Replayed runs only read the local disk: they aren't paced at the live
+# portals' rates and never use (or trip) the live circuit breakers
+replaying = scraper_backend.name == "replay"
+
+scrape_retry_policy = RetryPolicy(
+    max_retries=SCRAPE_MAX_RETRIES,
+    base_delay=SCRAPE_RETRY_BASE_SECONDS,
+    max_delay=SCRAPE_RETRY_MAX_SECONDS,
+)
+
 
 class ScraperService:
     """
@@ -43,6 +121,13 @@ class ScraperService:
         db = SessionLocal()
         count = 0
         duplicates = 0
+        # Guards the counters: known_urls_callback runs on scraper call threads
+        counter_lock = threading.Lock()
+        known_counted: Set[str] = set()
+        # Per-query [new, duplicate] save counts for query_stats
+        query_saves: Dict[tuple, List[int]] = {}
+        # Queued writes nobody waits for; finished before the worker returns
+        background_writes: List[Future] = []
         
         # Calculate total queries for progress tracking
         titles = [t.strip() for t in (cfg_snapshot.get("titles") or "").split(",") if t.strip()]
@@ -68,90 +153,271 @@ class ScraperService:
                 pipeline_manager.log(job_id, msg)
                 logger.info(f"[{job_id}] {msg}")
             
+            # Jobs waiting to be saved. Each flush hands them to the database
+            # writer, which upserts them with one multi-row statement: once
+            # per finished query, every SCRAPE_INSERT_BATCH_SIZE jobs or
+            # SCRAPE_INSERT_FLUSH_MS after the oldest was queued (checked
+            # at every poll of the scraper), whichever comes first.
+            pending: List[Dict[str, Any]] = []
+            pending_since = 0.0
+            # Queries with jobs that couldn't be saved; their watermark stays put
+            unsaved_queries: Set[tuple] = set()
+            
+            def query_key(job: Dict[str, Any]) -> tuple:
+                """The query_stats key of the query a job was found by."""
+                return QueryStatsService.make_key(
+                    job.get("source_site", ""),
+                    job.get("search_title", ""),
+                    job.get("search_location", ""),
+                )
+            
+            def flush() -> None:
+                """Deduplicate and save the buffered jobs, then update the stats."""
+                nonlocal count, duplicates
+                if not pending:
+                    return
+                jobs = list(pending)
+                pending.clear()
+                try:
+                    result = db_writer.run(
+                        JobService.save_jobs_with_duplicate_check,
+                        jobs, cfg_snapshot["titles"], cfg_snapshot["locations"], batch_id
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to save {len(jobs)} jobs: {e}")
+                    unsaved_queries.update(query_key(job) for job in jobs)
+                    return
+                
+                unsaved_queries.update(query_key(row) for row in result["failed"])
+                if result["saved"]:
+                    pipeline_manager.add_inserted(job_id, [row["id"] for row in result["saved"]])
+                with counter_lock:
+                    for key, rows in ((0, result["saved"]), (1, result["skipped"])):
+                        for row in rows:
+                            query_saves.setdefault(query_key(row), [0, 0])[key] += 1
+                    count += len(result["saved"])
+                    duplicates += len(result["skipped"])
+                    pipeline_manager.update(job_id, stats={
+                        "batch_id": batch_id,
+                        "new_jobs": count,
+                        "duplicates": duplicates
+                    })
+            
+            def flush_if_due() -> None:
+                """Flush once the oldest buffered job has waited SCRAPE_INSERT_FLUSH_MS."""
+                if pending and (time.monotonic() - pending_since) * 1000 >= SCRAPE_INSERT_FLUSH_MS:
+                    flush()
+            
             def save_job_callback(job_data: Dict[str, Any]) -> bool:
                 """
-                Callback to save a single job immediately.
-                Skips duplicate jobs based on normalized URL.
+                Callback to queue a single job for saving.
+                Duplicates (by normalized URL) are skipped when the queue is
+                flushed, so whether the job was new is only known then; the
+                scraper gets the real number from saved_count_callback.
                 
                 Args:
                     job_data: Dictionary containing job information
                     
                 Returns:
-                    True if saved successfully, False if skipped or failed
+                    True (the job is saved or skipped by the next flush)
                 """
-                nonlocal count, duplicates
-                try:
-                    # Get and normalize the job URL
-                    raw_url = job_data.get("job_url", "")
-                    normalized_url = normalize_job_url(raw_url)
-                    
-                    # Skip if no valid URL (can't dedupe, but still save)
-                    # Actually, if URL is empty, we should still save the job
-                    if normalized_url:
-                        # Check if a job with the same normalized URL already exists
-                        existing = db.query(JobDB).filter(
-                            JobDB.job_url == normalized_url
-                        ).first()
-                        
-                        if existing:
-                            # Skip this job - it's a duplicate
-                            duplicates += 1
-                            pipeline_manager.update(job_id, stats={
-                                "batch_id": batch_id,
-                                "new_jobs": count,
-                                "duplicates": duplicates
-                            })
-                            return True  # Return True because we handled it (by skipping)
-                    
-                    # Generate a unique ID for this job entry
-                    job_entry_id = str(uuid.uuid4())
-                    
-                    j = JobDB(
-                        id=job_entry_id,
-                        title=job_data.get("title", ""),
-                        company=job_data.get("company", ""),
-                        location=job_data.get("location", ""),
-                        job_url=normalized_url or raw_url,  # Use normalized URL, or raw if empty
-                        description=job_data.get("description", ""),
-                        is_remote=job_data.get("is_remote", False),
-                        date_posted=job_data.get("date_posted", ""),
-                        source_site=job_data.get("source_site", ""),
-                        search_title=cfg_snapshot["titles"],
-                        search_location=cfg_snapshot["locations"],
-                        batch_id=batch_id,
-                    )
-                    db.add(j)
-                    db.commit()
-                    count += 1
+                nonlocal pending_since
+                if not pending:
+                    pending_since = time.monotonic()
+                pending.append(job_data)
+                if len(pending) >= SCRAPE_INSERT_BATCH_SIZE:
+                    flush()
+                else:
+                    flush_if_due()
+                return True
+            
+            def saved_count_callback() -> int:
+                """
+                Flush the buffered jobs and count the new jobs saved so far.
+                
+                Returns:
+                    Number of jobs inserted by this run
+                """
+                flush()
+                return count
+            
+            def known_urls_callback(urls: List[str]) -> Set[str]:
+                """
+                Return the subset of raw job URLs that are already stored.
+                Lets the scraper skip description fetches for known jobs.
+                Runs on scraper call threads, so it uses its own session.
+                
+                Args:
+                    urls: Raw job URLs from one listing page
                     
-                    # Update stats in real-time
+                Returns:
+                    Raw URLs whose normalized form exists in the jobs table
+                """
+                nonlocal duplicates
+                normalized = {u: normalize_job_url(u) for u in urls}
+                wanted = list({n for n in normalized.values() if n})
+                if not wanted:
+                    return set()
+                
+                session = SessionLocal()
+                try:
+                    existing = JobService.existing_urls(session, wanted)
+                finally:
+                    session.close()
+                
+                known = {u for u, n in normalized.items() if n in existing}
+                with counter_lock:
+                    # Count each known job once even if several queries return it
+                    fresh = {normalized[u] for u in known} - known_counted
+                    known_counted.update(fresh)
+                    duplicates += len(fresh)
                     pipeline_manager.update(job_id, stats={
                         "batch_id": batch_id,
                         "new_jobs": count,
                         "duplicates": duplicates
                     })
-                    return True
-                except Exception as e:
-                    logger.error(f"Failed to save job: {e}")
-                    db.rollback()
-                    return False
+                return known
+            
+            # Optional budget: stop once enough new jobs are saved or time is up
+            target_new_jobs = cfg_snapshot.get("target_new_jobs")
+            max_duration = cfg_snapshot.get("max_duration_seconds")
+            deadline = time.monotonic() + max_duration if max_duration else None
+            
+            def budget_callback() -> bool:
+                """
+                Check whether the run's budget is used up.
+                
+                Returns:
+                    True once target_new_jobs were saved or max_duration_seconds passed
+                """
+                if target_new_jobs:
+                    # Buffered jobs may reach the target; save them to know
+                    if count + len(pending) >= target_new_jobs:
+                        flush()
+                    if count >= target_new_jobs:
+                        return True
+                return deadline is not None and time.monotonic() >= deadline
+            
+            # Run the queries that found the most new jobs recently first:
+            # measured new jobs per call where query_stats has them, else
+            # the jobs each query contributed in the lookback window
+            measured = QueryStatsService.measured_yields(db, QUERY_YIELD_LOOKBACK_DAYS)
+            yields = JobService.query_yields(db, QUERY_YIELD_LOOKBACK_DAYS)
+            
+            def query_yield_callback(site: str, title: str, location: str) -> float:
+                """
+                Expected new jobs of one query, from its recent history.
+                
+                Args:
+                    site: Job site name
+                    title: Search title
+                    location: Search location
+                    
+                Returns:
+                    Mean new jobs per call, or jobs found in the lookback
+                    window for queries without measurements
+                """
+                key = QueryStatsService.make_key(site, title, location)
+                if key in measured:
+                    return measured[key]
+                return yields.get(key, 0)
+            
+            # Delta mode narrows each query's window to the gap since its last success
+            delta = cfg_snapshot.get("scrape_mode") == "delta"
+            watermarks = WatermarkService.load(db, cfg_snapshot["country"]) if delta else {}
+            
+            def hours_old_callback(site: str, title: str, location: str) -> int:
+                """
+                Hours to request for one query.
+                
+                Args:
+                    site: Job site name
+                    title: Search title
+                    location: Search location
+                    
+                Returns:
+                    Narrowed hours_old in delta mode, the full window otherwise
+                """
+                key = WatermarkService.make_key(site, title, location, cfg_snapshot["country"])
+                return WatermarkService.delta_hours(
+                    watermarks.get(key), cfg_snapshot["hours_old"], DELTA_SAFETY_MARGIN_HOURS
+                )
+            
+            def write_in_background(message: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+                """
+                Queue a write without waiting for it; failures are logged.
+                
+                Args:
+                    message: Log message prefix if the write fails
+                    fn: Write operation, called with a session first
+                    *args: Positional arguments after the session
+                    **kwargs: Keyword arguments
+                """
+                def done(future: Future) -> None:
+                    if not future.cancelled() and future.exception() is not None:
+                        logger.error(f"{message}: {future.exception()}")
+                
+                future = db_writer.submit(fn, *args, **kwargs)
+                future.add_done_callback(done)
+                background_writes.append(future)
+            
+            def query_done_callback(event: Dict[str, Any]) -> None:
+                """
+                Record the call in query_stats and advance the query's
+                watermark after a successful live scrape. Cached results
+                don't move the watermark since they may predate the run,
+                and neither does a call that returned results_wanted rows
+                (older jobs in its window may have been cut off) or whose
+                jobs couldn't all be saved. Both writes are queued without
+                waiting for them.
+                
+                Args:
+                    event: Per-call event from the scraper
+                """
+                # The query's jobs were all handed to save_job_callback by now
+                flush()
+                stats_key = QueryStatsService.make_key(event["site"], event["title"], event["location"])
+                new_rows, save_duplicates = query_saves.pop(stats_key, [0, 0])
+                saved = stats_key not in unsaved_queries
+                unsaved_queries.discard(stats_key)
+                write_in_background(
+                    "Failed to record query stats",
+                    QueryStatsService.record, event, batch_id, cfg_snapshot["country"],
+                    new_rows=new_rows,
+                    duplicates=event["known_skipped"] + event["repeated"] + save_duplicates,
+                )
+                
+                if not event["ok"] or event["cache_hit"] or not saved:
+                    return
+                if event["raw"] >= event["results_wanted"]:
+                    log(f"{event['site']}: '{event['title']}' in '{event['location']}' hit the "
+                        f"{event['results_wanted']} result cap, keeping its watermark")
+                    return
+                key = WatermarkService.make_key(
+                    event["site"], event["title"], event["location"], cfg_snapshot["country"]
+                )
+                write_in_background(
+                    "Failed to record watermark",
+                    WatermarkService.record_success, key, event["started_at"], event["hours_old"]
+                )
             
             def progress_callback(current_query: int, total_queries: int, current_site: str):
                 """
                 Callback to update progress stats.
                 
                 Args:
-                    current_query: Current query number
+                    current_query: Number of completed queries
                     total_queries: Total number of queries
-                    current_site: Current site being scraped
+                    current_site: Per-site progress, e.g. "linkedin 2/6, indeed 6/6"
                 """
                 pipeline_manager.update(job_id, stats={
                     "current_query": current_query,
                     "total_queries": total_queries,
                     "current_site": current_site,
+                    "circuit_breakers": ScraperService.circuit_states(cfg_snapshot["sites"]),
                 })
             
-            log("Starting job scrape...")
+            log("Starting job scrape..." + (" (delta mode)" if delta else ""))
             
             # Use the incremental scraping function
             try:
@@ -168,37 +434,70 @@ class ScraperService:
                     log=log,
                     on_job_found=save_job_callback,
                     on_progress=progress_callback,
+                    max_workers=SCRAPE_MAX_WORKERS,
+                    site_workers=SITE_MAX_WORKERS,
+                    site_timeouts=SITE_TIMEOUT_SECONDS,
+                    known_urls=known_urls_callback if SCRAPE_TWO_PHASE else None,
+                    keyword_fields=cfg_snapshot.get("keyword_fields", "all"),
+                    keyword_whole_word=cfg_snapshot.get("keyword_whole_word", False),
+                    cache=scrape_cache,
+                    hours_old_for=hours_old_callback if delta else None,
+                    on_query_done=query_done_callback,
+                    rate_limiters=None if replaying else site_rate_limiters,
+                    retry=scrape_retry_policy,
+                    breakers=None if replaying else site_circuit_breakers,
+                    is_cancelled=lambda: pipeline_manager.is_cancel_requested(job_id),
+                    budget_met=budget_callback if target_new_jobs or deadline else None,
+                    query_yield=query_yield_callback,
+                    backend=scraper_backend,
+                    on_poll=flush_if_due,
+                    saved_count=saved_count_callback,
                 )
             except Exception as scrape_error:
+                flush()
                 # Handle scraping-specific errors
                 error_msg = str(scrape_error)
                 logger.error(f"Scraping error: {error_msg}")
                 log(f"Scraping error: {error_msg}")
                 
-                # Check for common error types
-                if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
-                    log("Request timed out. Some results may be incomplete.")
-                elif "connection" in error_msg.lower() or "network" in error_msg.lower():
+                # Per-site calls are already retried inside the scraper; this
+                # only explains errors that escaped the whole pipeline
+                if is_throttle_error(scrape_error):
+                    log("Rate limited or timed out by job site. Please wait before trying again.")
+                elif is_retryable_error(scrape_error):
                     log("Network error. Please check your connection.")
-                elif "rate limit" in error_msg.lower() or "429" in error_msg:
-                    log("Rate limited by job site. Please wait before trying again.")
                 
                 # Still mark as failed but with partial results if any
                 pipeline_manager.update(job_id, state="failed", stats={
                     "batch_id": batch_id,
                     "new_jobs": count,
                     "duplicates": duplicates,
+                    "circuit_breakers": ScraperService.circuit_states(cfg_snapshot["sites"]),
                     "error": error_msg
                 })
                 return
             
-            pipeline_manager.update(job_id, state="done", stats={
+            flush()
+            cancelled = bool(stats and stats.get("cancelled"))
+            pipeline_manager.update(job_id, state="cancelled" if cancelled else "done", stats={
                 "batch_id": batch_id,
                 "new_jobs": count,
                 "duplicates": duplicates,
-                "total_scraped": stats.get("raw_total", 0) if stats else 0
+                "total_scraped": stats.get("raw_total", 0) if stats else 0,
+                "timed_out": stats.get("timed_out", 0) if stats else 0,
+                "cache_hits": stats.get("cache_hits", 0) if stats else 0,
+                "cache_misses": stats.get("cache_misses", 0) if stats else 0,
+                "retries": stats.get("retries", 0) if stats else 0,
+                "circuit_skipped": stats.get("circuit_skipped", 0) if stats else 0,
+                "budget_met": bool(stats and stats.get("budget_met")),
+                "circuit_breakers": ScraperService.circuit_states(cfg_snapshot["sites"]),
             })
-            log(f"Complete. Added {count} new jobs ({duplicates} duplicates skipped).")
+            if cancelled:
+                log(f"Cancelled. Kept {count} new jobs ({duplicates} duplicates skipped).")
+            elif stats and stats.get("budget_met"):
+                log(f"Budget reached. Added {count} new jobs ({duplicates} duplicates skipped).")
+            else:
+                log(f"Complete. Added {count} new jobs ({duplicates} duplicates skipped).")
             
         except Exception as e:
             logger.error(f"Scrape worker failed: {e}", exc_info=True)
@@ -210,15 +509,39 @@ class ScraperService:
                 "error": str(e)
             })
         finally:
+            wait(background_writes)
             db.close()
     
+    @staticmethod
+    def circuit_states(sites: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the circuit breaker state of each site for pipeline stats.
+        
+        Args:
+            sites: Site names
+            
+        Returns:
+            Dict mapping site to its breaker snapshot (state, failures,
+            retry_in_seconds); empty for replayed runs, which use no breakers
+        """
+        if replaying:
+            return {}
+        return {
+            site: site_circuit_breakers[site].snapshot()
+            for site in sites
+            if site in site_circuit_breakers
+        }
+    
     @staticmethod
     def prepare_config_snapshot(
         cfg,
         titles: str,
         locations: str,
         country: str,
-        hours_old: int
+        hours_old: int,
+        scrape_mode: str = "full",
+        target_new_jobs: Optional[int] = None,
+        max_duration_seconds: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Prepare a configuration snapshot for scraping.
@@ -229,6 +552,9 @@ class ScraperService:
             locations: Locations to search
             country: Country code
             hours_old: Maximum age of jobs in hours
+            scrape_mode: "full" window or "delta" since each query's last success
+            target_new_jobs: Optional number of new jobs after which the run stops
+            max_duration_seconds: Optional time budget of the run
             
         Returns:
             Configuration dictionary
@@ -242,5 +568,10 @@ class ScraperService:
             "exclude_keywords": cfg.exclude_keywords or "",
             "results_per_site": cfg.results_per_site or 20,
             "hours_old": hours_old,
-            "data_mode": cfg.data_mode or "compact"
+            "data_mode": cfg.data_mode or "full",
+            "keyword_fields": cfg.keyword_fields or "all",
+            "keyword_whole_word": bool(cfg.keyword_whole_word),
+            "scrape_mode": scrape_mode,
+            "target_new_jobs": target_new_jobs,
+            "max_duration_seconds": max_duration_seconds,
         }
@@ -0,0 +1,177 @@
+"""
+Job URL index for the Job Bot API.
+Keeps 64-bit fingerprints of every stored job URL in memory so URLs
+that were never stored can be ruled out without querying SQLite.
+"""
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import JobDB
+
+logger = logging.getLogger("job-agent")
+
+# Rows whose fetched_at falls this far before the last refresh are read
+# again, so a transaction that committed late is never missed
+_REFRESH_SLACK = timedelta(seconds=60)
+
+# Lookups catch up on other processes' inserts at most this often
+_REFRESH_INTERVAL = timedelta(seconds=30)
+
+EMPTY = "empty"
+LOADING = "loading"
+READY = "ready"
+
+
+def url_fingerprint(job_url: str) -> int:
+    """
+    Get the 64-bit fingerprint of a normalized job URL.
+
+    Args:
+        job_url: Normalized job URL
+
+    Returns:
+        Unsigned 64-bit integer (BLAKE2b digest)
+    """
+    return int.from_bytes(hashlib.blake2b(job_url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class UrlIndex:
+    """
+    Thread-safe in-memory set of job URL fingerprints.
+
+    A URL whose fingerprint is missing was not stored when the index last
+    caught up. A URL whose fingerprint is present is only a candidate:
+    deletes made by other processes (e.g. the API clearing jobs while a
+    scrape child process runs) leave stale fingerprints behind, and
+    fingerprints can collide. Callers confirm hits against the jobs table.
+
+    The set is filled from the jobs table by a background thread (warm) and
+    kept current by this process's committed inserts and deletes. At most
+    every 30 seconds a lookup also reads rows fetched since the last
+    refresh, which picks up jobs inserted by other processes (e.g. the
+    scrape process pool); until then such jobs may look new.
+
+    Memory: a Python set of 64-bit ints costs about 70 bytes per URL, so
+    roughly 70 MB at 1M stored jobs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprints: Set[int] = set()
+        self._state = EMPTY
+        self._refreshed_at: Optional[datetime] = None
+
+    @property
+    def state(self) -> str:
+        """Index state: "empty", "loading" or "ready"."""
+        return self._state
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def warm(self) -> None:
+        """Start loading the index in a background thread, unless already started."""
+        with self._lock:
+            if self._state != EMPTY:
+                return
+            self._state = LOADING
+        threading.Thread(target=self._load, name="url-index-load", daemon=True).start()
+
+    def _load(self) -> None:
+        """Read every stored job URL. Executed on the loader thread."""
+        began = time.monotonic()
+        loaded_at = datetime.now(timezone.utc)
+        fingerprints: Set[int] = set()
+        session = SessionLocal()
+        try:
+            for (job_url,) in session.query(JobDB.job_url).filter(JobDB.job_url != "").yield_per(10000):
+                fingerprints.add(url_fingerprint(job_url))
+        except Exception as e:
+            logger.warning(f"Failed to load the job URL index, using database lookups: {e}")
+            with self._lock:
+                self._state = EMPTY
+            return
+        finally:
+            session.close()
+
+        with self._lock:
+            # Inserts made while loading were added to the (still unused) set
+            self._fingerprints |= fingerprints
+            self._refreshed_at = loaded_at
+            self._state = READY
+        logger.info(
+            f"Loaded {len(fingerprints)} job URL fingerprints in {time.monotonic() - began:.1f}s"
+        )
+
+    def _refresh(self, db: Session) -> None:
+        """Add jobs fetched since the last refresh, by any process."""
+        now = datetime.now(timezone.utc)
+        since = self._refreshed_at - _REFRESH_SLACK
+        rows = db.query(JobDB.job_url).filter(JobDB.fetched_at >= since, JobDB.job_url != "").all()
+        with self._lock:
+            self._fingerprints.update(url_fingerprint(row[0]) for row in rows)
+            self._refreshed_at = max(self._refreshed_at, now)
+
+    def lookup(self, db: Session, job_urls: Iterable[str]) -> Optional[List[str]]:
+        """
+        Get the URLs whose fingerprint is stored.
+
+        Until the index is loaded None is returned (and loading is
+        started), so callers check every URL against the table.
+
+        Args:
+            db: Database session used to catch up on other processes' inserts
+            job_urls: Normalized job URLs
+
+        Returns:
+            URLs that may be stored (to be confirmed), or None
+        """
+        if self._state != READY:
+            self.warm()
+            return None
+        if datetime.now(timezone.utc) - self._refreshed_at >= _REFRESH_INTERVAL:
+            self._refresh(db)
+        fingerprints = self._fingerprints
+        return [url for url in job_urls if url_fingerprint(url) in fingerprints]
+
+    def add(self, job_urls: Iterable[str]) -> None:
+        """
+        Record newly stored job URLs. Call only once the insert is
+        committed (see database.after_commit), or a rolled-back job would
+        look stored.
+
+        Args:
+            job_urls: Normalized job URLs that were inserted
+        """
+        with self._lock:
+            self._fingerprints.update(url_fingerprint(url) for url in job_urls if url)
+
+    def remove(self, job_urls: Iterable[str]) -> None:
+        """
+        Forget deleted job URLs.
+        If another stored URL shared the fingerprint (about one chance in
+        2 * 10^13 per delete at 1M jobs) it would look new afterwards.
+
+        Args:
+            job_urls: Normalized job URLs that were deleted
+        """
+        with self._lock:
+            for url in job_urls:
+                if url:
+                    self._fingerprints.discard(url_fingerprint(url))
+
+    def clear(self) -> None:
+        """Forget all URLs after the jobs table was emptied."""
+        with self._lock:
+            self._fingerprints.clear()
+
+
+# Global job URL index (thread-safe), loaded on startup
+url_index = UrlIndex()
@@ -0,0 +1,137 @@
+"""
+Watermark service for the Job Bot API.
+Tracks per-query high-water marks used for delta scraping.
+"""
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import QueryWatermarkDB
+
+logger = logging.getLogger("job-agent")
+
+WatermarkKey = Tuple[str, str, str, str]
+
+
+def _utc(dt: datetime) -> datetime:
+    """SQLite returns naive datetimes; treat them as UTC."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class WatermarkService:
+    """
+    Service class for query high-water marks.
+    A watermark records when a (site, title, location, country) query last
+    succeeded and since when its postings are covered.
+    """
+    
+    @staticmethod
+    def make_key(site: str, title: str, location: str, country: str) -> WatermarkKey:
+        """
+        Build a normalized watermark key.
+        
+        Args:
+            site: Job site name
+            title: Search title
+            location: Search location
+            country: Country code
+            
+        Returns:
+            Tuple of lowercase, whitespace-collapsed key parts
+        """
+        return tuple(" ".join((part or "").lower().split()) for part in (site, title, location, country))
+    
+    @staticmethod
+    def load(db: Session, country: str) -> Dict[WatermarkKey, QueryWatermarkDB]:
+        """
+        Load all watermarks for a country.
+        
+        Args:
+            db: Database session
+            country: Country code
+            
+        Returns:
+            Dictionary mapping watermark keys to rows
+        """
+        country = " ".join((country or "").lower().split())
+        rows = db.query(QueryWatermarkDB).filter(QueryWatermarkDB.country == country).all()
+        return {(r.site, r.title, r.location, r.country): r for r in rows}
+    
+    @staticmethod
+    def delta_hours(
+        watermark: Optional[QueryWatermarkDB],
+        hours_old: int,
+        margin_hours: int,
+        now: Optional[datetime] = None
+    ) -> int:
+        """
+        Compute the hours_old needed to cover only the gap since the last scrape.
+        
+        Falls back to the full window when the query was never scraped or
+        when the requested window reaches further back than what is covered.
+        
+        Args:
+            watermark: Watermark row, or None if the query was never scraped
+            hours_old: Full time window requested by the user
+            margin_hours: Safety margin added to the gap
+            now: Current time (defaults to now, UTC)
+            
+        Returns:
+            Hours to request, between 1 and hours_old
+        """
+        if watermark is None:
+            return hours_old
+        
+        now = now or datetime.now(timezone.utc)
+        if now - timedelta(hours=hours_old) < _utc(watermark.covered_since):
+            return hours_old
+        
+        gap_hours = (now - _utc(watermark.last_scraped_at)).total_seconds() / 3600
+        return max(1, min(hours_old, math.ceil(gap_hours + margin_hours)))
+    
+    @staticmethod
+    def record_success(
+        db: Session,
+        key: WatermarkKey,
+        started_at: datetime,
+        hours_old: int
+    ) -> QueryWatermarkDB:
+        """
+        Advance a query's watermark after a successful scrape.
+        
+        The covered range is extended when the new window overlaps the
+        previous one, and restarted otherwise.
+        
+        Args:
+            db: Database session
+            key: Watermark key from make_key
+            started_at: When the successful scrape started (UTC)
+            hours_old: Time window the scrape covered
+            
+        Returns:
+            Updated QueryWatermarkDB instance
+        """
+        window_start = started_at - timedelta(hours=hours_old)
+        site, title, location, country = key
+        
+        wm = db.query(QueryWatermarkDB).filter_by(
+            site=site, title=title, location=location, country=country
+        ).first()
+        if wm is None:
+            wm = QueryWatermarkDB(
+                site=site, title=title, location=location, country=country,
+                last_scraped_at=started_at, covered_since=window_start,
+            )
+            db.add(wm)
+        else:
+            if window_start <= _utc(wm.last_scraped_at):
+                wm.covered_since = min(_utc(wm.covered_since), window_start)
+            else:
+                wm.covered_since = window_start
+            wm.last_scraped_at = max(_utc(wm.last_scraped_at), started_at)
+        
+        db.commit()
+        return wm
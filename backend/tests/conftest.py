@@ -0,0 +1,39 @@
+"""
+Shared pytest setup for the backend tests.
+Points the app at a throwaway database and the offline replay backend
+before any backend module reads its configuration.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="findmyjobai-tests-")
+os.environ["DB_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'jobs.db')}"
+os.environ["SCRAPER_BACKEND"] = "replay"
+os.environ["SCRAPE_RECORDINGS_DIR"] = os.path.join(_TMP_DIR, "recordings")
+os.environ["SCRAPE_CACHE_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the test database once per session."""
+    from database import init_db
+    init_db()
+
+
+@pytest.fixture
+def db():
+    """Database session on an empty jobs table."""
+    from database import SessionLocal
+    from services.job_service import JobService
+
+    session = SessionLocal()
+    JobService.clear_all_jobs(session)
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,60 @@
+"""
+Tests for the per-site circuit breaker.
+"""
+import time
+
+from utils.circuit_breaker import CircuitBreaker
+
+
+def _open_breaker(cooldown: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=cooldown)
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = _open_breaker(cooldown=60)
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_released_probe_can_be_taken_again():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.release()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
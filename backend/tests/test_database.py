@@ -0,0 +1,104 @@
+"""
+Tests for the startup migrations and the SQLite tuning profile.
+"""
+from sqlalchemy import create_engine, text
+
+from database import (
+    _JOURNAL_MODES, SessionLocal, _choice, _migrate_content_addressed_ids, engine, get_sqlite_diagnostics,
+    run_migrations,
+)
+from models import SettingsDB
+from routes.settings import database_diagnostics
+from services.db_writer import db_writer
+from services.job_service import SettingsService
+from utils.helpers import job_id_for_url
+
+
+def _data_mode() -> str:
+    session = SessionLocal()
+    try:
+        return session.query(SettingsDB).filter_by(key="config").one().data_mode
+    finally:
+        session.close()
+
+
+def test_unchosen_compact_data_mode_is_reset_once():
+    session = SessionLocal()
+    session.query(SettingsDB).delete()
+    session.add(SettingsDB(key="config", data_mode="compact"))
+    session.commit()
+    session.close()
+    with engine.begin() as conn:
+        conn.execute(text("PRAGMA user_version = 0"))
+
+    run_migrations()
+    assert _data_mode() == "full"
+
+    # Chosen after the reset: kept by later startups
+    session = SessionLocal()
+    session.query(SettingsDB).filter_by(key="config").update({"data_mode": "compact"})
+    session.commit()
+    session.close()
+    run_migrations()
+    assert _data_mode() == "compact"
+
+
+def test_tuning_profile_is_active_on_connections():
+    session = SessionLocal()
+    try:
+        diagnostics = get_sqlite_diagnostics(session)
+    finally:
+        session.close()
+
+    assert diagnostics["active"]["journal_mode"] == "WAL"
+    assert diagnostics["active"]["synchronous"] == "NORMAL"
+    assert diagnostics["active"]["temp_store"] == "MEMORY"
+    assert diagnostics["active"]["busy_timeout"] == diagnostics["configured"]["busy_timeout"]
+
+
+def test_invalid_tuning_values_fall_back_to_the_default():
+    assert _choice("SQLITE_JOURNAL_MODE", "wal2", _JOURNAL_MODES, "WAL") == "WAL"
+    assert _choice("SQLITE_JOURNAL_MODE", "TRUNCATE", _JOURNAL_MODES, "WAL") == "TRUNCATE"
+
+
+def test_diagnostics_endpoint_reports_sizes_and_the_writer(db):
+    before = database_diagnostics(db=db)
+    db_writer.run(SettingsService.update_settings, titles="python developer")
+    after = database_diagnostics(db=db)
+
+    assert after["dialect"] == "sqlite"
+    assert after["active"]["journal_mode"] == "WAL"
+    assert after["size_bytes"] >= after["page_size"] > 0
+    assert 0 <= after["free_bytes"] <= after["size_bytes"]
+    assert after["writer"]["transactions"] > before["writer"]["transactions"]
+    assert after["writer"]["queued"] == 0
+
+
+def test_jobs_move_to_url_derived_ids_and_duplicates_collapse(tmp_path):
+    old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, job_url TEXT, url_key TEXT, status TEXT, created_at TEXT)"
+        ))
+        conn.execute(text("CREATE INDEX ix_jobs_job_url ON jobs (job_url)"))
+        conn.execute(text("INSERT INTO jobs VALUES (:id, :url, :url, :status, :created)"), [
+            {"id": "a", "url": "https://jobs.example/1?utm_source=x", "status": "new", "created": "2024-01-01"},
+            {"id": "b", "url": "https://jobs.example/1", "status": "saved", "created": "2024-02-01"},
+            {"id": "c", "url": "https://jobs.example/2", "status": "new", "created": "2024-01-01"},
+            {"id": "d", "url": "", "status": "new", "created": "2024-01-01"},
+        ])
+
+    with old.begin() as conn:
+        assert _migrate_content_addressed_ids(conn) == (2, 1)
+
+    with old.connect() as conn:
+        rows = conn.execute(text("SELECT id, job_url, status FROM jobs ORDER BY job_url")).fetchall()
+        columns = [row[1] for row in conn.execute(text("PRAGMA table_info(jobs)"))]
+    # The job the user acted on wins over the older untouched duplicate
+    assert [tuple(row) for row in rows] == [
+        ("d", "", "new"),
+        (job_id_for_url("https://jobs.example/1"), "https://jobs.example/1", "saved"),
+        (job_id_for_url("https://jobs.example/2"), "https://jobs.example/2", "new"),
+    ]
+    assert "url_key" not in columns
+    old.dispose()
@@ -0,0 +1,153 @@
+"""
+Tests for the single-writer queue and the write paths routed through it.
+"""
+import threading
+
+import pytest
+from sqlalchemy import event
+
+import job_bot
+from database import after_commit, engine
+from models import JobDB, ScrapeQueueDB, SettingsDB
+from services.db_writer import db_writer
+from services.job_service import JobService, SettingsService
+from services.scrape_queue import ScrapeQueue
+
+_WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+def _insert_run(session, job_id, fail=False):
+    session.add(ScrapeQueueDB(job_id=job_id, batch_id="b", priority=0, status="queued", config="{}"))
+    session.flush()
+    if fail:
+        raise ValueError("rejected")
+    session.commit()
+    return job_id
+
+
+def _clear_runs(session):
+    session.query(ScrapeQueueDB).delete()
+    session.commit()
+
+
+@pytest.fixture
+def blocked_writer():
+    """Event that holds the writer thread until set, so the test can queue a group."""
+    entered, release = threading.Event(), threading.Event()
+
+    def block(session):
+        entered.set()
+        release.wait(5)
+
+    db_writer.submit(block)
+    assert entered.wait(5)
+    yield release
+    release.set()
+    db_writer.run(_clear_runs)
+
+
+@pytest.fixture
+def write_threads():
+    """Names of the threads that sent write statements while the test runs."""
+    threads = set()
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(_WRITES):
+            threads.add(threading.current_thread().name)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield threads
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_queued_operations_share_one_transaction(db, blocked_writer):
+    before = db_writer.snapshot()["transactions"]
+    futures = [db_writer.submit(_insert_run, f"run-{i}") for i in range(5)]
+    blocked_writer.set()
+
+    assert [future.result(5) for future in futures] == [f"run-{i}" for i in range(5)]
+    # The blocking operation, then the five queued behind it
+    assert db_writer.snapshot()["transactions"] - before == 2
+
+
+def test_failing_operation_only_rolls_back_its_own_work(db, blocked_writer):
+    ok = db_writer.submit(_insert_run, "kept-1")
+    failing = db_writer.submit(_insert_run, "dropped", fail=True)
+    also_ok = db_writer.submit(_insert_run, "kept-2")
+    blocked_writer.set()
+
+    assert ok.result(5) == "kept-1" and also_ok.result(5) == "kept-2"
+    with pytest.raises(ValueError):
+        failing.result(5)
+    assert sorted(row.job_id for row in db.query(ScrapeQueueDB)) == ["kept-1", "kept-2"]
+
+
+def test_after_commit_callbacks_run_before_the_future_resolves(db):
+    seen = []
+    holder = {}
+
+    def op(session):
+        _insert_run(session, "run-1")
+        after_commit(session, lambda: seen.append(holder["future"].done()))
+
+    holder["future"] = db_writer.submit(op)
+    holder["future"].result(5)
+    db_writer.run(_clear_runs)
+
+    assert seen == [False]
+
+
+def test_operations_cannot_queue_nested_writes(db):
+    with pytest.raises(RuntimeError):
+        db_writer.run(lambda session: db_writer.run(_clear_runs))
+
+
+def _delete_settings(session):
+    session.query(SettingsDB).delete()
+    session.commit()
+
+
+def test_settings_are_created_through_the_writer(db, write_threads):
+    db_writer.run(_delete_settings)
+    write_threads.clear()
+
+    cfg = SettingsService.get_or_create_settings(db)
+    updated = db_writer.run(SettingsService.update_settings, titles="python developer")
+
+    assert cfg.key == "config"
+    assert updated.titles == "python developer"
+    assert write_threads == {"db-writer"}
+
+
+def test_queue_bookkeeping_runs_on_the_writer(db, write_threads):
+    db_writer.run(ScrapeQueue._insert, "run-1", {"sites": ["indeed"]}, "batch-1", 0)
+    ScrapeQueue._set_started("run-1")
+    assert db.query(ScrapeQueueDB).filter_by(job_id="run-1").one().status == "running"
+
+    restored = db_writer.run(ScrapeQueue._requeue_all)
+    assert [(job_id, status) for job_id, _, _, _, status in restored] == [("run-1", "running")]
+
+    ScrapeQueue._remove("run-1")
+    assert db.query(ScrapeQueueDB).count() == 0
+    assert write_threads == {"db-writer"}
+
+
+def test_opened_job_description_is_stored_by_the_writer(db, write_threads, monkeypatch):
+    job = {
+        "job_url": "https://linkedin.example/jobs/1",
+        "title": "Data Engineer",
+        "source_site": "linkedin",
+        "description": "",
+        "description_pending": True,
+    }
+    db_writer.run(JobService.save_jobs_with_duplicate_check, [job], "t", "l", "b1")
+    monkeypatch.setattr(job_bot, "fetch_job_descriptions", lambda urls, site, backend=None: {
+        url: "Build Spark pipelines" for url in urls
+    })
+    write_threads.clear()
+
+    opened = JobService.ensure_description(db, db.query(JobDB).one())
+
+    assert opened.description == "Build Spark pipelines"
+    assert not opened.description_pending
+    assert write_threads == {"db-writer"}
@@ -0,0 +1,372 @@
+"""
+Tests for the streaming scrape pipeline in job_bot.
+"""
+import threading
+import time
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from job_bot import _plan_queries, iter_jobs
+from utils.circuit_breaker import CircuitBreaker
+from utils.rate_limiter import AdaptiveRateLimiter, RetryPolicy
+from utils.scraper_backend import ScraperBackend
+
+
+def _frame(site: str, title: str, n: int = 3, descriptions: bool = True) -> pd.DataFrame:
+    slug = title.replace(" ", "-")
+    return pd.DataFrame({
+        "job_url": [f"https://{site}.example/jobs/{slug}-{i}" for i in range(n)],
+        "title": [f"{title} {i}" for i in range(n)],
+        "company": ["Acme"] * n,
+        "location": ["Pune"] * n,
+        "description": [f"{title} role number {i}" if descriptions else None for i in range(n)],
+        "site": [site] * n,
+    })
+
+
+def _listings(params: Dict[str, Any]) -> pd.DataFrame:
+    """Listings as JobSpy returns them: LinkedIn descriptions only when requested."""
+    site = params["site_name"][0]
+    descriptions = site != "linkedin" or params.get("linkedin_fetch_description", False)
+    return _frame(site, params["search_term"], descriptions=descriptions)
+
+
+class SlowBackend(ScraperBackend):
+    """Returns a small frame per call after a fixed delay."""
+
+    name = "slow"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.started = threading.Event()
+        self.calls: List[Dict[str, Any]] = []
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        self.calls.append(params)
+        self.started.set()
+        time.sleep(self.delay)
+        return _listings(params)
+
+
+def _run(backend: ScraperBackend, **kwargs) -> List[Dict[str, Any]]:
+    options = dict(
+        sites=["indeed"],
+        titles_csv="python developer",
+        locations_csv="Pune",
+        include_keywords_csv="",
+        exclude_keywords_csv="",
+        results_per_site=20,
+        hours_old=72,
+        data_mode="full",
+        log=lambda msg: None,
+        backend=backend,
+    )
+    options.update(kwargs)
+    return list(iter_jobs(**options))
+
+
+def test_cancel_during_probe_releases_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    backend = SlowBackend(delay=2.0)
+    stats: Dict[str, Any] = {}
+
+    began = time.monotonic()
+    _run(backend, breakers={"indeed": breaker}, is_cancelled=backend.started.is_set, stats=stats)
+
+    assert stats["cancelled"]
+    assert time.monotonic() - began < 1.5
+    assert breaker.allow(), "abandoned probe must not keep the breaker half-open"
+
+
+def test_budget_stop_during_probe_releases_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    backend = SlowBackend(delay=2.0)
+    stats: Dict[str, Any] = {}
+
+    _run(backend, breakers={"indeed": breaker}, budget_met=backend.started.is_set, stats=stats)
+
+    assert stats["budget_met"]
+    assert breaker.allow()
+
+
+class HangingBackend(SlowBackend):
+    """The first call never returns in time; later calls are quick."""
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        first = not self.calls
+        self.calls.append(params)
+        time.sleep(30 if first else 0.05)
+        return _listings(params)
+
+
+def test_timed_out_call_frees_its_worker_slot():
+    backend = HangingBackend()
+    stats: Dict[str, Any] = {}
+
+    began = time.monotonic()
+    jobs = _run(
+        backend,
+        titles_csv="python developer, java developer, go developer",
+        max_workers=1,
+        site_timeouts={"indeed": 1.0},
+        stats=stats,
+    )
+
+    # One worker: the hanging call is abandoned after 1s and the other two
+    # run right after it instead of queueing behind its thread
+    assert stats["timed_out"] == 1
+    assert len(jobs) == 6
+    assert time.monotonic() - began < 3.0
+
+
+def test_call_timeout_is_measured_from_submission():
+    backend = SlowBackend(delay=0.6)
+    stats: Dict[str, Any] = {}
+
+    jobs = _run(
+        backend,
+        titles_csv="python developer, java developer, go developer",
+        max_workers=1,
+        site_timeouts={"indeed": 2.0},
+        stats=stats,
+    )
+
+    assert stats["timed_out"] == 0
+    assert len(jobs) == 9
+
+
+def test_compact_mode_keeps_jobs_whose_description_is_pending():
+    backend = SlowBackend()
+    jobs = _run(
+        backend,
+        sites=["linkedin", "indeed"],
+        titles_csv="data engineer",
+        data_mode="compact",
+        include_keywords_csv="spark",
+    )
+
+    # LinkedIn descriptions are fetched on open, so the include keyword
+    # can't rule those jobs out; Indeed descriptions are there and don't match
+    assert len(jobs) == 3
+    assert all(job["source_site"] == "linkedin" and job["description_pending"] for job in jobs)
+    assert backend.calls[0]["linkedin_fetch_description"] is False
+
+
+def test_full_mode_is_the_default_for_unknown_values():
+    backend = SlowBackend()
+    _run(backend, sites=["linkedin"], data_mode="")
+
+    assert backend.calls[0]["linkedin_fetch_description"] is True
+
+
+def test_exclude_keywords_still_apply_to_known_fields_of_pending_jobs():
+    jobs = _run(
+        SlowBackend(),
+        sites=["linkedin"],
+        titles_csv="data engineer",
+        data_mode="compact",
+        exclude_keywords_csv="acme",
+    )
+
+    assert jobs == []
+
+
+def _keyword_run(**kwargs) -> List[str]:
+    """Titles kept from a fixed set of Indeed listings by the keyword filters."""
+    listings = pd.DataFrame({
+        "job_url": [f"https://indeed.example/jobs/{i}" for i in range(4)],
+        "title": ["Java Developer", "JavaScript Engineer", "C++ Engineer", "Data Analyst"],
+        "company": ["Acme"] * 4,
+        "location": ["Pune"] * 4,
+        "description": ["Build services", "React apps", "Low latency", "Java and SQL reports"],
+        "site": ["indeed"] * 4,
+    })
+    backend = SlowBackend()
+    backend.scrape = lambda params: listings
+    return [job["title"] for job in _run(backend, **kwargs)]
+
+
+def test_whole_word_keywords_skip_longer_words():
+    assert _keyword_run(include_keywords_csv="java") == ["Java Developer", "JavaScript Engineer", "Data Analyst"]
+    assert _keyword_run(include_keywords_csv="java", keyword_whole_word=True) == ["Java Developer", "Data Analyst"]
+    assert _keyword_run(include_keywords_csv="c++", keyword_whole_word=True) == ["C++ Engineer"]
+    assert _keyword_run(exclude_keywords_csv="java", keyword_whole_word=True) == [
+        "JavaScript Engineer", "C++ Engineer",
+    ]
+
+
+def test_keywords_match_only_the_selected_fields():
+    assert _keyword_run(include_keywords_csv="java", keyword_fields="title") == [
+        "Java Developer", "JavaScript Engineer",
+    ]
+    assert _keyword_run(include_keywords_csv="java", keyword_fields="description") == ["Data Analyst"]
+    assert _keyword_run(exclude_keywords_csv="acme", keyword_fields="title") == [
+        "Java Developer", "JavaScript Engineer", "C++ Engineer", "Data Analyst",
+    ]
+    # Unknown values search every field
+    assert _keyword_run(exclude_keywords_csv="acme", keyword_fields="salary") == []
+
+
+def test_plan_keeps_narrower_titles_and_merges_location_aliases():
+    plan = _plan_queries(
+        ["java", "java developer", "engineer", "data engineer"],
+        ["Bangalore", "Bengaluru", "Pune"],
+        ["linkedin"],
+        results_per_site=20,
+        data_mode="full",
+    )
+
+    assert plan.titles == ["java", "java developer", "engineer", "data engineer"]
+    assert plan.locations == ["Bengaluru", "Pune"]
+    assert len(plan.queries) == 8
+    assert plan.calls == 8
+
+
+def test_poll_runs_while_a_call_is_in_flight():
+    polls: List[float] = []
+    _run(SlowBackend(delay=1.2), on_poll=lambda: polls.append(time.monotonic()))
+
+    assert len(polls) >= 2
+
+
+def test_queries_fan_out_across_workers_and_sites():
+    backend = SlowBackend(delay=0.5)
+    stats: Dict[str, Any] = {}
+
+    began = time.monotonic()
+    jobs = _run(
+        backend,
+        sites=["indeed", "glassdoor"],
+        titles_csv="python developer, java developer, go developer",
+        max_workers=3,
+        stats=stats,
+    )
+
+    # Six calls of 0.5s each: three per site at once, both sites side by side
+    assert len(backend.calls) == 6
+    assert len(jobs) == 18
+    assert time.monotonic() - began < 1.4
+
+
+class DescriptionBackend(SlowBackend):
+    """LinkedIn listings without descriptions; each description takes a while."""
+
+    def __init__(self, description_delay: float):
+        super().__init__()
+        self.description_delay = description_delay
+        self.described: List[str] = []
+
+    def fetch_description(self, job_url: str, site: str) -> str:
+        self.described.append(job_url)
+        time.sleep(self.description_delay)
+        return f"About {job_url}"
+
+
+def _two_phase(backend: SlowBackend, **kwargs) -> List[Dict[str, Any]]:
+    """Two-phase LinkedIn run of ten listings, none of them stored yet."""
+    listings = _frame("linkedin", "data engineer", n=10, descriptions=False)
+    backend.scrape = lambda params: listings
+    return _run(backend, sites=["linkedin"], known_urls=lambda urls: set(), **kwargs)
+
+
+def test_abandoned_call_stops_fetching_descriptions():
+    backend = DescriptionBackend(description_delay=0.2)
+    stats: Dict[str, Any] = {}
+
+    _two_phase(backend, site_timeouts={"linkedin": 0.5}, stats=stats)
+    time.sleep(1.0)
+
+    assert stats["timed_out"] == 1
+    assert len(backend.described) <= 4
+
+
+def test_cancelled_run_stops_fetching_descriptions():
+    backend = DescriptionBackend(description_delay=0.2)
+
+    _two_phase(backend, is_cancelled=lambda: len(backend.described) >= 2)
+    time.sleep(1.0)
+
+    assert len(backend.described) <= 3
+
+
+class CountingLimiter(AdaptiveRateLimiter):
+    """Fast limiter that counts the requests it paced and the throttles it saw."""
+
+    def __init__(self):
+        super().__init__(rate=1000, burst=100)
+        self.acquired = 0
+        self.throttled = 0
+
+    def acquire(self) -> float:
+        self.acquired += 1
+        return super().acquire()
+
+    def on_throttle(self) -> None:
+        self.throttled += 1
+        super().on_throttle()
+
+
+class ThrottledDescriptionBackend(DescriptionBackend):
+    """The first description request is answered with a 429."""
+
+    def fetch_description(self, job_url: str, site: str) -> str:
+        if not self.described:
+            self.described.append(job_url)
+            raise RuntimeError("429 Too Many Requests")
+        return super().fetch_description(job_url, site)
+
+
+def test_description_requests_wait_for_the_site_limiter():
+    backend = ThrottledDescriptionBackend(description_delay=0.0)
+    limiter = CountingLimiter()
+
+    jobs = _two_phase(backend, rate_limiters={"linkedin": limiter})
+
+    # The listing call and one request per listing
+    assert limiter.acquired == 11
+    assert limiter.throttled == 1
+    assert sum(1 for job in jobs if job["description"]) == 9
+
+
+class FlakyDescriptionBackend(DescriptionBackend):
+    """Description requests fail with the given error; flaky ones only on the first try."""
+
+    def __init__(self, error: str, always: bool = False):
+        super().__init__(description_delay=0.0)
+        self.error = error
+        self.always = always
+
+    def fetch_description(self, job_url: str, site: str) -> str:
+        if self.always or job_url not in self.described:
+            self.described.append(job_url)
+            raise RuntimeError(self.error)
+        return f"About {job_url}"
+
+
+def test_failed_description_requests_are_retried():
+    backend = FlakyDescriptionBackend("503 Service Unavailable")
+    breaker = CircuitBreaker(failure_threshold=3)
+    stats: Dict[str, Any] = {}
+
+    jobs = _two_phase(backend, retry=RetryPolicy(max_retries=1, base_delay=0.01),
+                      breakers={"linkedin": breaker}, stats=stats)
+
+    assert sum(1 for job in jobs if job["description"]) == 10
+    assert stats["retries"] == 10
+    assert breaker.state == "closed"
+
+
+def test_failing_description_requests_open_the_breaker():
+    backend = FlakyDescriptionBackend("403 Forbidden", always=True)
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=60)
+
+    _two_phase(backend, breakers={"linkedin": breaker})
+
+    # The call stops sending description requests once the breaker opens
+    assert breaker.state == "open"
+    assert len(backend.described) == 3
@@ -0,0 +1,45 @@
+"""
+Tests for saving jobs with URL-derived IDs and upsert deduplication.
+"""
+from models import JobDB
+from services.db_writer import db_writer
+from services.job_service import JobService
+from utils.helpers import job_id_for_url
+
+
+def _save(jobs, batch_id="b1"):
+    return db_writer.run(JobService.save_jobs_with_duplicate_check, jobs, "t", "l", batch_id)
+
+
+def test_repeats_within_a_batch_are_skipped(db):
+    result = _save([
+        {"job_url": "https://jobs.example/1", "title": "First"},
+        {"job_url": "https://jobs.example/1/?utm_source=feed", "title": "Same job"},
+        {"job_url": "https://jobs.example/2", "title": "Second"},
+    ])
+
+    assert [row["title"] for row in result["saved"]] == ["First", "Second"]
+    assert [job["title"] for job in result["skipped"]] == ["Same job"]
+    assert result["saved"][0]["id"] == job_id_for_url("https://jobs.example/1")
+
+
+def test_stored_jobs_are_skipped_and_marked_seen(db):
+    _save([{"job_url": "https://jobs.example/1", "title": "First"}])
+    before = db.query(JobDB).one()
+    fetched_at, last_seen_at = before.fetched_at, before.last_seen_at
+
+    result = _save([{"job_url": "https://jobs.example/1", "title": "Rescraped"}], batch_id="b2")
+
+    assert result["saved"] == []
+    assert len(result["skipped"]) == 1
+    db.expire_all()
+    after = db.query(JobDB).one()
+    assert (after.title, after.batch_id, after.fetched_at) == ("First", "b1", fetched_at)
+    assert after.last_seen_at > last_seen_at
+
+
+def test_jobs_without_url_are_still_saved(db):
+    result = _save([{"job_url": "", "title": "No link"}, {"job_url": "", "title": "No link either"}])
+
+    assert len(result["saved"]) == 2
+    assert db.query(JobDB).count() == 2
@@ -0,0 +1,43 @@
+"""
+Tests for pipeline state tracking and expiry.
+"""
+from datetime import datetime, timedelta, timezone
+
+from config import PIPELINE_EXPIRY_SECONDS
+from services.pipeline import PipelineManager
+
+
+def _age(manager: PipelineManager, job_id: str) -> None:
+    """Pretend the pipeline started longer ago than the expiry."""
+    started = datetime.now(timezone.utc) - timedelta(seconds=PIPELINE_EXPIRY_SECONDS + 60)
+    manager._pipelines[job_id]["started_at"] = started.isoformat()
+
+
+def test_queued_and_running_pipelines_never_expire():
+    manager = PipelineManager()
+    job_id = manager.create("scrape", state="queued")
+    _age(manager, job_id)
+    manager.create("scrape")
+    assert manager.get(job_id) is not None
+
+    manager.update(job_id, state="running")
+    _age(manager, job_id)
+    manager.create("scrape")
+    assert manager.get(job_id) is not None
+
+    manager.update(job_id, state="done")
+    manager.create("scrape")
+    assert manager.get(job_id) is None
+
+
+def test_start_time_counts_from_when_the_run_starts():
+    manager = PipelineManager()
+    job_id = manager.create("scrape", state="queued")
+    _age(manager, job_id)
+
+    manager.update(job_id, state="running")
+    manager.update(job_id, state="done")
+    manager.create("scrape")
+
+    # Finished right after a long wait in the queue: not expired yet
+    assert manager.get(job_id)["state"] == "done"
@@ -0,0 +1,93 @@
+"""
+Tests for per-query scrape statistics and their summary endpoint.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from models import QueryStatDB
+from routes.search import get_query_stats
+from services.db_writer import db_writer
+from services.query_stats_service import QueryStatsService
+from utils.exceptions import ValidationError
+
+
+def _clear_stats(session):
+    session.query(QueryStatDB).delete()
+    session.commit()
+
+
+@pytest.fixture(autouse=True)
+def stats():
+    db_writer.run(_clear_stats)
+    yield
+    db_writer.run(_clear_stats)
+
+
+def _record(site: str, title: str, new_rows: int, days_ago: float = 0, **overrides: Any) -> None:
+    """Store one call, as the scrape worker does after the call's jobs are saved."""
+    event = {
+        "site": site,
+        "title": title,
+        "location": " pune ",
+        "started_at": datetime.now(timezone.utc) - timedelta(days=days_ago),
+        "wall_seconds": 1.0,
+        "raw": new_rows + 2,
+        "filtered": 1,
+        "kept": new_rows + 1,
+        "ok": True,
+        "cache_hit": False,
+        "timed_out": False,
+    }
+    event.update(overrides)
+    db_writer.run(QueryStatsService.record, event, "batch", "India", new_rows=new_rows, duplicates=1)
+
+
+def test_summary_totals_sites_and_ranks_queries(db):
+    _record("indeed", "Python  Developer", 4, wall_seconds=2.0)
+    _record("indeed", "python developer", 2, wall_seconds=4.0)
+    _record("indeed", "java developer", 1, timed_out=True, ok=False)
+    _record("linkedin", "python developer", 0, cache_hit=True)
+    _record("indeed", "rust developer", 9, days_ago=30)
+
+    summary = QueryStatsService.summary(db, since_days=7)
+
+    indeed = summary["sites"]["indeed"]
+    assert indeed["calls"] == 3
+    assert indeed["new_rows"] == 7
+    assert indeed["failed"] == 1 and indeed["timed_out"] == 1
+    assert summary["sites"]["linkedin"]["cache_hits"] == 1
+
+    best = summary["queries"][0]
+    assert (best["site"], best["title"], best["location"]) == ("indeed", "python developer", "pune")
+    assert best["calls"] == 2
+    assert best["new_per_call"] == 3.0
+    assert best["avg_wall_seconds"] == 3.0 and best["max_wall_seconds"] == 4.0
+    assert [q["title"] for q in summary["queries"]] == ["python developer", "java developer", "python developer"]
+
+    only_linkedin = QueryStatsService.summary(db, since_days=7, site="linkedin", limit=1)
+    assert list(only_linkedin["sites"]) == ["linkedin"]
+    assert len(only_linkedin["queries"]) == 1
+
+
+def test_measured_yields_leave_out_cache_hits(db):
+    _record("indeed", "python developer", 6)
+    _record("indeed", "python developer", 0, cache_hit=True)
+    _record("indeed", "go developer", 3, days_ago=30)
+
+    yields = QueryStatsService.measured_yields(db, since_days=7)
+
+    assert yields == {("indeed", "python developer", "pune"): 6.0}
+
+
+def test_query_stats_endpoint_clamps_its_arguments(db):
+    for title in ("python developer", "java developer"):
+        _record("indeed", title, 1)
+
+    result = get_query_stats(days=1000, site=None, limit=1, db=db)
+
+    assert result["since_days"] == 365
+    assert len(result["queries"]) == 1
+    with pytest.raises(ValidationError):
+        get_query_stats(days=7, site="monster", limit=50, db=db)
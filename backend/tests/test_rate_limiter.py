@@ -0,0 +1,73 @@
+"""
+Tests for the adaptive rate limiter and the retry helper.
+"""
+import time
+
+import pytest
+
+from utils.rate_limiter import AdaptiveRateLimiter, RetryPolicy, call_with_retry, is_retryable_error
+
+
+def test_limiter_decreases_on_throttle_and_recovers():
+    limiter = AdaptiveRateLimiter(rate=4, min_rate=1, max_rate=4, increase=1)
+    limiter.on_throttle()
+    assert limiter.rate == 2
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate == 1
+    limiter.on_success()
+    assert limiter.rate == 2
+
+
+def test_limiter_paces_requests_after_burst():
+    limiter = AdaptiveRateLimiter(rate=20, burst=1)
+    limiter.acquire()
+    began = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - began >= 0.04
+
+
+def test_retries_retryable_errors_then_succeeds():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("429 Too Many Requests")
+        return "ok"
+
+    policy = RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.01)
+    assert call_with_retry(flaky, policy=policy) == "ok"
+    assert len(attempts) == 3
+
+
+def test_non_retryable_error_is_raised_at_once():
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad search term")
+
+    assert not is_retryable_error(ValueError("bad search term"))
+    with pytest.raises(ValueError):
+        call_with_retry(broken, policy=RetryPolicy(max_retries=3, base_delay=0.01))
+    assert len(attempts) == 1
+
+
+def test_no_retry_starts_past_the_deadline():
+    attempts = []
+
+    def throttled():
+        attempts.append(time.monotonic())
+        raise RuntimeError("429 Too Many Requests")
+
+    policy = RetryPolicy(max_retries=5, base_delay=0.5, max_delay=0.5)
+    deadline = time.monotonic() + 0.2
+    with pytest.raises(RuntimeError):
+        call_with_retry(throttled, policy=policy, deadline=deadline)
+    # Backoff is jittered, so the number of attempts varies; none is late
+    assert attempts and all(at < deadline for at in attempts)
+    assert time.monotonic() < deadline + 0.5
+
+    with pytest.raises(TimeoutError):
+        call_with_retry(lambda: "late", deadline=time.monotonic() - 1)
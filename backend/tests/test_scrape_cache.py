@@ -0,0 +1,60 @@
+"""
+Tests for the on-disk scrape result cache.
+"""
+import os
+import time
+
+import pandas as pd
+
+from utils.scrape_cache import ScrapeCache
+
+_PARAMS = {"site_name": ["indeed"], "search_term": "python developer", "location": "Pune", "hours_old": 72}
+
+
+def _frame(n: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({"job_url": [f"https://indeed.example/{i}" for i in range(n)]})
+
+
+def test_round_trip_keyed_by_all_parameters(tmp_path):
+    cache = ScrapeCache(str(tmp_path), ttl_seconds=60, max_bytes=10**6)
+    cache.put(_PARAMS, _frame())
+
+    assert cache.get(dict(_PARAMS)).equals(_frame())
+    assert cache.get(dict(_PARAMS, hours_old=24)) is None
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ScrapeCache(str(tmp_path), ttl_seconds=60, max_bytes=10**6)
+    cache.put(_PARAMS, _frame())
+    path = cache._path(_PARAMS)
+    written = time.time() - 120
+    os.utime(path, (written, written))
+
+    assert cache.get(_PARAMS) is None
+    assert not os.path.exists(path)
+
+
+def test_unreadable_entries_are_misses(tmp_path):
+    cache = ScrapeCache(str(tmp_path), ttl_seconds=60, max_bytes=10**6)
+    with open(cache._path(_PARAMS), "wb") as f:
+        f.write(b"not a pickle")
+
+    assert cache.get(_PARAMS) is None
+
+
+def test_least_recently_read_entries_are_evicted(tmp_path):
+    cache = ScrapeCache(str(tmp_path), ttl_seconds=60, max_bytes=10**6)
+    old, recent = dict(_PARAMS, location="Delhi"), dict(_PARAMS, location="Mumbai")
+    cache.put(old, _frame())
+    cache.put(recent, _frame())
+    now = time.time()
+    os.utime(cache._path(old), (now - 30, now))
+    os.utime(cache._path(recent), (now - 10, now))
+    size = os.path.getsize(cache._path(old))
+
+    cache.max_bytes = 2 * size
+    cache.put(_PARAMS, _frame())
+
+    assert cache.get(old) is None
+    assert cache.get(recent) is not None
+    assert cache.get(_PARAMS) is not None
@@ -0,0 +1,100 @@
+"""
+Tests for running scrapes in child processes, against the replay backend.
+"""
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import pytest
+
+from config import SCRAPE_RECORDINGS_DIR
+from services.job_service import JobService
+from services.pipeline import pipeline_manager
+from services.scrape_process import ScrapeProcessPool
+from utils.scraper_backend import RecordingBackend, ScraperBackend
+
+
+class _FrameBackend(ScraperBackend):
+    name = "live"
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        return self.df
+
+
+def _record(title: str, n: int) -> None:
+    slug = title.replace(" ", "-")
+    df = pd.DataFrame({
+        "job_url": [f"https://indeed.example/jobs/{slug}-{i}" for i in range(n)],
+        "title": [f"{title} {i}" for i in range(n)],
+        "company": ["Acme"] * n,
+        "location": ["Pune"] * n,
+        "description": [f"{title} role number {i}" for i in range(n)],
+        "site": ["indeed"] * n,
+    })
+    RecordingBackend(_FrameBackend(df), SCRAPE_RECORDINGS_DIR).scrape({
+        "site_name": ["indeed"], "search_term": title, "location": "Pune", "country_indeed": "india",
+    })
+
+
+def _snapshot(titles: str) -> Dict[str, Any]:
+    return {
+        "titles": titles,
+        "locations": "Pune",
+        "country": "india",
+        "sites": ["indeed"],
+        "include_keywords": "",
+        "exclude_keywords": "",
+        "results_per_site": 20,
+        "hours_old": 72,
+        "data_mode": "full",
+        "scrape_mode": "full",
+    }
+
+
+def _settled(job_id: str, timeout: float = 10) -> Optional[Dict[str, Any]]:
+    """The pipeline once the listener applied the child's final update."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pipeline = pipeline_manager.get(job_id)
+        if pipeline and pipeline["state"] not in ("queued", "running"):
+            return pipeline
+        time.sleep(0.05)
+    return pipeline_manager.get(job_id)
+
+
+@pytest.fixture
+def pool():
+    pool = ScrapeProcessPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_child_run_reports_to_the_api_process(db, pool):
+    _record("golang developer", 4)
+    job_id = pipeline_manager.create("scrape")
+
+    pool.run(job_id, _snapshot("golang developer"), str(uuid.uuid4()))
+    pipeline = _settled(job_id)
+
+    assert pipeline["state"] == "done"
+    assert pipeline["stats"]["new_jobs"] == 4
+    assert len(pipeline["logs"]) > 0
+    assert JobService.get_stats(db)["total"] == 4
+
+
+def test_cancel_reaches_the_child_process(db, pool):
+    _record("haskell developer", 4)
+    job_id = pipeline_manager.create("scrape")
+
+    # Start the pool, then cancel before the run is submitted
+    pool._ensure_started()
+    pool.cancel(job_id)
+    pool.run(job_id, _snapshot("haskell developer"), str(uuid.uuid4()))
+    pipeline = _settled(job_id)
+
+    assert pipeline["state"] == "cancelled"
+    assert JobService.get_stats(db)["total"] == 0
@@ -0,0 +1,118 @@
+"""
+Tests for the persistent scrape queue: ordering, conflicts, cancellation and restore.
+"""
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from models import ScrapeQueueDB
+from services.db_writer import db_writer
+from services.pipeline import pipeline_manager
+from services.scrape_queue import ScrapeQueue, _query_keys
+from services.scraper import ScraperService
+
+
+def _snapshot(titles: str) -> Dict[str, Any]:
+    return {"sites": ["indeed"], "titles": titles, "locations": "Pune", "country": "india"}
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class _Worker:
+    """Stands in for the scrape worker: runs until released or cancelled."""
+
+    def __init__(self):
+        self.started: List[str] = []
+        self.release = threading.Event()
+
+    def __call__(self, job_id: str, snapshot: Dict[str, Any], batch_id: str) -> None:
+        self.started.append(job_id)
+        while not self.release.wait(0.01):
+            if pipeline_manager.is_cancel_requested(job_id):
+                pipeline_manager.update(job_id, state="cancelled")
+                return
+        pipeline_manager.update(job_id, state="done")
+
+
+def _clear_runs(session):
+    session.query(ScrapeQueueDB).delete()
+    session.commit()
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    fake = _Worker()
+    monkeypatch.setattr(ScraperService, "run_scrape_worker", fake)
+    yield fake
+    fake.release.set()
+    db_writer.run(_clear_runs)
+
+
+def _rows(db) -> Dict[str, str]:
+    db.expire_all()
+    return {row.job_id: row.status for row in db.query(ScrapeQueueDB)}
+
+
+def test_cancel_drops_queued_runs_and_stops_running_ones(db, worker):
+    queue = ScrapeQueue(max_workers=1)
+    running = queue.enqueue(_snapshot("python developer"), "b1")
+    queued = queue.enqueue(_snapshot("java developer"), "b2")
+    assert _wait_for(lambda: worker.started == [running])
+    assert queue.position(queued) == 1
+    assert _rows(db) == {running: "running", queued: "queued"}
+
+    assert queue.cancel(queued) == "cancelled"
+    assert pipeline_manager.get(queued)["state"] == "cancelled"
+    assert _rows(db) == {running: "running"}
+
+    assert queue.cancel(running) == "cancelling"
+    assert _wait_for(lambda: _rows(db) == {})
+    assert pipeline_manager.get(running)["state"] == "cancelled"
+    assert worker.started == [running]
+    # The row goes first, then the run leaves the running set
+    assert _wait_for(lambda: queue.cancel(running) is None)
+    queue.shutdown()
+
+
+def test_runs_sharing_a_query_wait_for_each_other(db, worker):
+    queue = ScrapeQueue(max_workers=2)
+    first = queue.enqueue(_snapshot("python developer"), "b1")
+    same = queue.enqueue(_snapshot("Python  Developer, go developer"), "b2")
+    other = queue.enqueue(_snapshot("java developer"), "b3")
+
+    assert _wait_for(lambda: sorted(worker.started) == sorted([first, other]))
+    assert queue.position(same) == 1
+
+    worker.release.set()
+    assert _wait_for(lambda: same in worker.started)
+    queue.shutdown()
+
+
+def test_location_aliases_are_the_same_query():
+    bangalore = dict(_snapshot("python developer"), locations="Bangalore")
+    bengaluru = dict(_snapshot("Python Developer"), locations="bengaluru")
+
+    assert _query_keys(bangalore) == _query_keys(bengaluru)
+
+
+def test_restore_requeues_persisted_runs(db, worker):
+    db_writer.run(ScrapeQueue._insert, "interrupted", _snapshot("python developer"), "b1", 0)
+    ScrapeQueue._set_started("interrupted")
+
+    queue = ScrapeQueue(max_workers=1)
+    assert queue.restore() == 1
+    assert _wait_for(lambda: worker.started == ["interrupted"])
+    assert "Interrupted by a restart, queued again" in pipeline_manager.get("interrupted")["logs"]
+
+    worker.release.set()
+    assert _wait_for(lambda: _rows(db) == {})
+    queue.shutdown()
@@ -0,0 +1,226 @@
+"""
+Tests for the scrape worker, run end to end against the replay backend.
+"""
+import os
+import time
+import uuid
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+from config import SCRAPE_RECORDINGS_DIR, SITE_MAX_WORKERS
+from sqlalchemy import text
+
+from database import SessionLocal, engine
+from models import JobDB
+from services.db_writer import db_writer
+from services.job_service import JobService
+from services.pipeline import pipeline_manager
+from services.scraper import ScraperService, site_circuit_breakers, site_rate_limiters
+from services.url_index import READY, url_index
+from services.watermark_service import WatermarkService
+from utils.scraper_backend import RecordingBackend, ScraperBackend
+
+
+class _FrameBackend(ScraperBackend):
+    """Returns a fixed frame; wrapped by RecordingBackend to write recordings."""
+
+    name = "live"
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        return self.df
+
+
+def _listings(site: str, title: str, n: int) -> pd.DataFrame:
+    slug = title.replace(" ", "-")
+    return pd.DataFrame({
+        "job_url": [f"https://{site}.example/jobs/{slug}-{i}" for i in range(n)],
+        "title": [f"{title} {i}" for i in range(n)],
+        "company": ["Acme"] * n,
+        "location": ["Pune"] * n,
+        "description": [f"{title} role number {i}" for i in range(n)],
+        "site": [site] * n,
+    })
+
+
+def _record(site: str, title: str, location: str, n: int, country: str = "india") -> pd.DataFrame:
+    """Record a query's results for the replay backend the worker uses."""
+    df = _listings(site, title, n)
+    RecordingBackend(_FrameBackend(df), SCRAPE_RECORDINGS_DIR).scrape({
+        "site_name": [site], "search_term": title, "location": location, "country_indeed": country,
+    })
+    return df
+
+
+def _snapshot(**overrides: Any) -> Dict[str, Any]:
+    snapshot = {
+        "titles": "python developer",
+        "locations": "Pune",
+        "country": "india",
+        "sites": ["indeed"],
+        "include_keywords": "",
+        "exclude_keywords": "",
+        "results_per_site": 20,
+        "hours_old": 72,
+        "data_mode": "full",
+        "keyword_fields": "all",
+        "keyword_whole_word": False,
+        "scrape_mode": "full",
+        "target_new_jobs": None,
+        "max_duration_seconds": None,
+    }
+    snapshot.update(overrides)
+    return snapshot
+
+
+def _scrape(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    job_id = pipeline_manager.create("scrape")
+    ScraperService.run_scrape_worker(job_id, snapshot, str(uuid.uuid4()))
+    return pipeline_manager.get(job_id)
+
+
+@pytest.fixture(autouse=True)
+def recordings():
+    """An empty recordings directory, and a replay backend that forgot earlier ones."""
+    from services.scraper import scraper_backend
+
+    os.makedirs(SCRAPE_RECORDINGS_DIR, exist_ok=True)
+    for name in os.listdir(SCRAPE_RECORDINGS_DIR):
+        os.remove(os.path.join(SCRAPE_RECORDINGS_DIR, name))
+    scraper_backend._frames.clear()
+
+
+def _save(df: pd.DataFrame) -> None:
+    jobs: List[Dict[str, Any]] = [
+        {"job_url": url, "title": "seen before", "source_site": "indeed"} for url in df["job_url"]
+    ]
+    db_writer.run(JobService.save_jobs_with_duplicate_check, jobs, "t", "l", "old-batch")
+
+
+def test_run_reports_jobs_saved_rather_than_jobs_found(db):
+    _save(_record("indeed", "python developer", "Pune", 10))
+    _record("indeed", "java developer", "Pune", 10)
+
+    pipeline = _scrape(_snapshot(titles="python developer, java developer"))
+
+    assert pipeline["state"] == "done"
+    assert pipeline["stats"]["new_jobs"] == 10
+    assert pipeline["stats"]["duplicates"] == 10
+    assert any("Kept=10," in line for line in pipeline["logs"])
+    assert JobService.get_stats(db)["total"] == 20
+
+
+def _watermarked(titles: List[str]) -> List[str]:
+    """The given titles that have a watermark for indeed in Pune."""
+    session = SessionLocal()
+    try:
+        watermarks = WatermarkService.load(session, "india")
+    finally:
+        session.close()
+    return [t for t in titles if WatermarkService.make_key("indeed", t, "Pune", "india") in watermarks]
+
+
+def test_watermark_stays_put_when_a_call_hits_the_result_cap(db):
+    _record("indeed", "rust developer", "Pune", 5)
+    _record("indeed", "scala developer", "Pune", 3)
+
+    pipeline = _scrape(_snapshot(
+        titles="rust developer, scala developer", results_per_site=5, scrape_mode="delta",
+    ))
+
+    assert pipeline["stats"]["new_jobs"] == 8
+    # Five rows is the cap: older jobs in the window may have been cut off
+    assert _watermarked(["rust developer", "scala developer"]) == ["scala developer"]
+
+
+def test_watermark_stays_put_when_the_jobs_were_not_saved(db, monkeypatch):
+    _record("indeed", "elixir developer", "Pune", 3)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(JobService, "save_jobs_with_duplicate_check", broken)
+    pipeline = _scrape(_snapshot(titles="elixir developer", scrape_mode="delta"))
+
+    assert pipeline["stats"]["new_jobs"] == 0
+    assert _watermarked(["elixir developer"]) == []
+
+
+def test_replay_runs_leave_the_live_limiters_and_breakers_alone(db, monkeypatch):
+    _record("indeed", "kotlin developer", "Pune", 3)
+    breaker = site_circuit_breakers["indeed"]
+    monkeypatch.setattr(breaker, "_state", "open")
+    monkeypatch.setattr(breaker, "_opened_at", float("inf"))
+
+    def paced(*args, **kwargs):
+        raise AssertionError("replayed calls must not wait for the live rate limiter")
+
+    if "indeed" in site_rate_limiters:
+        monkeypatch.setattr(site_rate_limiters["indeed"], "acquire", paced)
+
+    pipeline = _scrape(_snapshot(titles="kotlin developer"))
+
+    # The open live breaker would have skipped the query
+    assert pipeline["stats"]["new_jobs"] == 3
+    assert pipeline["stats"]["circuit_breakers"] == {}
+
+
+def test_jobs_deleted_by_another_process_are_scraped_again(db):
+    url_index.warm()
+    deadline = time.monotonic() + 5
+    while url_index.state != READY and time.monotonic() < deadline:
+        time.sleep(0.01)
+    _record("linkedin", "data engineer", "Pune", 7)
+    snapshot = _snapshot(titles="data engineer", sites=["linkedin"])
+    assert _scrape(snapshot)["stats"]["new_jobs"] == 7
+
+    # Cleared by the API while this (child) process keeps its index
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM jobs"))
+    pipeline = _scrape(snapshot)
+
+    assert pipeline["stats"]["new_jobs"] == 7
+    assert not any("KnownSkipped=7" in line for line in pipeline["logs"])
+
+
+def test_budgeted_run_stops_at_the_target_after_the_best_query(db, monkeypatch):
+    monkeypatch.setitem(SITE_MAX_WORKERS, "indeed", 1)
+    for title in ("perl developer", "swift developer", "ruby developer"):
+        _record("indeed", title, "Pune", 10)
+    # Earlier runs found jobs for ruby developer only
+    old = [
+        {"job_url": f"https://indeed.example/old/{i}", "title": "ruby", "source_site": "indeed"}
+        for i in range(3)
+    ]
+    db_writer.run(JobService.save_jobs_with_duplicate_check, old, "ruby developer", "Pune", "old-batch")
+
+    pipeline = _scrape(_snapshot(
+        titles="perl developer, swift developer, ruby developer", target_new_jobs=5,
+    ))
+
+    assert pipeline["state"] == "done"
+    assert pipeline["stats"]["budget_met"]
+    assert pipeline["stats"]["new_jobs"] == 10
+    saved = {job.search_title for job in db.query(JobDB).filter(JobDB.batch_id != "old-batch")}
+    assert saved == {"ruby developer"}
+
+
+def test_run_stops_when_its_time_budget_is_used(db, monkeypatch):
+    from services.scraper import scraper_backend
+
+    monkeypatch.setitem(SITE_MAX_WORKERS, "indeed", 1)
+    monkeypatch.setattr(scraper_backend, "latency_seconds", 0.3)
+    titles = [f"cobol developer {i}" for i in range(6)]
+    for title in titles:
+        _record("indeed", title, "Pune", 2)
+
+    started = time.monotonic()
+    pipeline = _scrape(_snapshot(titles=", ".join(titles), max_duration_seconds=1))
+
+    assert pipeline["stats"]["budget_met"]
+    assert pipeline["stats"]["new_jobs"] < 12
+    assert time.monotonic() - started < 1.8
@@ -0,0 +1,59 @@
+"""
+Tests for recording scrape results and replaying them offline.
+"""
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import pytest
+
+from utils.scraper_backend import RecordingBackend, ReplayBackend, ScraperBackend
+
+
+class _Portal(ScraperBackend):
+    """A fake live portal."""
+
+    name = "live"
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        term = params["search_term"]
+        return pd.DataFrame({"job_url": [f"https://linkedin.example/jobs/view/{term}-{i}" for i in range(10)]})
+
+    def fetch_description(self, job_url: str, site: str) -> Optional[str]:
+        return f"About {job_url}"
+
+
+def _params(title: str, results_wanted: int = 10) -> Dict[str, Any]:
+    return {"site_name": ["linkedin"], "search_term": title, "location": "Pune",
+            "country_indeed": "india", "results_wanted": results_wanted}
+
+
+def test_replay_serves_what_was_recorded(tmp_path):
+    recorder = RecordingBackend(_Portal(), str(tmp_path))
+    recorded = recorder.scrape(_params("python"))
+    urls = list(recorded["job_url"][:2])
+    recorder.fetch_descriptions(urls, "linkedin")
+
+    replay = ReplayBackend(str(tmp_path))
+    # The query is matched case- and whitespace-insensitively, cut to results_wanted
+    replayed = replay.scrape(_params(" Python ", results_wanted=4))
+
+    assert replayed.equals(recorded.head(4))
+    assert replay.fetch_descriptions(urls + ["https://linkedin.example/unknown"], "linkedin") == {
+        url: f"About {url}" for url in urls
+    }
+
+
+def test_unrecorded_queries_fall_back_to_the_same_site(tmp_path):
+    RecordingBackend(_Portal(), str(tmp_path)).scrape(_params("python"))
+
+    assert len(ReplayBackend(str(tmp_path)).scrape(_params("golang"))) == 10
+    assert ReplayBackend(str(tmp_path), fallback=False).scrape(_params("golang")).empty
+    assert ReplayBackend(str(tmp_path)).scrape(dict(_params("python"), site_name=["indeed"])).empty
+
+
+def test_backends_must_implement_scrape():
+    class Incomplete(ScraperBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
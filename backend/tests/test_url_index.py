@@ -0,0 +1,117 @@
+"""
+Tests for the in-memory job URL index and the lookups built on it.
+"""
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from database import engine
+from services.db_writer import db_writer
+from services import job_service
+from services.job_service import JobService
+from services.url_index import READY, url_index
+from utils.helpers import job_id_for_url
+
+
+def _jobs(n: int, prefix: str = "https://jobs.example/view/"):
+    return [{"job_url": f"{prefix}{i}", "title": f"Job {i}", "source_site": "indeed"} for i in range(n)]
+
+
+@pytest.fixture
+def ready_index(db):
+    """The global index, loaded from the (empty) jobs table."""
+    url_index.warm()
+    deadline = time.monotonic() + 5
+    while url_index.state != READY and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert url_index.state == READY
+    return url_index
+
+
+@pytest.fixture
+def statements():
+    """List collecting the SQL statements sent while the test runs."""
+    sent = []
+
+    def record(conn, cursor, statement, *args):
+        sent.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_new_urls_are_ruled_out_without_queries(db, ready_index, statements):
+    db_writer.run(JobService.save_jobs_with_duplicate_check, _jobs(50), "t", "l", "b1")
+    new_urls = [job["job_url"] for job in _jobs(10, "https://jobs.example/new/")]
+
+    statements.clear()
+    assert JobService.existing_urls(db, new_urls) == set()
+    assert statements == []
+
+
+def test_hits_are_confirmed_in_one_query(db, ready_index, statements):
+    db_writer.run(JobService.save_jobs_with_duplicate_check, _jobs(50), "t", "l", "b1")
+    urls = [job["job_url"] for job in _jobs(60)]
+
+    statements.clear()
+    assert JobService.existing_urls(db, urls) == set(urls[:50])
+    assert len(statements) == 1
+
+
+def test_lookups_are_chunked(db, ready_index, statements, monkeypatch):
+    monkeypatch.setattr(job_service, "URL_LOOKUP_CHUNK_SIZE", 20)
+    db_writer.run(JobService.save_jobs_with_duplicate_check, _jobs(50), "t", "l", "b1")
+    urls = [job["job_url"] for job in _jobs(70)]
+
+    statements.clear()
+    assert JobService.existing_urls(db, urls) == set(urls[:50])
+    assert len(statements) == 3
+
+    # Before the index is loaded every URL is looked up
+    monkeypatch.setattr(url_index, "lookup", lambda db, urls: None)
+    statements.clear()
+    assert JobService.existing_urls(db, urls) == set(urls[:50])
+    assert len(statements) == 4
+
+
+def test_rows_deleted_by_another_process_are_not_reported(db, ready_index):
+    db_writer.run(JobService.save_jobs_with_duplicate_check, _jobs(3), "t", "l", "b1")
+    # Deleted behind the index's back, like the API clearing jobs while a
+    # scrape child process runs
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM jobs"))
+    urls = [job["job_url"] for job in _jobs(3)]
+
+    assert url_index.lookup(db, urls) == urls
+    assert JobService.existing_urls(db, urls) == set()
+    assert not JobService.job_exists_by_url(db, urls[0])
+
+
+def test_refresh_picks_up_other_processes_inserts(db, ready_index):
+    db_writer.run(JobService.save_jobs_with_duplicate_check, _jobs(1), "t", "l", "b1")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO jobs (id, job_url, title, fetched_at) VALUES (:id, 'https://other.example/1', 'x', :now)"
+        ), {"id": job_id_for_url("https://other.example/1"), "now": "2999-01-01 00:00:00"})
+
+    assert JobService.existing_urls(db, ["https://other.example/1"]) == set()
+    url_index._refreshed_at -= timedelta(seconds=31)
+    assert JobService.existing_urls(db, ["https://other.example/1"]) == {"https://other.example/1"}
+
+
+def test_index_is_updated_only_after_the_group_commits(db, ready_index):
+    jobs = _jobs(2, "https://pending.example/")
+    urls = [job["job_url"] for job in jobs]
+    seen_before_commit = []
+
+    def save(session):
+        JobService.save_jobs_with_duplicate_check(session, jobs, "t", "l", "b1")
+        seen_before_commit.extend(url_index.lookup(session, urls))
+
+    db_writer.run(save)
+
+    assert seen_before_commit == []
+    assert JobService.existing_urls(db, urls) == set(urls)
@@ -0,0 +1,67 @@
+"""
+Tests for per-query watermarks and the delta windows computed from them.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import QueryWatermarkDB
+from services.db_writer import db_writer
+from services.watermark_service import WatermarkService
+
+NOW = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _watermark(scraped_hours_ago: float, covered_hours_ago: float) -> QueryWatermarkDB:
+    # Naive, as SQLite returns them
+    return QueryWatermarkDB(
+        last_scraped_at=(NOW - timedelta(hours=scraped_hours_ago)).replace(tzinfo=None),
+        covered_since=(NOW - timedelta(hours=covered_hours_ago)).replace(tzinfo=None),
+    )
+
+
+def test_delta_hours_covers_the_gap_since_the_last_scrape():
+    watermark = _watermark(scraped_hours_ago=5.5, covered_hours_ago=80)
+
+    assert WatermarkService.delta_hours(watermark, 72, margin_hours=2, now=NOW) == 8
+    assert WatermarkService.delta_hours(watermark, 72, margin_hours=0, now=NOW) == 6
+    # Never narrower than an hour or wider than requested
+    assert WatermarkService.delta_hours(_watermark(0.01, 80), 72, margin_hours=0, now=NOW) == 1
+    assert WatermarkService.delta_hours(_watermark(70, 140), 72, margin_hours=5, now=NOW) == 72
+
+
+def test_delta_hours_falls_back_to_the_full_window():
+    assert WatermarkService.delta_hours(None, 72, margin_hours=2, now=NOW) == 72
+    # The requested window reaches back further than the stored results
+    watermark = _watermark(scraped_hours_ago=2, covered_hours_ago=24)
+    assert WatermarkService.delta_hours(watermark, 72, margin_hours=2, now=NOW) == 72
+
+
+def _clear_watermarks(session):
+    session.query(QueryWatermarkDB).delete()
+    session.commit()
+
+
+@pytest.fixture
+def watermarks():
+    db_writer.run(_clear_watermarks)
+    yield
+    db_writer.run(_clear_watermarks)
+
+
+def test_covered_range_is_extended_only_by_overlapping_windows(db, watermarks):
+    key = WatermarkService.make_key("Indeed", " Python  Developer", "Pune", "India")
+    assert key == ("indeed", "python developer", "pune", "india")
+
+    db_writer.run(WatermarkService.record_success, key, NOW - timedelta(hours=10), 72)
+    db_writer.run(WatermarkService.record_success, key, NOW, 12)
+    watermark = WatermarkService.load(db, "india")[key]
+    assert watermark.covered_since == (NOW - timedelta(hours=82)).replace(tzinfo=None)
+    assert watermark.last_scraped_at == NOW.replace(tzinfo=None)
+
+    # A window that starts after the last scrape leaves a gap: start over
+    later = NOW + timedelta(hours=30)
+    db_writer.run(WatermarkService.record_success, key, later, 6)
+    db.expire_all()
+    watermark = WatermarkService.load(db, "india")[key]
+    assert watermark.covered_since == (later - timedelta(hours=6)).replace(tzinfo=None)
@@ -0,0 +1,117 @@
+"""
+Circuit breaker for job site scraping.
+Stops sending queries to a portal that keeps failing and probes it again later.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker for one site.
+
+    closed: calls flow normally. After failure_threshold consecutive
+    failures the breaker opens and rejects calls for cooldown_seconds.
+    It then turns half-open and lets a single probe call through: success
+    closes it again, failure reopens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 300):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown_seconds: How long the breaker stays open before probing
+        """
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_seconds = cooldown_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _maybe_half_open(self, now: float) -> None:
+        """Move an open breaker to half-open once the cooldown passed. Caller holds the lock."""
+        if self._state == OPEN and now - self._opened_at >= self.cooldown_seconds:
+            self._state = HALF_OPEN
+            self._probing = False
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may be sent now.
+
+        In the half-open state only the first caller gets True; it owns the
+        probe and must report back with record_success, record_failure or
+        release.
+
+        Returns:
+            True if the call may proceed
+        """
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """
+        Count a failed call, opening the breaker if needed.
+
+        Returns:
+            True if this failure opened the breaker
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a probe that never reached the site (e.g. a cache hit)."""
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the breaker state for status reporting.
+
+        Returns:
+            Dict with state, consecutive failures and seconds until the next probe
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._maybe_half_open(now)
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(0, int(self.cooldown_seconds - (now - self._opened_at)))
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "retry_in_seconds": retry_in,
+            }
@@ -2,6 +2,7 @@
 Helper utilities for the Job Bot API.
 """
 import re
+import uuid
 from html import escape
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 
@@ -119,3 +120,19 @@ def normalize_job_url(url: str) -> str:
     except Exception:
         # If URL parsing fails, return the stripped original
         return url.strip().rstrip('/')
+
+
+def job_id_for_url(normalized_url: str) -> str:
+    """
+    Get the primary key of a job from its normalized URL.
+    
+    The ID is a name-based UUID (uuid5), so the same job always gets the
+    same ID and re-ingesting it hits the existing row.
+    
+    Args:
+        normalized_url: Job URL as returned by normalize_job_url
+        
+    Returns:
+        UUID string
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, normalized_url))
@@ -0,0 +1,199 @@
+"""
+Outbound rate limiting for job site scraping.
+Provides an adaptive per-site token bucket and retry with exponential backoff.
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Error text that means the portal is pushing back on our request rate
+_THROTTLE_MARKERS = ("429", "too many requests", "rate limit", "timeout", "timed out")
+# Error text for transient network failures worth retrying
+_TRANSIENT_MARKERS = ("connection", "reset by peer", "temporarily unavailable", "502", "503", "504")
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """
+    Check whether an error means the site is throttling us (HTTP 429 or timeouts).
+
+    Args:
+        error: Exception raised by a scrape call
+
+    Returns:
+        True if the request rate should be reduced
+    """
+    if isinstance(error, TimeoutError):
+        return True
+    text = str(error).lower()
+    return any(marker in text for marker in _THROTTLE_MARKERS)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Check whether a failed scrape call is worth retrying.
+
+    Args:
+        error: Exception raised by a scrape call
+
+    Returns:
+        True for throttling and transient network errors
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    text = str(error).lower()
+    return is_throttle_error(error) or any(marker in text for marker in _TRANSIENT_MARKERS)
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket whose rate adapts with AIMD.
+
+    Each success raises the rate by a fixed step (additive increase) up to
+    max_rate; each throttling signal multiplies it by decrease_factor
+    (multiplicative decrease) down to min_rate. This keeps throughput close
+    to what the site actually tolerates.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        increase: Optional[float] = None,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        Args:
+            rate: Initial rate in requests per second
+            burst: Bucket capacity (requests allowed back to back)
+            min_rate: Lowest rate after repeated throttling (default rate / 10)
+            max_rate: Highest rate after repeated successes (default rate)
+            increase: Rate added per success (default 5% of the max/min spread)
+            decrease_factor: Rate multiplier per throttling signal
+        """
+        self.burst = max(1.0, float(burst))
+        self.min_rate = float(min_rate) if min_rate else rate / 10
+        self.max_rate = float(max_rate) if max_rate else float(rate)
+        self.rate = max(self.min_rate, min(float(rate), self.max_rate))
+        self.increase = float(increase) if increase else max((self.max_rate - self.min_rate) / 20, 1e-3)
+        self.decrease_factor = decrease_factor
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update. Caller holds the lock."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self) -> None:
+        """Additive increase after a successful request."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        """Multiplicative decrease after a 429 or timeout."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter for failed scrape calls."""
+    max_retries: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the delay before a retry.
+
+        Args:
+            attempt: Zero-based retry number
+
+        Returns:
+            Random delay in seconds between 0 and the capped exponential bound
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    policy: Optional[RetryPolicy] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    on_retry: Optional[Callable[[int, float, Exception], None]] = None,
+    deadline: Optional[float] = None,
+) -> T:
+    """
+    Call fn behind a rate limiter, retrying retryable errors with backoff.
+
+    Every attempt waits for a limiter token first. Throttling errors slow
+    the limiter down; successes speed it up again. Past the deadline no
+    new attempt is started, so an abandoned call stops hitting the site.
+
+    Args:
+        fn: Zero-argument callable doing one request
+        policy: Retry policy (default: no retries)
+        limiter: Optional rate limiter for the target site
+        on_retry: Optional callback (retry_number, delay, error) before each retry
+        deadline: Optional time.monotonic() value after which no attempt starts
+
+    Returns:
+        Result of fn
+
+    Raises:
+        The last error when it isn't retryable, retries are exhausted or
+        the next retry would start past the deadline; TimeoutError if the
+        deadline passed before the first attempt
+    """
+    policy = policy or RetryPolicy(max_retries=0)
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError("Call deadline passed before the request was sent")
+        try:
+            result = fn()
+        except Exception as e:
+            if limiter is not None and is_throttle_error(e):
+                limiter.on_throttle()
+            if attempt >= policy.max_retries or not is_retryable_error(e):
+                raise
+            delay = policy.backoff(attempt)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            attempt += 1
+            if on_retry:
+                on_retry(attempt, delay, e)
+            time.sleep(delay)
+            continue
+
+        if limiter is not None:
+            limiter.on_success()
+        return result
@@ -0,0 +1,141 @@
+"""
+On-disk cache of raw scrape results for the Job Bot API.
+Stores one gzip-compressed pickled DataFrame per scrape_jobs parameter set,
+with a TTL and size-bounded LRU eviction.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger("job-agent")
+
+CACHE_SUFFIX = ".pkl.gz"
+
+
+class ScrapeCache:
+    """
+    Thread-safe TTL + LRU cache of scrape_jobs results on the local disk.
+
+    Entries are keyed by the full scrape_jobs parameter set. The file's
+    modification time marks when it was written (used for the TTL) and its
+    access time marks when it was last read (used for LRU eviction).
+    Cache errors never propagate: a broken entry is treated as a miss.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int):
+        """
+        Args:
+            directory: Directory holding the cache files (created if missing)
+            ttl_seconds: Maximum age of an entry before it is ignored
+            max_bytes: Total size the cache directory is trimmed to after writes
+        """
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, params: Dict[str, Any]) -> str:
+        """Get the cache file path for a parameter set."""
+        key = repr(sorted(params.items()))
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + CACHE_SUFFIX)
+
+    def get(self, params: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        Get a cached DataFrame for a parameter set.
+
+        Args:
+            params: scrape_jobs keyword arguments
+
+        Returns:
+            The cached DataFrame, or None on a miss or expired entry
+        """
+        path = self._path(params)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        now = time.time()
+        if now - st.st_mtime > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        try:
+            df = pd.read_pickle(path, compression="gzip")
+            # Record the read for LRU eviction without touching the TTL
+            os.utime(path, (now, st.st_mtime))
+        except Exception as e:
+            logger.warning(f"Dropping unreadable scrape cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+        return df if isinstance(df, pd.DataFrame) else None
+
+    def put(self, params: Dict[str, Any], df: pd.DataFrame) -> None:
+        """
+        Store a DataFrame for a parameter set and trim the cache.
+
+        Args:
+            params: scrape_jobs keyword arguments
+            df: Result to cache
+        """
+        path = self._path(params)
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.close(fd)
+            df.to_pickle(tmp_path, compression="gzip")
+            # Atomic so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write scrape cache entry: {e}")
+            if tmp_path:
+                self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(CACHE_SUFFIX):
+                    self._remove(os.path.join(self.directory, name))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(CACHE_SUFFIX):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_atime, st.st_size, path))
+                total += st.st_size
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Delete a file, ignoring errors."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,419 @@
+"""
+Scraper backends for the Job Bot API.
+Decide where raw listings come from: the live portals through JobSpy, or
+results recorded on the local disk and replayed offline.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.rate_limiter import AdaptiveRateLimiter, RetryPolicy, call_with_retry
+
+logger = logging.getLogger("job-agent")
+
+# Sites whose descriptions cost one extra HTTP request per listing
+DESCRIPTION_FETCH_SITES = {"linkedin"}
+
+RECORDING_SUFFIX = ".pkl.gz"
+DESCRIPTIONS_FILE = "descriptions.jsonl"
+
+_LINKEDIN_JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/?#]*-)?(\d+)")
+
+
+def _norm(term: Any) -> str:
+    return " ".join(str(term or "").split()).lower()
+
+
+def _query_key(params: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """Get the (site, title, location, country) a scrape_jobs parameter set queries."""
+    sites = params.get("site_name") or [""]
+    site = sites[0] if isinstance(sites, (list, tuple)) else sites
+    return (
+        _norm(site),
+        _norm(params.get("search_term")),
+        _norm(params.get("location")),
+        _norm(params.get("country_indeed")),
+    )
+
+
+def recording_name(params: Dict[str, Any]) -> str:
+    """
+    Get the recording file name for a scrape_jobs parameter set.
+    Only the query itself is part of the name, so one recording serves
+    every results_wanted and hours_old value.
+
+    Args:
+        params: scrape_jobs keyword arguments
+
+    Returns:
+        File name like "linkedin-<digest>.pkl.gz"
+    """
+    key = _query_key(params)
+    digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:24]
+    return f"{key[0] or 'any'}-{digest}{RECORDING_SUFFIX}"
+
+
+class ScraperBackend(ABC):
+    """
+    Source of raw listings for the scrape pipeline.
+
+    scrape takes the scrape_jobs keyword arguments of one per-site call and
+    returns its DataFrame; fetch_description fetches the description of one
+    listing of a site in DESCRIPTION_FETCH_SITES, and fetch_descriptions
+    does so for many. Implementations must be thread-safe: every site runs
+    its calls on its own worker threads.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Run one per-site listing call.
+
+        Args:
+            params: scrape_jobs keyword arguments
+
+        Returns:
+            DataFrame of listings in JobSpy's column layout
+        """
+
+    def fetch_description(self, job_url: str, site: str) -> Optional[str]:
+        """
+        Fetch the full description of one listing, with one request.
+
+        Args:
+            job_url: Listing URL
+            site: Site the listing belongs to
+
+        Returns:
+            The description, or None if the listing has none
+
+        Raises:
+            Request errors, so callers can retry them
+        """
+        return None
+
+    def fetch_descriptions(
+        self,
+        job_urls: Iterable[str],
+        site: str,
+        deadline: Optional[float] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        on_retry: Optional[Callable[[str, int, float, Exception], None]] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ) -> Dict[str, str]:
+        """
+        Fetch full descriptions for individual listings, one request each.
+        Every request goes through call_with_retry like listing calls: it
+        waits for the site's rate limiter, throttling errors slow it down
+        and retryable failures are retried with backoff. The deadline and
+        should_stop are checked before every request, so a call the
+        pipeline abandoned or stopped sends no more of them.
+
+        Args:
+            job_urls: Listing URLs
+            site: Site the listings belong to
+            deadline: Optional time.monotonic() value after which no request starts
+            should_stop: Optional check returning True once the caller stopped
+            limiter: Optional rate limiter for the site
+            retry: Retry policy per request (default: no retries)
+            on_retry: Optional callback (job_url, retry_number, delay, error) before each retry
+            on_error: Optional callback (job_url, error) for a request that failed for good
+
+        Returns:
+            Dict mapping URL to description; URLs that can't be fetched are missing
+        """
+        out: Dict[str, str] = {}
+        if site not in DESCRIPTION_FETCH_SITES:
+            return out
+        for job_url in job_urls:
+            if should_stop is not None and should_stop():
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                description = call_with_retry(
+                    lambda: self.fetch_description(job_url, site),
+                    policy=retry,
+                    limiter=limiter,
+                    on_retry=(lambda *args: on_retry(job_url, *args)) if on_retry else None,
+                    deadline=deadline,
+                )
+            except Exception as e:
+                logger.debug(f"Failed to fetch the description of {job_url}: {e}")
+                if on_error is not None:
+                    on_error(job_url, e)
+                continue
+            if description:
+                out[job_url] = description
+        return out
+
+
+class JobSpyBackend(ScraperBackend):
+    """Scrapes the live portals with python-jobspy."""
+
+    name = "jobspy"
+
+    def __init__(self):
+        # JobSpy import compatibility; imported here so replay runs don't need it
+        try:
+            from jobspy import scrape_jobs
+        except Exception:
+            from python_jobspy import scrape_jobs
+        self._scrape_jobs = scrape_jobs
+        self._local = threading.local()
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        return self._scrape_jobs(**params, verbose=0)
+
+    @staticmethod
+    def _linkedin_detail_fetcher() -> Callable[[str], Dict[str, Any]]:
+        """
+        Build a function returning LinkedIn job details for a numeric job id.
+        Uses JobSpy's own LinkedIn scraper so parsing stays identical to a full
+        scrape.
+        """
+        try:
+            # JobSpy >= 1.2
+            from jobspy.linkedin import LinkedIn as LinkedInScraper
+            from jobspy.model import DescriptionFormat, ScraperInput, Site
+            fetch_name = "_fetch_details"
+        except ImportError:
+            # JobSpy 1.1.x
+            from jobspy.scrapers import ScraperInput, Site
+            from jobspy.scrapers.linkedin import LinkedInScraper
+            from jobspy.jobs import DescriptionFormat
+            fetch_name = "_get_job_details"
+
+        scraper = LinkedInScraper()
+        scraper.scraper_input = ScraperInput(
+            site_type=[Site.LINKEDIN],
+            description_format=DescriptionFormat.MARKDOWN,
+        )
+        return getattr(scraper, fetch_name)
+
+    def fetch_description(self, job_url: str, site: str) -> Optional[str]:
+        match = _LINKEDIN_JOB_ID_RE.search(job_url or "")
+        if site not in DESCRIPTION_FETCH_SITES or not match:
+            return None
+        # One scraper (and HTTP session) per thread: sites run calls in parallel
+        fetch_details = getattr(self._local, "fetch_details", None)
+        if fetch_details is None:
+            fetch_details = self._local.fetch_details = self._linkedin_detail_fetcher()
+        details = fetch_details(match.group(1)) or {}
+        return str(details.get("description") or "") or None
+
+
+class RecordingBackend(ScraperBackend):
+    """
+    Wraps another backend and saves every result it returns, so the same
+    searches can be replayed offline later with ReplayBackend.
+    Recording errors are logged and never fail the scrape.
+    """
+
+    def __init__(self, inner: ScraperBackend, directory: str):
+        """
+        Args:
+            inner: Backend doing the actual scraping
+            directory: Directory the recordings are written to (created if missing)
+        """
+        self.inner = inner
+        self.name = inner.name
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        df = self.inner.scrape(params)
+        if isinstance(df, pd.DataFrame):
+            path = os.path.join(self.directory, recording_name(params))
+            try:
+                fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                os.close(fd)
+                df.to_pickle(tmp, compression="gzip")
+                os.replace(tmp, path)
+            except Exception as e:
+                logger.warning(f"Failed to record scrape result {path}: {e}")
+        return df
+
+    def fetch_description(self, job_url: str, site: str) -> Optional[str]:
+        description = self.inner.fetch_description(job_url, site)
+        if description:
+            try:
+                with self._lock, open(os.path.join(self.directory, DESCRIPTIONS_FILE), "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"job_url": job_url, "description": description}) + "\n")
+            except Exception as e:
+                logger.warning(f"Failed to record description: {e}")
+        return description
+
+
+class ReplayBackend(ScraperBackend):
+    """
+    Serves recorded results from the local disk instead of the portals.
+
+    Each call sleeps latency_seconds plus a random share of jitter_seconds
+    to mimic a portal's response time, then returns the recording of its
+    (site, title, location, country) query, cut to results_wanted. Queries
+    that were never recorded get a stable pick among the same site's
+    recordings when fallback is on, so a few recordings can drive a large
+    query grid; otherwise they return no listings.
+    Recordings are loaded once and shared, so replay stays cheap at scale.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        directory: str,
+        latency_seconds: float = 0.0,
+        jitter_seconds: float = 0.0,
+        description_latency_seconds: float = 0.0,
+        fallback: bool = True,
+    ):
+        """
+        Args:
+            directory: Directory holding RecordingBackend output
+            latency_seconds: Base delay of every listing call
+            jitter_seconds: Extra random delay of up to this many seconds per call
+            description_latency_seconds: Delay per fetched description
+            fallback: Serve another recording of the same site for unknown queries
+        """
+        self.directory = directory
+        self.latency_seconds = max(0.0, latency_seconds)
+        self.jitter_seconds = max(0.0, jitter_seconds)
+        self.description_latency_seconds = max(0.0, description_latency_seconds)
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._descriptions: Optional[Dict[str, str]] = None
+
+    def _sleep(self, seconds: float, jitter: float = 0.0) -> None:
+        delay = seconds + (random.uniform(0, jitter) if jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _load(self, name: str) -> Optional[pd.DataFrame]:
+        """Get a recording by file name, reading it on first use."""
+        with self._lock:
+            if name in self._frames:
+                return self._frames[name]
+        path = os.path.join(self.directory, name)
+        try:
+            df = pd.read_pickle(path, compression="gzip")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable recording {path}: {e}")
+            return None
+        if not isinstance(df, pd.DataFrame):
+            return None
+        with self._lock:
+            return self._frames.setdefault(name, df)
+
+    def _site_recordings(self, site: str) -> List[str]:
+        pattern = os.path.join(glob.escape(self.directory), f"{glob.escape(site)}-*{RECORDING_SUFFIX}")
+        return sorted(os.path.basename(p) for p in glob.glob(pattern))
+
+    def scrape(self, params: Dict[str, Any]) -> pd.DataFrame:
+        self._sleep(self.latency_seconds, self.jitter_seconds)
+
+        name = recording_name(params)
+        df = self._load(name)
+        if df is None and self.fallback:
+            candidates = self._site_recordings(_query_key(params)[0])
+            if candidates:
+                pick = int(hashlib.sha256(name.encode("utf-8")).hexdigest(), 16) % len(candidates)
+                df = self._load(candidates[pick])
+        if df is None:
+            return pd.DataFrame()
+
+        wanted = params.get("results_wanted")
+        if wanted:
+            df = df.head(int(wanted))
+        # Callers may add or overwrite columns; keep the shared frame intact
+        return df.copy()
+
+    def _description_index(self) -> Dict[str, str]:
+        """URL -> description from the recorded descriptions file, read on first use."""
+        with self._lock:
+            if self._descriptions is not None:
+                return self._descriptions
+        index: Dict[str, str] = {}
+        path = os.path.join(self.directory, DESCRIPTIONS_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        index[entry["job_url"]] = entry["description"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable recorded descriptions {path}: {e}")
+        with self._lock:
+            self._descriptions = index
+            return index
+
+    def fetch_description(self, job_url: str, site: str) -> Optional[str]:
+        if site not in DESCRIPTION_FETCH_SITES:
+            return None
+        self._sleep(self.description_latency_seconds)
+        return self._description_index().get(job_url)
+
+
+def create_scraper_backend(
+    name: str,
+    recordings_dir: str,
+    record: bool = False,
+    latency_seconds: float = 0.0,
+    jitter_seconds: float = 0.0,
+    description_latency_seconds: float = 0.0,
+    fallback: bool = True,
+) -> ScraperBackend:
+    """
+    Build the configured scraper backend.
+
+    Args:
+        name: "jobspy" or "replay"
+        recordings_dir: Directory recordings are written to and replayed from
+        record: Save every live result to recordings_dir (jobspy only)
+        latency_seconds: Replay delay per listing call
+        jitter_seconds: Replay random extra delay per listing call
+        description_latency_seconds: Replay delay per description
+        fallback: Replay a same-site recording for unrecorded queries
+
+    Returns:
+        ScraperBackend instance
+    """
+    if name == "replay":
+        logger.info(f"Replaying recorded scrape results from {recordings_dir}")
+        return ReplayBackend(
+            recordings_dir,
+            latency_seconds=latency_seconds,
+            jitter_seconds=jitter_seconds,
+            description_latency_seconds=description_latency_seconds,
+            fallback=fallback,
+        )
+    if name != "jobspy":
+        logger.warning(f"Unknown scraper backend '{name}', using jobspy")
+    backend: ScraperBackend = JobSpyBackend()
+    if record:
+        logger.info(f"Recording scrape results to {recordings_dir}")
+        backend = RecordingBackend(backend, recordings_dir)
+    return backend
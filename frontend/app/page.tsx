@@ -364,11 +364,12 @@ export default function Page() {
           // This ensures other tabs show their jobs while fetching
           await fetchJobs({ merge: true });
         }
-        if (data.state === "done" || data.state === "failed") {
+        if (data.state === "done" || data.state === "failed" || data.state === "cancelled") {
           setPipelineJobId("");
           setCurrentBatchId(null);
           setFetchingTabId(null);  // Clear fetching tab when done
-          if (data.state === "done" && data.stats?.batch_id) {
+          // A cancelled scrape keeps the jobs it saved, so finish its tab like a completed one
+          if ((data.state === "done" || data.state === "cancelled") && data.stats?.batch_id) {
             handleSearchComplete(data.stats.batch_id as string);
           }
           if (data.state === "failed") setError("Job search failed. Check console.");
@@ -510,6 +511,15 @@ export default function Page() {
     } finally { setActionLoading(null); }
   }
 
+  async function cancelScrape() {
+    if (!pipelineJobId) return;
+    try {
+      await fetchWithErrorCallback(`${BACKEND}/run/${pipelineJobId}/cancel`, { method: "POST" });
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Error cancelling search');
+    }
+  }
+
   async function updateStatus(id: string, st: "new" | "saved" | "rejected") {
     // Debounce rapid clicks
     const now = Date.now();
@@ -621,6 +631,8 @@ export default function Page() {
 
   // -- RENDER CONSTANTS FOR THEME --
   const isDark = theme === 'dark';
+  // A queued scrape counts as in progress: the backend starts it once a worker is free
+  const isPipelineActive = pipeline?.state === 'running' || pipeline?.state === 'queued';
 
   if (isLoading) {
     return <LoadingScreen isDark={isDark} />;
@@ -675,7 +687,7 @@ export default function Page() {
         inputKeywordsExc={inputKeywordsExc}
         setInputKeywordsExc={setInputKeywordsExc}
         onFetch={runScrape}
-        isFetching={pipeline?.state === 'running' || actionLoading === 'scrape'}
+        isFetching={isPipelineActive || actionLoading === 'scrape'}
         showMoreOptions={showMoreOptions}
         setShowMoreOptions={setShowMoreOptions}
         jobCount={displayJobs.length}
@@ -755,7 +767,7 @@ export default function Page() {
           uniquePortals={uniquePortals}
           uniqueLocations={uniqueLocations}
           displayJobsCount={displayJobs.length}
-          isFetching={pipeline?.state === 'running' || actionLoading === 'scrape'}
+          isFetching={isPipelineActive || actionLoading === 'scrape'}
           onFetch={runScrape}
         />
 
@@ -766,7 +778,7 @@ export default function Page() {
             displayJobs={displayJobs}
             viewStatus={viewStatus}
             activeTabId={activeTabId}
-            isPipelineRunning={pipeline?.state === 'running'}
+            isPipelineRunning={isPipelineActive}
             fetchingTabId={fetchingTabId}
             newJobIds={newJobIds}
             notification={notification}
@@ -814,7 +826,7 @@ export default function Page() {
     </div>
 
     {/* PROGRESS BAR - Fixed at bottom during job fetching */}
-    {pipeline?.state === 'running' && (
+    {isPipelineActive && (
       <ProgressBar
         stats={{
           new_jobs: (pipeline.stats?.new_jobs as number) || 0,
@@ -828,6 +840,7 @@ export default function Page() {
         }}
         logs={pipeline.logs}
         isDark={isDark}
+        onCancel={cancelScrape}
       />
     )}
     </>
@@ -1,7 +1,7 @@
 "use client";
 
 import React from "react";
-import { Loader2 } from "lucide-react";
+import { Loader2, X } from "lucide-react";
 
 // --- TYPES ---
 
@@ -20,11 +20,12 @@ type ProgressBarProps = {
   stats: ProgressStats;
   logs: string[];
   isDark: boolean;
+  onCancel?: () => void;
 };
 
 // --- MAIN COMPONENT ---
 
-export default function ProgressBar({ stats, logs, isDark }: ProgressBarProps) {
+export default function ProgressBar({ stats, logs, isDark, onCancel }: ProgressBarProps) {
   // Extract values with defaults
   const newJobs = stats.new_jobs || 0;
   const duplicates = stats.duplicates || 0;
@@ -104,6 +105,23 @@ export default function ProgressBar({ stats, logs, isDark }: ProgressBarProps) {
                 </span>
               </div>
             )}
+
+            {/* Cancel */}
+            {onCancel && (
+              <button
+                type="button"
+                onClick={onCancel}
+                className={`flex items-center gap-1 px-2 py-1 rounded text-xs font-medium ${
+                  isDark
+                    ? 'text-zinc-400 hover:text-white hover:bg-zinc-800'
+                    : 'text-gray-500 hover:text-gray-900 hover:bg-gray-100'
+                }`}
+                aria-label="Stop search"
+              >
+                <X className="w-3.5 h-3.5" />
+                Stop
+              </button>
+            )}
           </div>
         </div>
 
@@ -75,7 +75,7 @@ export function isPipelineStatus(data: unknown): data is PipelineStatus {
   const pipeline = data as Record<string, unknown>;
   
   // Check state is valid
-  const validStates = ['unknown', 'running', 'done', 'failed'];
+  const validStates = ['unknown', 'queued', 'running', 'done', 'failed', 'cancelled'];
   if (!validStates.includes(pipeline.state as string)) {
     return false;
   }
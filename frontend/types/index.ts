@@ -24,6 +24,9 @@ export type SettingsModel = {
   sites: string[];
   results_per_site: number;
   hours_old: number;
+  data_mode?: "compact" | "full";
+  keyword_fields?: "all" | "title" | "description";
+  keyword_whole_word?: boolean;
 };
 
 // Tab Types
@@ -47,7 +50,7 @@ export type SearchTab = {
 
 // Pipeline Types
 export type PipelineStatus = {
-  state: "unknown" | "running" | "done" | "failed";
+  state: "unknown" | "queued" | "running" | "done" | "failed" | "cancelled";
   logs: string[];
   stats: Record<string, unknown>;
 };